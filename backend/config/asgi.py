@@ -13,4 +13,11 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up
+from django.urls import reverse  # noqa: E402
+
+from tracker.events import CancelOnDisconnect  # noqa: E402
+
+application = CancelOnDisconnect(django_application, [reverse('event-stream')])
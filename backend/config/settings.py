@@ -1,5 +1,5 @@
 import os
-from decouple import config
+from decouple import Csv, config
 from pathlib import Path
 import dj_database_url
 
@@ -29,6 +29,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -39,9 +40,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tracker.middleware.RequestMetricsMiddleware',
+    'tracker.middleware.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # For static files on Render
+    'tracker.middleware.AsyncWhiteNoiseMiddleware',  # For static files on Render
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -89,6 +92,21 @@ else:
         }
     }
 
+# Read replicas: comma-separated database URLs, added as replica_1, replica_2...
+# Safe requests to the API read from a random replica unless the client wrote
+# within the last REPLICA_PIN_SECONDS
+REPLICA_DATABASES = []
+for index, url in enumerate(config('DATABASE_REPLICA_URLS', default='', cast=Csv()), start=1):
+    alias = f'replica_{index}'
+    # Replica servers are read-only, so tests read the primary's test database through them;
+    # ReplicaRoutingTests checks the routing against a separate database instead
+    DATABASES[alias] = {**dj_database_url.parse(url), 'TEST': {'MIRROR': 'default'}}
+    REPLICA_DATABASES.append(alias)
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+REPLICA_PIN_COOKIE = 'primary_pin'
+REPLICA_ROUTED_PATHS = ['/api/skills/', '/api/activities/', '/api/async/']
+DATABASE_ROUTERS = ['tracker.routers.ReplicaRouter']
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -132,10 +150,73 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'tracker.throttling.TokenBucketThrottle',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20
 }
 
+# Token-bucket throttling: every client gets a bucket per endpoint holding
+# THROTTLE_BURST tokens, refilled at THROTTLE_RATE tokens a second (0
+# disables). Expensive endpoints take several tokens, see tracker/throttling.py
+THROTTLE_RATE = config('THROTTLE_RATE', default=5, cast=float)
+THROTTLE_BURST = config('THROTTLE_BURST', default=100, cast=int)
+
+CACHES = {
+    # Cached insights, updated in place on every activity write. Local memory
+    # only suits a single process; with several workers use a shared cache
+    # (e.g. django.core.cache.backends.redis.RedisCache) or they serve stale insights
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    },
+    # Throttle buckets; local memory throttles each process on its own, a
+    # shared cache (e.g. django.core.cache.backends.redis.RedisCache) all of them together
+    'throttle': {
+        'BACKEND': config('THROTTLE_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('THROTTLE_CACHE_LOCATION', default='throttle'),
+    },
+}
+
+# Serve /api/skills/stats/ from a materialized summary row that is refreshed
+# whenever skills or activities are written, instead of aggregating per request
+SKILL_STATS_MATERIALIZED = config('SKILL_STATS_MATERIALIZED', default=False, cast=bool)
+
+# Days deletions are kept for delta syncs (?since=); older cursors get 410
+# and the client syncs again from scratch. prune_tombstones deletes the rest
+SYNC_TOMBSTONE_DAYS = config('SYNC_TOMBSTONE_DAYS', default=90, cast=int)
+
+# compact_activities keeps this many whole months of activities live and
+# moves older ones to the archive, keeping their hours as monthly totals
+ACTIVITY_ARCHIVE_MONTHS = config('ACTIVITY_ARCHIVE_MONTHS', default=24, cast=int)
+
+# Run derived-data recomputation (stats refreshes, skill hour recounts) in
+# `manage.py run_tasks` workers instead of the request's process
+BACKGROUND_TASKS = config('BACKGROUND_TASKS', default=False, cast=bool)
+
+# Request instrumentation: queries slower than this many milliseconds are
+# logged with their call site (0 disables), and /metrics requires
+# "Authorization: Bearer <METRICS_TOKEN>"; without a token it is only
+# served with DEBUG on
+SLOW_QUERY_MS = config('SLOW_QUERY_MS', default=500, cast=int)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Delivers change events to the open /api/events/ streams. The in-process
+# default only reaches streams served by the same process
+EVENT_BROADCASTER = config('EVENT_BROADCASTER', default='tracker.events.InProcessBroadcaster')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'tracker.slow_queries': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
 # CORS settings for production
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
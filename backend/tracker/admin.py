@@ -1,15 +1,30 @@
 from django.contrib import admin
-from .models import Skill, LearningActivity
+from .models import Job, Skill, LearningActivity, Tag
 
 @admin.register(Skill)
 class SkillAdmin(admin.ModelAdmin):
-    list_display = ['name', 'platform', 'resource_type', 'status', 'hours_spent', 'created_at']
+    list_display = ['name', 'owner', 'platform', 'resource_type', 'status', 'hours_spent', 'created_at']
+    list_select_related = ['owner']
     list_filter = ['platform', 'resource_type', 'status', 'difficulty']
     search_fields = ['name', 'description', 'tags']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['owner', 'created_at', 'updated_at']
+    exclude = ['tag_set']
 
 @admin.register(LearningActivity)
 class LearningActivityAdmin(admin.ModelAdmin):
     list_display = ['skill', 'date', 'hours_spent', 'created_at']
+    list_select_related = ['skill']
     list_filter = ['date', 'skill__platform']
-    search_fields = ['skill__name', 'notes']
\ No newline at end of file
+    search_fields = ['skill__name', 'notes']
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['name']
+    search_fields = ['name']
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'key', 'status', 'attempts', 'run_after', 'created_at']
+    list_filter = ['status', 'name']
+    search_fields = ['key']
+    readonly_fields = ['name', 'args', 'key', 'attempts', 'last_error', 'created_at']
\ No newline at end of file
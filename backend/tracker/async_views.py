@@ -0,0 +1,188 @@
+"""Async versions of the read-heavy endpoints, served under ``/api/async/``.
+
+They answer with the same payloads, pagination and validators as the
+viewsets but await the database through Django's async ORM, so under an
+ASGI server a worker keeps serving other requests while a slow query runs.
+Requests these views cannot serve from ``values()`` rows, such as
+``?expand=activities`` on the skill list, are handed to the sync viewset.
+"""
+import time
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from rest_framework.exceptions import MethodNotAllowed, Throttled
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from .conditional import aqueryset_version, collection_etag, object_etag, precondition_response, set_validators
+from .events import stream_events
+from .fastpath import FastJSONRenderer, values_plan
+from .metrics import serialization_timer
+from .models import LearningActivity, Skill, owner_id_of
+from .pagination import (
+    ActivityDeltaSyncPagination, ActivityKeysetPagination, AsyncPageNumberPagination, SkillDeltaSyncPagination,
+    SkillKeysetPagination,
+)
+from .serializers import LearningActivitySerializer, SkillListSerializer, SkillSerializer
+from .stats import aget_skill_stats, astats_version
+from .views import LearningActivityViewSet, SkillViewSet, filter_activities, filter_skills
+
+MEDIA_TYPE = 'application/json'
+ALLOWED_METHODS = ('GET', 'HEAD')
+
+sync_skill_list = SkillViewSet.as_view({'get': 'list'})
+sync_activity_list = LearningActivityViewSet.as_view({'get': 'list'})
+
+
+def json_response(request, data, status=200):
+    start = time.perf_counter()
+    response = HttpResponse(FastJSONRenderer().render(data), status=status, content_type=MEDIA_TYPE)
+    # Reported by RequestMetricsMiddleware
+    request._request._render_duration = time.perf_counter() - start
+    return response
+
+
+def async_api_view(view):
+    """Wrap an async read view: GET/HEAD only, a DRF request with the API's
+    authentication and throttling, and DRF's error payloads
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+        try:
+            if request.method not in ALLOWED_METHODS:
+                raise MethodNotAllowed(request.method)
+            await sync_to_async(check_throttles)(request)
+            return await view(request, *args, **kwargs)
+        except Exception as exc:
+            handled = exception_handler(exc, {'request': request})
+            if handled is None:
+                raise
+            response = json_response(request, handled.data, status=handled.status_code)
+            if isinstance(exc, MethodNotAllowed):
+                response['Allow'] = ', '.join(ALLOWED_METHODS)
+            if 'Retry-After' in handled:
+                response['Retry-After'] = handled['Retry-After']
+            return response
+    return wrapper
+
+
+def check_throttles(request):
+    """Same as APIView.check_throttles; runs in a thread as it may authenticate the request"""
+    durations = []
+    for throttle in [throttle() for throttle in api_settings.DEFAULT_THROTTLE_CLASSES]:
+        if not throttle.allow_request(request, None):
+            durations.append(throttle.wait())
+    durations = [duration for duration in durations if duration is not None]
+    if durations:
+        raise Throttled(max(durations))
+
+
+async def aowner_id(request):
+    """Owner id of the requesting user"""
+    # Authentication may read the session and the user from the database
+    return owner_id_of(await sync_to_async(lambda: request.user)())
+
+
+def get_paginator(request, keyset_pagination_class, delta_pagination_class):
+    if 'since' in request.query_params:
+        return delta_pagination_class()
+    if request.query_params.get('pagination') == 'cursor':
+        return keyset_pagination_class()
+    return AsyncPageNumberPagination()
+
+
+async def values_list_response(request, queryset, paginator, plan):
+    """A conditional, paginated list rendered from values() rows"""
+    version = await aqueryset_version(queryset)
+    etag = collection_etag(request.get_full_path(), MEDIA_TYPE, *version)
+    response = precondition_response(request, etag=etag)
+    if response is not None:
+        return response
+
+    columns, expressions, getters = plan
+    if expressions:
+        queryset = queryset.annotate(**expressions)
+    queryset = queryset.values(*columns, *expressions)
+
+    rows = await paginator.apaginate_queryset(queryset, request)
+    with serialization_timer(request):
+        data = [{name: getter(row) for name, getter in getters} for row in rows]
+    return set_validators(json_response(request, paginator.get_paginated_response(data).data), etag)
+
+
+@async_api_view
+async def skill_list(request):
+    paginator = get_paginator(request, SkillKeysetPagination, SkillDeltaSyncPagination)
+    serializer = SkillListSerializer(context={'request': request})
+    plan = values_plan(serializer, getattr(paginator, 'ordering_field', None))
+    if plan is None:
+        return await sync_to_async(sync_skill_list)(request._request)
+    queryset = filter_skills(Skill.objects.filter(owner_id=await aowner_id(request)), request.query_params)
+    return await values_list_response(request, queryset, paginator, plan)
+
+
+@async_api_view
+async def skill_detail(request, pk):
+    skills = Skill.objects.filter(owner_id=await aowner_id(request)).defer('search_vector')
+    queryset = filter_skills(skills, request.query_params)
+    skill = await queryset.filter(pk=pk).afirst()
+    if skill is None:
+        raise Http404
+    etag = object_etag(pk, skill.updated_at)
+    response = precondition_response(request, etag=etag, last_modified=skill.updated_at)
+    if response is not None:
+        return response
+
+    serializer = SkillSerializer(skill, context={'request': request})
+    if 'activities' in serializer.fields:
+        # Preload the preview so rendering never touches the database
+        skill.activity_preview = [
+            activity async for activity in
+            skill.activities.order_by('-date', '-id')[:serializer.activity_preview_limit + 1]
+        ]
+    return set_validators(json_response(request, serializer.data), etag, skill.updated_at)
+
+
+@async_api_view
+async def skill_stats(request):
+    owner_id = await aowner_id(request)
+    # The version alone answers a 304, so it is read first
+    version = await astats_version(owner_id)
+    etag = collection_etag(request.get_full_path(), MEDIA_TYPE, *version)
+    response = precondition_response(request, etag=etag)
+    if response is not None:
+        return response
+    return set_validators(json_response(request, await aget_skill_stats(owner_id)), etag)
+
+
+@async_api_view
+async def activity_list(request):
+    paginator = get_paginator(request, ActivityKeysetPagination, ActivityDeltaSyncPagination)
+    serializer = LearningActivitySerializer(context={'request': request})
+    plan = values_plan(serializer, getattr(paginator, 'ordering_field', None))
+    if plan is None:
+        return await sync_to_async(sync_activity_list)(request._request)
+    activities = LearningActivity.objects.filter(owner_id=await aowner_id(request))
+    queryset = filter_activities(activities, request.query_params)
+    return await values_list_response(request, queryset, paginator, plan)
+
+
+@async_api_view
+async def event_stream(request):
+    """Server-Sent Events with the requesting owner's changes as they commit"""
+    if not isinstance(request._request, ASGIRequest):
+        # A sync worker would be tied up for as long as the client stays connected
+        return json_response(request, {'detail': 'The event stream needs an ASGI server.'}, status=501)
+    owner_id = await aowner_id(request)
+    # The stream outlives the request; give back the connections authentication used
+    await sync_to_async(connections.close_all)()
+    response = StreamingHttpResponse(stream_events(owner_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,134 @@
+from collections import deque
+
+DEFAULT_CATEGORY = 'General'
+
+# Keep in step with autoCategorizeskill() in the frontend's utils/aiHelpers.js.
+# Order matters: on a tie the earlier category wins.
+CATEGORY_KEYWORDS = {
+    'Frontend Development': [
+        'react', 'vue', 'angular', 'javascript', 'html', 'css', 'scss', 'sass',
+        'typescript', 'bootstrap', 'tailwind', 'frontend', 'ui', 'ux', 'design',
+        'web design', 'responsive', 'jquery', 'dom', 'browser', 'webpack', 'vite',
+    ],
+    'Backend Development': [
+        'node', 'express', 'django', 'flask', 'spring', 'laravel', 'php',
+        'python', 'java', 'backend', 'api', 'rest', 'graphql', 'server',
+        'microservices', 'fastapi', 'rails', 'ruby', 'go', 'rust',
+    ],
+    'Database & Storage': [
+        'mysql', 'postgresql', 'mongodb', 'redis', 'database', 'sql', 'nosql',
+        'sqlite', 'oracle', 'cassandra', 'elasticsearch', 'firebase', 'supabase',
+    ],
+    'Mobile Development': [
+        'react native', 'flutter', 'ios', 'android', 'mobile', 'app development',
+        'swift', 'kotlin', 'xamarin', 'ionic', 'cordova', 'native',
+    ],
+    'DevOps & Cloud': [
+        'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'jenkins', 'gitlab',
+        'devops', 'ci/cd', 'terraform', 'ansible', 'cloud', 'deployment',
+        'nginx', 'apache', 'linux', 'unix',
+    ],
+    'Data Science & Analytics': [
+        'python', 'pandas', 'numpy', 'matplotlib', 'scikit', 'tensorflow',
+        'pytorch', 'machine learning', 'data science', 'analytics', 'jupyter',
+        'statistics', 'data analysis', 'visualization', 'tableau', 'power bi',
+    ],
+    'Programming Languages': [
+        'javascript', 'python', 'java', 'c++', 'c#', 'go', 'rust', 'php',
+        'ruby', 'swift', 'kotlin', 'scala', 'clojure', 'haskell', 'programming',
+    ],
+    'Testing & Quality': [
+        'testing', 'jest', 'cypress', 'selenium', 'junit', 'pytest',
+        'test automation', 'tdd', 'bdd', 'quality assurance', 'qa',
+    ],
+    'Design & Creative': [
+        'figma', 'sketch', 'photoshop', 'illustrator', 'design', 'ui/ux',
+        'graphic design', 'web design', 'prototyping', 'wireframe', 'adobe',
+    ],
+    'Business & Management': [
+        'project management', 'agile', 'scrum', 'kanban', 'leadership',
+        'business', 'marketing', 'sales', 'strategy', 'management',
+    ],
+}
+
+CATEGORY_CHOICES = [(name, name) for name in [*CATEGORY_KEYWORDS, DEFAULT_CATEGORY]]
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over a fixed set of keywords.
+
+    Built once, it reports every keyword occurring anywhere in a text
+    (substring semantics, like ``str.__contains__``) in a single pass,
+    however many keywords there are.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keywords))
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [set()]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(set())
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].add(index)
+
+        # Breadth-first so every failure link points at an already linked state
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] |= self.output[self.fail[child]]
+
+    def find(self, text):
+        """Return the set of keyword indexes found in text"""
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            if self.output[state]:
+                found |= self.output[state]
+        return found
+
+
+_matcher = KeywordMatcher(
+    keyword for keywords in CATEGORY_KEYWORDS.values() for keyword in keywords
+)
+# Categories each keyword counts towards, by matcher index
+_keyword_categories = [
+    [category for category, keywords in CATEGORY_KEYWORDS.items() if keyword in keywords]
+    for keyword in _matcher.keywords
+]
+
+
+def categorize(name, description='', tags=''):
+    """Return (category, confidence) for a skill's text.
+
+    The category is the one with the most distinct matching keywords, and
+    confidence reaches 100 at three matches.
+    """
+    text = f'{name} {description or ""} {tags or ""}'.lower()
+    counts = dict.fromkeys(CATEGORY_KEYWORDS, 0)
+    for index in _matcher.find(text):
+        for category in _keyword_categories[index]:
+            counts[category] += 1
+
+    best, best_count = DEFAULT_CATEGORY, 0
+    for category, count in counts.items():
+        if count > best_count:
+            best, best_count = category, count
+    confidence = min(100, best_count / 3 * 100) if best_count else 0
+    return best, confidence
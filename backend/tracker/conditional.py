@@ -0,0 +1,147 @@
+from hashlib import md5
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def collection_etag(*parts):
+    """Weak ETag over the values that identify a collection's version"""
+    digest = md5('|'.join(str(part) for part in parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/{quote_etag(digest)}'
+
+
+def queryset_version(queryset, **aggregates):
+    """MAX(updated_at) and COUNT(*) of a queryset, plus any extra aggregates.
+
+    Any write bumps the maximum and any delete drops the count, so together
+    they change whenever the rows behind a response do.
+    """
+    version = queryset.order_by().aggregate(
+        last_modified=Max('updated_at'), count=Count('pk'), **aggregates
+    )
+    return _version_values(version)
+
+
+async def aqueryset_version(queryset, **aggregates):
+    """Async version of queryset_version"""
+    version = await queryset.order_by().aaggregate(
+        last_modified=Max('updated_at'), count=Count('pk'), **aggregates
+    )
+    return _version_values(version)
+
+
+def _version_values(version):
+    return [value.isoformat() if hasattr(value, 'isoformat') else value
+            for _, value in sorted(version.items())]
+
+
+def object_etag(lookup, updated_at):
+    """Strong ETag for a single object"""
+    return quote_etag(f'{lookup}-{updated_at.timestamp()}')
+
+
+def precondition_response(request, etag=None, last_modified=None):
+    """Return a 304/412 response when the request's preconditions call for one"""
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag=None, last_modified=None):
+    """Attach validators and make caches revalidate before reusing the response"""
+    patch_cache_control(response, no_cache=True)
+    if etag:
+        response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+class ConditionalRequestMixin:
+    """Conditional requests for a ModelViewSet whose model has ``updated_at``
+    and an owner-scoped manager (``owned_by()``).
+
+    Lists carry a weak ETag built from the filtered queryset's version, so an
+    unchanged list answers ``304 Not Modified`` after one aggregate query and
+    without serializing anything. Lists get no Last-Modified: a delete does
+    not move MAX(updated_at), so only the ETag can reflect it.
+
+    Single objects carry a strong ETag and Last-Modified from their own
+    ``updated_at``, and updates and deletes honour ``If-Match`` /
+    ``If-Unmodified-Since`` with ``412 Precondition Failed``.
+    """
+
+    def get_collection_version(self, queryset):
+        return queryset_version(queryset)
+
+    def get_object_version(self, lock=False):
+        """``updated_at`` of the requested object, or None if it does not exist"""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_queryset().model._default_manager.owned_by(self.request.user).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        if lock:
+            queryset = queryset.select_for_update()
+        return queryset.values_list('updated_at', flat=True).first()
+
+    def get_collection_etag(self, queryset):
+        return collection_etag(
+            self.request.get_full_path(), self.request.accepted_media_type,
+            *self.get_collection_version(queryset)
+        )
+
+    def object_etag(self, updated_at):
+        return object_etag(self.kwargs[self.lookup_url_kwarg or self.lookup_field], updated_at)
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_collection_etag(self.filter_queryset(self.get_queryset()))
+        response = precondition_response(request, etag=etag)
+        if response is not None:
+            return response
+        return set_validators(super().list(request, *args, **kwargs), etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        updated_at = self.get_object_version()
+        if updated_at is None:
+            # Let the regular lookup raise the 404
+            return super().retrieve(request, *args, **kwargs)
+        etag = self.object_etag(updated_at)
+        response = precondition_response(request, etag=etag, last_modified=updated_at)
+        if response is not None:
+            return response
+        return set_validators(super().retrieve(request, *args, **kwargs), etag, updated_at)
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            # Hold the row until the write lands so the precondition stays true
+            updated_at = self.get_object_version(lock=True)
+            if updated_at is not None:
+                response = precondition_response(
+                    request, etag=self.object_etag(updated_at), last_modified=updated_at
+                )
+                if response is not None:
+                    return response
+            response = super().update(request, *args, **kwargs)
+
+        updated_at = self.get_object_version()
+        if updated_at is not None:
+            set_validators(response, self.object_etag(updated_at), updated_at)
+        return response
+
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic():
+            updated_at = self.get_object_version(lock=True)
+            if updated_at is not None:
+                response = precondition_response(
+                    request, etag=self.object_etag(updated_at), last_modified=updated_at
+                )
+                if response is not None:
+                    return response
+            return super().destroy(request, *args, **kwargs)
@@ -0,0 +1,265 @@
+"""Change events pushed to dashboards over Server-Sent Events.
+
+Writes record what they changed with ``record_change()`` and
+``record_stats()``. When the transaction commits, each owner's changes go
+out as one compact ``changes`` event to every stream that owner has open
+at ``GET /api/events/``. Clients refetch only what an event names instead
+of polling whole lists.
+
+Events travel through the broadcaster named by ``EVENT_BROADCASTER``. The
+default ``InProcessBroadcaster`` only reaches streams served by the same
+process; with several workers, point the setting at a class with the same
+``publish()`` / ``subscribe()`` interface that fans out through a service
+every worker can reach.
+"""
+import asyncio
+import itertools
+import json
+import threading
+from collections import defaultdict
+from contextlib import contextmanager, suppress
+from decimal import Decimal
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+# Seconds between comment frames that keep idle connections open through proxies
+HEARTBEAT_SECONDS = 15
+# How long EventSource clients wait before reconnecting
+RETRY_MS = 3000
+# An event listing more ids than this for one change asks clients to refetch everything instead
+MAX_IDS = 200
+
+_event_ids = itertools.count(1)
+
+
+class Subscription:
+    """The queue of events for one open stream"""
+
+    def __init__(self, loop, size):
+        self.loop = loop
+        self.queue = asyncio.Queue(size)
+
+    def put(self, event):
+        """Queue ``event``; safe to call from any thread"""
+        with suppress(RuntimeError):
+            # The loop is gone once its server shuts down
+            self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The client fell behind; drop what it missed and have it refetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'id': next(_event_ids), 'event': 'changes', 'data': {'resync': True}})
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class InProcessBroadcaster:
+    """Delivers events to the streams open in this process"""
+    queue_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def publish(self, owner_id, event):
+        """Send ``event`` to every open stream of ``owner_id``"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(owner_id, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    @contextmanager
+    def subscribe(self, owner_id):
+        """Receive ``owner_id``'s events on the running event loop while the block runs"""
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions[owner_id].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions[owner_id].discard(subscription)
+                if not self._subscriptions[owner_id]:
+                    del self._subscriptions[owner_id]
+
+
+@lru_cache(maxsize=None)
+def get_broadcaster():
+    return import_string(settings.EVENT_BROADCASTER)()
+
+
+class ChangeSet:
+    """Changes grouped per owner, kind and action"""
+
+    def __init__(self):
+        self.owners = {}
+
+    def add(self, owner_id, kind, action, pk):
+        ids = self.owners.setdefault(owner_id, {}).setdefault(kind, {}).setdefault(action, [])
+        if pk not in ids:
+            ids.append(pk)
+
+    def add_stats(self, owner_id, hours, activities):
+        stats = self.owners.setdefault(owner_id, {}).setdefault('stats', {'hours': Decimal(0), 'activities': 0})
+        stats['hours'] += hours
+        stats['activities'] += activities
+
+    def publish(self):
+        broadcaster = get_broadcaster()
+        for owner_id, changes in self.owners.items():
+            broadcaster.publish(owner_id, {'id': next(_event_ids), 'event': 'changes', 'data': _compact(changes)})
+
+
+class CommitMarker:
+    """On-commit callback of one savepoint; fires only if the savepoint was not rolled back"""
+    committed = False
+
+    def __call__(self):
+        self.committed = True
+
+
+class PendingEvents:
+    """Changes recorded in one transaction, published per owner when it commits.
+
+    Each change is tied to a marker registered in the savepoint it was made
+    in. Rolling a savepoint back drops its on-commit callbacks, so its
+    markers never fire and its changes are left out. ``_record()`` keeps this
+    callback after the markers so they have fired by the time it runs.
+    """
+
+    def __init__(self):
+        self.changes = []
+        self.markers = {}
+
+    def record(self, connection, method, *args):
+        savepoints = frozenset(connection.savepoint_ids)
+        marker = self.markers.get(savepoints)
+        if marker is None:
+            marker = self.markers[savepoints] = CommitMarker()
+            transaction.on_commit(marker, using=connection.alias)
+        self.changes.append((marker, method, args))
+
+    def __call__(self):
+        changes = ChangeSet()
+        for marker, method, args in self.changes:
+            if marker.committed:
+                getattr(changes, method)(*args)
+        changes.publish()
+
+
+def _compact(changes):
+    lists = [ids for kind, actions in changes.items() if kind != 'stats' for ids in actions.values()]
+    if any(len(ids) > MAX_IDS for ids in lists):
+        # Too much changed to list; the client refetches everything instead
+        return {'resync': True}
+    data = {kind: actions for kind, actions in changes.items() if kind != 'stats'}
+    if 'stats' in changes:
+        data['stats'] = {'hours': float(changes['stats']['hours']), 'activities': changes['stats']['activities']}
+    return data
+
+
+def _record(using, method, *args):
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        # Autocommit: the change has landed already
+        changes = ChangeSet()
+        getattr(changes, method)(*args)
+        changes.publish()
+        return
+    # One PendingEvents per transaction collects everything it changes
+    index = next(
+        (index for index, entry in enumerate(connection.run_on_commit) if isinstance(entry[1], PendingEvents)), None
+    )
+    if index is None:
+        transaction.on_commit(PendingEvents(), using=using)
+        index = len(connection.run_on_commit) - 1
+    pending = connection.run_on_commit[index][1]
+    pending.record(connection, method, *args)
+    # Run after every marker it depends on
+    connection.run_on_commit.append(connection.run_on_commit.pop(index))
+
+
+def record_change(owner_id, kind, action, pk, using=None):
+    """Note that ``pk`` of ``kind`` (``skills`` or ``activities``) was
+    ``created``, ``updated`` or ``deleted``
+    """
+    _record(using, 'add', owner_id, kind, action, pk)
+
+
+def record_stats(owner_id, hours, activities, using=None):
+    """Note a change in an owner's logged hours and activity count"""
+    _record(using, 'add_stats', owner_id, Decimal(str(hours)), activities)
+
+
+def format_event(event):
+    """One SSE frame"""
+    data = json.dumps(event['data'], separators=(',', ':'))
+    return f'id: {event["id"]}\nevent: {event["event"]}\ndata: {data}\n\n'.encode()
+
+
+async def stream_events(owner_id):
+    """SSE frames of one owner's events, with a heartbeat while idle"""
+    with get_broadcaster().subscribe(owner_id) as subscription:
+        # Sent straight away so the response starts before the first change
+        yield f'retry: {RETRY_MS}\n\n'.encode()
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b': keep-alive\n\n'
+                continue
+            yield format_event(event)
+
+
+class CancelOnDisconnect:
+    """ASGI wrapper that stops streaming responses once their client disconnects.
+
+    Django 4.2 stops reading from the connection after the request body, so
+    an endless stream would never learn its client went away and would keep
+    its subscription and heartbeats running. For ``paths``, this hands Django
+    the body, then waits for ``http.disconnect`` and cancels the response.
+    """
+
+    def __init__(self, application, paths):
+        self.application = application
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] not in self.paths:
+            return await self.application(scope, receive, send)
+
+        body = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body.append(message)
+            if not message.get('more_body', False):
+                break
+        disconnected = asyncio.Event()
+
+        async def replay():
+            if body:
+                return body.pop(0)
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        handler = asyncio.ensure_future(self.application(scope, replay, send))
+        watcher = asyncio.ensure_future(receive())
+        await asyncio.wait({handler, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if watcher.done():
+            disconnected.set()
+            handler.cancel()
+        else:
+            watcher.cancel()
+        for task in (handler, watcher):
+            with suppress(asyncio.CancelledError):
+                await task
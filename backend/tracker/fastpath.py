@@ -0,0 +1,162 @@
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.relations import ManyRelatedField, PKOnlyObject, PrimaryKeyRelatedField, RelatedField
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .metrics import serialization_timer
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that reuses one C-accelerated encoder for compact output.
+
+    ``json.dumps`` builds a new encoder for every response; this one is
+    built once per renderer class. Decimals, dates and the other types
+    DRF's encoder knows are still handled by its ``default()``, and the
+    bytes produced are identical to JSONRenderer's. Indented output (e.g.
+    ``Accept: application/json; indent=4``) goes through JSONRenderer.
+    """
+    _encoder = None
+
+    @classmethod
+    def get_encoder(cls):
+        if cls.__dict__.get('_encoder') is None:
+            cls._encoder = cls.encoder_class(
+                ensure_ascii=cls.ensure_ascii,
+                allow_nan=not cls.strict,
+                # Rendered data never refers back to itself
+                check_circular=False,
+                separators=(',', ':') if cls.compact else (', ', ': '),
+            )
+        return cls._encoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = self.get_encoder().encode(data)
+        ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return ret.encode()
+
+
+class ValuesListMixin:
+    """Serve list pages from ``values()`` rows instead of model instances.
+
+    Each rendered field reads its column, or a SQL expression from the
+    serializer's ``value_expressions``, and converts it with the serializer
+    field's own ``to_representation()``, so the output matches the regular
+    serializer without instantiating a model or a serializer per row. A
+    serializer can adjust a computed field with ``<name>_from_values(value, row)``.
+
+    Enable with ``fast_list = True``. Lists rendering nested serializers or
+    method fields fall back to the regular path.
+    """
+    fast_list = False
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_serializer()
+        plan = self.get_values_plan(serializer) if self.fast_list else None
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        columns, expressions, getters = plan
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if expressions:
+            queryset = queryset.annotate(**expressions)
+        queryset = queryset.values(*columns, *expressions)
+
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else queryset
+        with serialization_timer(request):
+            data = [{name: getter(row) for name, getter in getters} for row in rows]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def get_values_plan(self, serializer):
+        return values_plan(serializer, getattr(self.paginator, 'ordering_field', None))
+
+
+def values_plan(serializer, ordering_field=None):
+    """Return (columns, expressions, getters) for the serializer's rendered
+    fields, or None when a field cannot be read from a values() row
+    """
+    model = serializer.Meta.model
+    concrete = {field.name: field for field in model._meta.concrete_fields}
+    value_expressions = getattr(serializer, 'value_expressions', {})
+    field_sources = getattr(serializer, 'field_sources', {})
+
+    # Pagination cursors are built from the row's ordering key
+    columns = ['id']
+    if ordering_field:
+        columns.append(ordering_field)
+
+    expressions = {}
+    getters = []
+    for field in serializer._readable_fields:
+        name = field.field_name
+        if name in value_expressions:
+            alias = f'_value_{name}'
+            expressions[alias] = value_expressions[name]()
+            columns.extend(source for source in field_sources.get(name, ()) if source not in columns)
+            getters.append((name, _expression_getter(serializer, field, alias)))
+            continue
+
+        model_field = concrete.get(field.source)
+        if model_field is None or isinstance(field, (serializers.BaseSerializer, ManyRelatedField)):
+            return None
+        if isinstance(field, RelatedField) and not isinstance(field, PrimaryKeyRelatedField):
+            return None
+        column = model_field.attname
+        if column not in columns:
+            columns.append(column)
+        getters.append((name, _column_getter(field, column)))
+    return columns, expressions, getters
+
+
+def _column_getter(field, column):
+    to_representation = field.to_representation
+    if isinstance(field, serializers.DateTimeField):
+        to_representation = _datetime_representation(field)
+    if isinstance(field, PrimaryKeyRelatedField):
+        def getter(row):
+            value = row[column]
+            return None if value is None else to_representation(PKOnlyObject(pk=value))
+    else:
+        def getter(row):
+            value = row[column]
+            return None if value is None else to_representation(value)
+    return getter
+
+
+def _expression_getter(serializer, field, alias):
+    to_representation = field.to_representation
+    from_values = getattr(serializer, f'{field.field_name}_from_values', None)
+
+    def getter(row):
+        value = row[alias]
+        if from_values is not None:
+            value = from_values(value, row)
+        return None if value is None else to_representation(value)
+    return getter
+
+
+def _datetime_representation(field):
+    """DateTimeField.to_representation with the output timezone looked up once
+    instead of per value, which dominates the cost of rendering timestamps
+    """
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def to_representation(value):
+        if not value or isinstance(value, str) or timezone.is_naive(value):
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return to_representation
@@ -0,0 +1,188 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import DailySkillHours, Skill
+
+CACHE_KEY = 'tracker:insights:{owner}'
+# When a change was last folded in or an owner's state dropped, so a rebuild
+# that may have missed it is not cached. States live in the default cache,
+# which has to be shared (CACHE_BACKEND) for every worker to see the updates
+CHANGED_KEY = 'tracker:insights:{owner}:changed'
+# Incremental updates are read-modify-write on the cache, so bound how long
+# a lost concurrent update can linger before the state is rebuilt
+CACHE_TIMEOUT = 60 * 15
+# Per-skill hours are only kept for the days the weekly comparison needs
+RECENT_DAYS = 14
+TOP_SKILLS = 5
+
+
+def _cache_key(owner_id):
+    return CACHE_KEY.format(owner=owner_id or 'shared')
+
+
+def _changed_key(owner_id):
+    return CHANGED_KEY.format(owner=owner_id or 'shared')
+
+
+def _build_state(today, owner_id):
+    """Load one owner's per-day totals, and per-skill hours for recent days, from the daily rollup"""
+    built_at = time.time()
+    # Later writes are applied to the cached state as deltas, so it has to
+    # start from the primary rather than a replica that may lag behind
+    rollups = DailySkillHours.objects.using(router.db_for_write(DailySkillHours)).filter(skill__owner_id=owner_id)
+    days = {
+        row['date']: (row['hours'], row['activity_count'])
+        for row in rollups.order_by().values('date').annotate(
+            hours=Sum('hours'), activity_count=Sum('activity_count')
+        )
+    }
+
+    recent = {}
+    since = today - timedelta(days=RECENT_DAYS - 1)
+    for row in rollups.filter(date__gte=since).values('date', 'skill_id', 'hours'):
+        recent.setdefault(row['date'], {})[row['skill_id']] = row['hours']
+
+    return {'days': days, 'recent': recent, 'built_at': built_at}
+
+
+def _get_state(today, owner_id):
+    state = cache.get(_cache_key(owner_id))
+    if state is None:
+        state = _build_state(today, owner_id)
+        # A change that committed while the rollups were read may be missing
+        # from the state and was not folded into it either
+        if (cache.get(_changed_key(owner_id)) or 0) < state['built_at']:
+            cache.set(_cache_key(owner_id), state, CACHE_TIMEOUT)
+    return state
+
+
+def _streaks(active_dates, today):
+    """Current and longest runs of consecutive active days.
+
+    The current streak stays alive until a full day passes without activity,
+    so it still counts when nothing has been logged yet today.
+    """
+    longest = run = 0
+    previous = None
+    for date in sorted(active_dates):
+        run = run + 1 if previous is not None and date - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = date
+
+    current = 0
+    day = today if today in active_dates else today - timedelta(days=1)
+    while day in active_dates:
+        current += 1
+        day -= timedelta(days=1)
+    return current, longest
+
+
+def get_insights(owner_id=None):
+    """Streaks, this week versus last week and the most active skills of one owner"""
+    today = timezone.localdate()
+    state = _get_state(today, owner_id)
+    days = state['days']
+
+    current_streak, longest_streak = _streaks(set(days), today)
+
+    # Weeks are rolling 7-day windows ending today
+    this_week_start = today - timedelta(days=6)
+    last_week_start = today - timedelta(days=13)
+    this_week_hours = last_week_hours = Decimal(0)
+    this_week_activities = 0
+    for date, (hours, count) in days.items():
+        if this_week_start <= date <= today:
+            this_week_hours += hours
+            this_week_activities += count
+        elif last_week_start <= date < this_week_start:
+            last_week_hours += hours
+
+    skill_hours = {}
+    for date, per_skill in state['recent'].items():
+        if this_week_start <= date <= today:
+            for skill_id, hours in per_skill.items():
+                skill_hours[skill_id] = skill_hours.get(skill_id, Decimal(0)) + hours
+    top = sorted(
+        ((skill_id, hours) for skill_id, hours in skill_hours.items() if hours > 0),
+        key=lambda item: (-item[1], item[0])
+    )[:TOP_SKILLS]
+    names = dict(Skill.objects.filter(pk__in=[skill_id for skill_id, _ in top]).values_list('id', 'name'))
+
+    return {
+        'current_streak': current_streak,
+        'longest_streak': longest_streak,
+        'active_days': len(days),
+        'this_week_hours': float(this_week_hours),
+        'last_week_hours': float(last_week_hours),
+        'week_over_week_change': (
+            round(float((this_week_hours - last_week_hours) / last_week_hours * 100), 2)
+            if last_week_hours > 0 else None
+        ),
+        'this_week_activities': this_week_activities,
+        'most_active_skills': [
+            {'id': skill_id, 'name': names[skill_id], 'hours': float(hours)}
+            for skill_id, hours in top if skill_id in names
+        ],
+    }
+
+
+def _apply_changes(changes, owners, recorded_at):
+    by_owner = {}
+    for change in changes:
+        if change[0] in owners:
+            by_owner.setdefault(owners[change[0]], []).append(change)
+
+    since = timezone.localdate() - timedelta(days=RECENT_DAYS - 1)
+    for owner_id, owner_changes in by_owner.items():
+        cache.set(_changed_key(owner_id), time.time(), CACHE_TIMEOUT)
+        state = cache.get(_cache_key(owner_id))
+        if state is None:
+            # Nothing cached yet; the next read builds fresh state
+            continue
+        if state['built_at'] >= recorded_at:
+            # Built after the change was written: it may count it already
+            cache.delete(_cache_key(owner_id))
+            continue
+
+        days, recent = state['days'], state['recent']
+        for skill_id, date, hours, count in owner_changes:
+            hours = Decimal(str(hours))
+            day_hours, day_count = days.get(date, (Decimal(0), 0))
+            day_hours, day_count = day_hours + hours, day_count + count
+            if day_count > 0:
+                days[date] = (day_hours, day_count)
+            else:
+                days.pop(date, None)
+
+            if date >= since:
+                per_skill = recent.setdefault(date, {})
+                per_skill[skill_id] = per_skill.get(skill_id, Decimal(0)) + hours
+                if per_skill[skill_id] <= 0:
+                    del per_skill[skill_id]
+                if not per_skill:
+                    del recent[date]
+
+        cache.set(_cache_key(owner_id), state, CACHE_TIMEOUT)
+
+
+def update_insights(changes, owners, using=None):
+    """Fold signed (skill_id, date, hours, activity count) changes into the
+    cached state of their owners (``owners`` maps skill id to owner id) once
+    the surrounding transaction commits.
+    """
+    changes = list(changes)
+    # The rollups already hold the change, uncommitted, by now
+    recorded_at = time.time()
+    transaction.on_commit(lambda: _apply_changes(changes, owners, recorded_at), using=using)
+
+
+def invalidate_insights(owner_id=None):
+    """Drop one owner's cached state, for changes that bypass update_insights()"""
+    cache.set(_changed_key(owner_id), time.time(), CACHE_TIMEOUT)
+    cache.delete(_cache_key(owner_id))
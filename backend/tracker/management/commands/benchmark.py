@@ -0,0 +1,209 @@
+import json
+import math
+import random
+import statistics
+import time
+from contextlib import ExitStack
+from urllib.parse import quote
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.utils import timezone
+from rest_framework.settings import api_settings
+
+from tracker.models import LearningActivity, Skill
+
+SEARCH_TERMS = ['react', 'docker', 'python data', 'machine learning', 'kubernets', 'postgres performance']
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the main API endpoints and report p50/p95 latency and query counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30, help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per scenario')
+        parser.add_argument('--only', default='', help='Comma-separated scenario names to run')
+        parser.add_argument('--label', default='', help='Name stored with the results')
+        parser.add_argument('--output', help='Write the results to this JSON file')
+        parser.add_argument('--compare', help='Print the change against an earlier JSON results file')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for ids and search terms')
+        parser.add_argument('--owner', help='Username to send requests as; by default anonymous, on the shared data')
+
+    def handle(self, *args, **options):
+        owner = None
+        if options['owner']:
+            owner = User.objects.filter(username=options['owner']).first()
+            if owner is None:
+                raise CommandError(f'No user named "{options["owner"]}"')
+        skill_ids = list(Skill.objects.filter(owner=owner).values_list('id', flat=True))
+        if not skill_ids:
+            raise CommandError('No skills found; load data first with "manage.py generate_data"')
+        self.rng = random.Random(options['seed'])
+        self.skill_ids = skill_ids
+        self.client = Client(HTTP_HOST='localhost')
+        if owner is not None:
+            self.client.force_login(owner)
+        self.created = []
+
+        scenarios = self.get_scenarios()
+        only = {name.strip() for name in options['only'].split(',') if name.strip()}
+        if only:
+            unknown = only - {name for name, _ in scenarios}
+            if unknown:
+                raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+            scenarios = [(name, scenario) for name, scenario in scenarios if name in only]
+
+        results = {}
+        # Keeps the throttle's bookkeeping in the timings without it refusing requests
+        throttle = override_settings(THROTTLE_BURST=10 ** 9)
+        throttle.enable()
+        try:
+            for name, scenario in scenarios:
+                for _ in range(options['warmup']):
+                    scenario()
+                results[name] = self.measure(scenario, options['iterations'])
+                self.stdout.write(self.format_row(name, results[name]))
+        finally:
+            throttle.disable()
+            # Remove anything the write scenarios left behind
+            for activity in LearningActivity.objects.filter(pk__in=self.created):
+                activity.delete()
+
+        report = {
+            'label': options['label'],
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'dataset': {
+                'skills': len(skill_ids),
+                'activities': LearningActivity.objects.filter(owner=owner).count(),
+            },
+            'iterations': options['iterations'],
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {options["output"]}'))
+        if options['compare']:
+            self.compare(report, options['compare'])
+
+    def measure(self, scenario, iterations):
+        timings, queries, errors = [], [], 0
+        for _ in range(iterations):
+            counter = QueryCounter()
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(counter))
+                start = time.perf_counter()
+                response = scenario()
+                elapsed = time.perf_counter() - start
+            timings.append(elapsed * 1000)
+            queries.append(counter.count)
+            if response.status_code >= 400:
+                errors += 1
+        return {
+            'p50_ms': round(percentile(timings, 0.5), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'mean_ms': round(statistics.fmean(timings), 2),
+            'max_ms': round(max(timings), 2),
+            'queries': percentile(queries, 0.5),
+            'max_queries': max(queries),
+            'errors': errors,
+        }
+
+    def format_row(self, name, result):
+        row = (f'{name:<22} p50 {result["p50_ms"]:>8.2f} ms  p95 {result["p95_ms"]:>8.2f} ms  '
+               f'queries {result["queries"]:>3}')
+        if result['errors']:
+            return self.style.ERROR(f'{row}  errors {result["errors"]}')
+        return row
+
+    def compare(self, report, path):
+        with open(path) as handle:
+            baseline = json.load(handle)
+        self.stdout.write(f'\nChange against {path} ({baseline.get("label") or "unlabelled"}):')
+        for name, result in report['results'].items():
+            before = baseline['results'].get(name)
+            if before is None:
+                continue
+            changes = []
+            for key in ('p50_ms', 'p95_ms'):
+                delta = (result[key] - before[key]) / before[key] * 100 if before[key] else 0
+                changes.append(f'{key[:3]} {delta:+6.1f}%')
+            query_delta = result['queries'] - before['queries']
+            changes.append(f'queries {query_delta:+d}')
+            self.stdout.write(f'{name:<22} ' + '  '.join(changes))
+
+    # Scenarios
+
+    def get(self, path):
+        # secure=True keeps SECURE_SSL_REDIRECT from answering with a redirect
+        return self.client.get(path, secure=True)
+
+    def send(self, method, path, data=None):
+        return getattr(self.client, method)(
+            path, data=json.dumps(data) if data is not None else None,
+            content_type='application/json', secure=True,
+        )
+
+    def get_scenarios(self):
+        last_page = max(math.ceil(len(self.skill_ids) / api_settings.PAGE_SIZE), 1)
+        return [
+            ('skills_list', lambda: self.get('/api/skills/')),
+            ('skills_list_last_page', lambda: self.get(f'/api/skills/?page={last_page}')),
+            ('skills_cursor', lambda: self.get('/api/skills/?pagination=cursor')),
+            ('skill_detail', lambda: self.get(f'/api/skills/{self.rng.choice(self.skill_ids)}/')),
+            ('skills_search', lambda: self.get(f'/api/skills/?search={quote(self.rng.choice(SEARCH_TERMS))}')),
+            ('skills_stats', lambda: self.get('/api/skills/stats/')),
+            ('activities_list', lambda: self.get('/api/activities/')),
+            ('activities_by_skill', lambda: self.get(f'/api/activities/?skill={self.rng.choice(self.skill_ids)}')),
+            ('activities_timeseries', lambda: self.get('/api/activities/timeseries/?bucket=week')),
+            ('activities_insights', lambda: self.get('/api/activities/insights/')),
+            ('activity_create', self.create_activity),
+            ('activity_update', self.update_activity),
+            ('activity_delete', self.delete_activity),
+        ]
+
+    def create_activity(self):
+        response = self.send('post', '/api/activities/', {
+            'skill': self.rng.choice(self.skill_ids),
+            'date': timezone.localdate().isoformat(),
+            'hours_spent': '1.25',
+            'notes': 'benchmark',
+        })
+        if response.status_code == 201:
+            self.created.append(response.json()['id'])
+        return response
+
+    def _created_activity(self):
+        if not self.created:
+            self.create_activity()
+        return self.created[-1]
+
+    def update_activity(self):
+        activity_id = self._created_activity()
+        return self.send('patch', f'/api/activities/{activity_id}/', {'hours_spent': '0.75'})
+
+    def delete_activity(self):
+        activity_id = self._created_activity()
+        response = self.send('delete', f'/api/activities/{activity_id}/')
+        if response.status_code == 204:
+            self.created.pop()
+        return response
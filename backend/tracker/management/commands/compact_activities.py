@@ -0,0 +1,104 @@
+import time
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from tracker.models import ArchivedActivity, LearningActivity, MonthlySkillHours, Skill
+
+
+def months_before(day, months):
+    """First day of the month ``months`` months before ``day``'s month"""
+    index = day.year * 12 + day.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class Command(BaseCommand):
+    help = ('Move activities older than the archive horizon into ArchivedActivity '
+            'and their hours into per-skill monthly totals')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=settings.ACTIVITY_ARCHIVE_MONTHS,
+                            help='Keep this many whole months of activities live (default: ACTIVITY_ARCHIVE_MONTHS)')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Activities archived per transaction')
+        parser.add_argument('--skill-chunk', type=int, default=500,
+                            help='Skills whose activities are looked up together')
+        parser.add_argument('--pause', type=float, default=0,
+                            help='Seconds to sleep between transactions')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report what would be archived without writing')
+
+    def handle(self, *args, **options):
+        if options['months'] < 1:
+            raise CommandError('--months must be at least 1')
+        # Whole months only, so a month's total is final once it is written
+        cutoff = months_before(timezone.localdate(), options['months'])
+
+        if options['dry_run']:
+            totals = LearningActivity.objects.filter(date__lt=cutoff).aggregate(
+                activities=Count('id'), hours=Sum('hours_spent')
+            )
+            self.stdout.write(
+                f'Would archive {totals["activities"]} activities ({totals["hours"] or 0}h) dated before {cutoff}'
+            )
+            return
+
+        archived = 0
+        last_id = 0
+        while True:
+            skill_ids = list(
+                Skill.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:options['skill_chunk']]
+            )
+            if not skill_ids:
+                break
+            last_id = skill_ids[-1]
+
+            # Archived rows leave the live table, so each batch starts from the top again
+            while count := self.archive_batch(skill_ids, cutoff, options['batch_size']):
+                archived += count
+                if options['pause']:
+                    time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} activities dated before {cutoff}'))
+
+    @transaction.atomic
+    def archive_batch(self, skill_ids, cutoff, batch_size):
+        """Archive up to ``batch_size`` old activities of the given skills; returns how many"""
+        # Only these rows are locked; writers to the rest of the table carry on
+        activities = list(
+            LearningActivity.objects.select_for_update()
+            .filter(skill_id__in=skill_ids, date__lt=cutoff)
+            .order_by()[:batch_size]
+        )
+        if not activities:
+            return 0
+
+        now = timezone.now()
+        ArchivedActivity.objects.bulk_create([
+            ArchivedActivity(
+                id=activity.pk, skill_id=activity.skill_id, owner_id=activity.owner_id, date=activity.date,
+                hours_spent=activity.hours_spent, notes=activity.notes,
+                created_at=activity.created_at, updated_at=activity.updated_at, archived_at=now,
+            )
+            for activity in activities
+        ])
+        monthly = defaultdict(lambda: [Decimal(0), 0])
+        for activity in activities:
+            totals = monthly[(activity.skill_id, activity.date.replace(day=1))]
+            totals[0] += activity.hours_spent
+            totals[1] += 1
+        MonthlySkillHours.apply_deltas(
+            [(skill_id, month, hours, count) for (skill_id, month), (hours, count) in sorted(monthly.items())]
+        )
+        # A move rather than a deletion: skill hours and the daily rollups already count these
+        # activities, and clients that synced them keep them, so no deltas or tombstones
+        LearningActivity.objects.filter(pk__in=[activity.pk for activity in activities]).delete(
+            apply_rollups=False, tombstones=False
+        )
+        return len(activities)
@@ -0,0 +1,205 @@
+import random
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from tracker.categorization import categorize
+from tracker.insights import invalidate_insights
+from tracker.models import LearningActivity, Skill, Tag, parse_tags
+from tracker.stats import schedule_stats_refresh
+
+# (topic, tags) pairs skill names and tags are drawn from
+TOPICS = [
+    ('React', 'javascript, react, frontend'),
+    ('Vue.js', 'javascript, vue, frontend'),
+    ('TypeScript', 'typescript, javascript, programming'),
+    ('CSS Grid and Flexbox', 'css, frontend, web-design'),
+    ('Django REST Framework', 'python, django, backend, api'),
+    ('Node.js and Express', 'javascript, node, backend'),
+    ('Spring Boot', 'java, spring, backend'),
+    ('Go Concurrency', 'go, programming, backend'),
+    ('Rust Ownership', 'rust, programming'),
+    ('PostgreSQL Performance', 'sql, postgresql, database'),
+    ('MongoDB Data Modeling', 'mongodb, nosql, database'),
+    ('Redis Caching', 'redis, database, backend'),
+    ('Flutter Apps', 'flutter, mobile, dart'),
+    ('SwiftUI', 'swift, ios, mobile'),
+    ('Kotlin for Android', 'kotlin, android, mobile'),
+    ('Docker', 'docker, devops, deployment'),
+    ('Kubernetes', 'kubernetes, devops, cloud'),
+    ('AWS Solutions Architect', 'aws, cloud, certification'),
+    ('Terraform', 'terraform, devops, cloud'),
+    ('Pandas Data Analysis', 'python, pandas, data-science'),
+    ('Machine Learning', 'python, machine learning, scikit'),
+    ('Deep Learning with PyTorch', 'python, pytorch, machine learning'),
+    ('Statistics for Data Science', 'statistics, data-science'),
+    ('Tableau Dashboards', 'tableau, visualization, analytics'),
+    ('Pytest', 'python, testing, pytest'),
+    ('Cypress End-to-End Testing', 'javascript, testing, cypress'),
+    ('Figma Prototyping', 'figma, design, ui/ux'),
+    ('Agile and Scrum', 'agile, scrum, management'),
+    ('Product Strategy', 'business, strategy'),
+    ('Public Speaking', 'communication, leadership'),
+]
+
+LEVELS = ['Fundamentals', 'Crash Course', 'Deep Dive', 'Masterclass', 'for Beginners', 'Advanced Patterns', 'Bootcamp']
+
+# Relative weights, roughly the shape of real usage
+PLATFORM_WEIGHTS = {
+    'udemy': 30, 'youtube': 28, 'coursera': 12, 'linkedin': 6, 'pluralsight': 5,
+    'edx': 4, 'codecademy': 4, 'freecodecamp': 6, 'other': 5,
+}
+RESOURCE_TYPE_WEIGHTS = {
+    'course': 40, 'video': 25, 'tutorial': 15, 'article': 10, 'book': 6, 'certification': 4,
+}
+# Monday first; people log less at the end of the week and more on Sunday
+WEEKDAY_WEIGHTS = [16, 16, 15, 14, 11, 12, 16]
+MAX_ACTIVITY_HOURS = 12
+ACTIVITY_NOTES = ['', '', '', 'Watched lectures', 'Worked through exercises', 'Built a small project',
+                  'Reviewed notes', 'Read documentation', 'Practice problems']
+
+
+class Command(BaseCommand):
+    help = 'Bulk-load synthetic skills and activities for load and performance testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skills', type=int, default=1000, help='Number of skills to create')
+        parser.add_argument('--activities', type=int, default=100000, help='Number of activities to create')
+        parser.add_argument('--days', type=int, default=730, help='How many days of history to spread activities over')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows inserted per query')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed, for reproducible datasets')
+        parser.add_argument('--owner', help='Username the data belongs to; by default the shared, ownerless data')
+        parser.add_argument('--clear', action='store_true', help="Delete the owner's skills and activities first")
+
+    def handle(self, *args, **options):
+        if options['skills'] < 1 or options['activities'] < 0 or options['days'] < 1:
+            raise CommandError('--skills and --days must be positive and --activities not negative')
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        today = timezone.localdate()
+        owner = None
+        if options['owner']:
+            owner = User.objects.filter(username=options['owner']).first()
+            if owner is None:
+                raise CommandError(f'No user named "{options["owner"]}"')
+        owner_id = owner.pk if owner else None
+
+        if options['clear']:
+            self.stdout.write('Deleting existing data...')
+            # The skills and their rollups go next, so there are no totals to adjust
+            LearningActivity.objects.filter(owner_id=owner_id).delete(apply_rollups=False)
+            Skill.objects.filter(owner_id=owner_id).delete()
+
+        skills = self.create_skills(rng, options['skills'], options['days'], batch_size, owner_id)
+        self.stdout.write(f'Created {len(skills)} skills')
+
+        changes = self.create_activities(rng, skills, options['activities'], today, batch_size)
+        self.stdout.write('Updating skill hours and daily rollups...')
+
+        # Roll the inserted hours into skill totals and the daily rollup in one pass
+        with transaction.atomic():
+            LearningActivity.apply_rollups(changes)
+            schedule_stats_refresh(owner_id)
+        invalidate_insights(owner_id)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(skills)} skills and {options["activities"]} activities'
+        ))
+
+    def create_skills(self, rng, count, days, batch_size, owner_id):
+        platforms, platform_weights = zip(*PLATFORM_WEIGHTS.items())
+        resource_types, resource_type_weights = zip(*RESOURCE_TYPE_WEIGHTS.items())
+        now = timezone.now()
+
+        skills = []
+        for index in range(count):
+            topic, tags = rng.choice(TOPICS)
+            name = f'{topic} {rng.choice(LEVELS)}'
+            description = f'Learning {topic} through a {rng.choice(LEVELS).lower()} resource'
+            estimated_hours = rng.choice([0, 5, 10, 15, 20, 30, 40, 60, 80, 120])
+            skill = Skill(
+                owner_id=owner_id,
+                name=name,
+                description=description,
+                resource_type=rng.choices(resource_types, resource_type_weights)[0],
+                platform=rng.choices(platforms, platform_weights)[0],
+                difficulty=rng.choices([1, 2, 3, 4], [35, 35, 20, 10])[0],
+                estimated_hours=estimated_hours,
+                status=rng.choices(['not_started', 'paused'], [9, 1])[0],
+                tags=tags,
+            )
+            skill.category, _ = categorize(skill.name, skill.description, skill.tags)
+            skills.append(skill)
+
+        with transaction.atomic():
+            skills = Skill.objects.bulk_create(skills, batch_size=batch_size)
+            # auto_now_add ignores explicit values, so spread creation dates afterwards
+            for skill in skills:
+                skill.created_at = now - timedelta(days=rng.randrange(days), seconds=rng.randrange(86400))
+            Skill.objects.bulk_update(skills, ['created_at'], batch_size=batch_size)
+            self.create_tags(skills, batch_size)
+        return skills
+
+    def create_tags(self, skills, batch_size):
+        names = {skill.pk: parse_tags(skill.tags) for skill in skills}
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in {name for tags in names.values() for name in tags}],
+            ignore_conflicts=True,
+        )
+        tag_ids = dict(Tag.objects.values_list('name', 'id'))
+        SkillTag = Skill.tag_set.through
+        SkillTag.objects.bulk_create(
+            [SkillTag(skill_id=skill_id, tag_id=tag_ids[name]) for skill_id, tags in names.items() for name in tags],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+    def create_activities(self, rng, skills, count, today, batch_size):
+        """Insert activities in batches and return their merged rollup changes"""
+        # A few skills get most of the attention
+        weights = [rng.paretovariate(1.5) for _ in skills]
+        weekdays = range(7)
+        # Keep every skill's total within what Skill.hours_spent can store
+        hours_field = Skill._meta.get_field('hours_spent')
+        capacity = Decimal(10) ** (hours_field.max_digits - hours_field.decimal_places) - MAX_ACTIVITY_HOURS
+        hours_left = {skill.pk: capacity for skill in skills}
+        open_skills = list(skills)
+        totals = defaultdict(lambda: [Decimal(0), 0])
+        created = 0
+        while created < count:
+            batch = []
+            for skill in rng.choices(skills, weights, k=min(batch_size, count - created)):
+                if hours_left[skill.pk] <= 0:
+                    if not open_skills:
+                        raise CommandError('Too many activities for the number of skills; raise --skills')
+                    skill = rng.choice(open_skills)
+                # Between the day the skill was added and today, busier recently
+                age = (today - skill.created_at.date()).days
+                date = today - timedelta(days=int(rng.triangular(0, age + 1, 0)))
+                if rng.random() < 0.3:
+                    # Nudge towards the days of the week people actually study on
+                    shift = (date.weekday() - rng.choices(weekdays, WEEKDAY_WEIGHTS)[0]) % 7
+                    date = max(date - timedelta(days=shift), skill.created_at.date())
+                hours = min(max(round(rng.lognormvariate(0.2, 0.6) * 4) / 4, 0.25), MAX_ACTIVITY_HOURS)
+                hours = Decimal(hours).quantize(Decimal('0.01'))
+                hours_left[skill.pk] -= hours
+                if hours_left[skill.pk] <= 0:
+                    open_skills.remove(skill)
+                batch.append(LearningActivity(
+                    skill_id=skill.pk, owner_id=skill.owner_id, date=date, hours_spent=hours, notes=rng.choice(ACTIVITY_NOTES)
+                ))
+                entry = totals[(skill.pk, date)]
+                entry[0] += hours
+                entry[1] += 1
+
+            LearningActivity.objects.bulk_create(batch, batch_size=batch_size)
+            created += len(batch)
+            self.stdout.write(f'  {created}/{count} activities', ending='\r')
+        if count:
+            self.stdout.write('')
+        return [(skill_id, date, hours, activity_count) for (skill_id, date), (hours, activity_count) in totals.items()]
@@ -0,0 +1,148 @@
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tracker.models import Skill
+
+from .benchmark import percentile
+
+# Each sync endpoint next to its async counterpart; {skill} is a random skill id
+DEFAULT_PATHS = [
+    '/api/skills/',
+    '/api/async/skills/',
+    '/api/skills/{skill}/',
+    '/api/async/skills/{skill}/',
+    '/api/skills/stats/',
+    '/api/async/skills/stats/',
+    '/api/activities/',
+    '/api/async/activities/',
+]
+
+
+class Command(BaseCommand):
+    help = 'Load a running server with concurrent clients and report throughput and latency per path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the running server')
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds to load each path for')
+        parser.add_argument('--path', action='append', dest='paths', help='Path to load; repeat for several')
+        parser.add_argument('--timeout', type=float, default=30, help='Seconds before a request counts as failed')
+        parser.add_argument('--label', default='', help='Name stored with the results, e.g. the server setup')
+        parser.add_argument('--output', help='Write the results to this JSON file')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for skill ids')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme not in ('http', 'https') or not url.hostname:
+            raise CommandError('--url must be an http(s) URL')
+        if options['concurrency'] < 1 or options['duration'] <= 0:
+            raise CommandError('--concurrency and --duration must be positive')
+        self.url = url
+        self.timeout = options['timeout']
+        # Requests are anonymous, so they only see the shared, ownerless skills
+        self.skill_ids = list(Skill.objects.filter(owner=None).values_list('id', flat=True))
+        if not self.skill_ids:
+            raise CommandError('No shared skills found; load data first with "manage.py generate_data"')
+        self.rng = random.Random(options['seed'])
+        self.rng_lock = threading.Lock()
+
+        results = {}
+        for path in options['paths'] or DEFAULT_PATHS:
+            results[path] = self.load(path, options['concurrency'], options['duration'])
+            self.stdout.write(self.format_row(path, results[path]))
+
+        if options['output']:
+            report = {
+                'label': options['label'],
+                'created_at': timezone.now().isoformat(),
+                'url': options['url'],
+                'concurrency': options['concurrency'],
+                'duration': options['duration'],
+                'results': results,
+            }
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {options["output"]}'))
+
+    def load(self, path, concurrency, duration):
+        start = time.perf_counter()
+        deadline = start + duration
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            workers = [executor.submit(self.client, path, deadline) for _ in range(concurrency)]
+            outcomes = [worker.result() for worker in workers]
+        elapsed = time.perf_counter() - start
+
+        timings = [timing for worker_timings, _ in outcomes for timing in worker_timings]
+        errors = sum(worker_errors for _, worker_errors in outcomes)
+        if not timings:
+            return {'requests': 0, 'errors': errors, 'rps': 0}
+        return {
+            'requests': len(timings),
+            'errors': errors,
+            'rps': round(len(timings) / elapsed, 1),
+            'p50_ms': round(percentile(timings, 0.5), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'p99_ms': round(percentile(timings, 0.99), 2),
+            'mean_ms': round(statistics.fmean(timings), 2),
+        }
+
+    def client(self, path, deadline):
+        """One client sending requests back to back over a keep-alive connection"""
+        connection_class = http.client.HTTPSConnection if self.url.scheme == 'https' else http.client.HTTPConnection
+        connection = None
+        timings, errors = [], 0
+        headers = {
+            'Accept': 'application/json',
+            # Keeps SECURE_SSL_REDIRECT from answering plain HTTP with a redirect
+            'X-Forwarded-Proto': 'https',
+        }
+        while time.perf_counter() < deadline:
+            if connection is None:
+                connection = connection_class(self.url.hostname, self.url.port, timeout=self.timeout)
+            target = self.url.path.rstrip('/') + self.expand(path)
+            start = time.perf_counter()
+            try:
+                connection.request('GET', target, headers=headers)
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                connection.close()
+                connection = None
+                continue
+            elapsed = time.perf_counter() - start
+            if response.status >= 400:
+                errors += 1
+            else:
+                timings.append(elapsed * 1000)
+            if response.will_close:
+                connection.close()
+                connection = None
+        if connection is not None:
+            connection.close()
+        return timings, errors
+
+    def expand(self, path):
+        if '{skill}' not in path:
+            return path
+        with self.rng_lock:
+            skill_id = self.rng.choice(self.skill_ids)
+        return path.replace('{skill}', str(skill_id))
+
+    def format_row(self, path, result):
+        if not result['requests']:
+            return self.style.ERROR(f'{path:<32} no successful requests, errors {result["errors"]}')
+        row = (f'{path:<32} {result["rps"]:>8.1f} req/s  p50 {result["p50_ms"]:>8.2f} ms  '
+               f'p95 {result["p95_ms"]:>8.2f} ms  p99 {result["p99_ms"]:>8.2f} ms')
+        if result['errors']:
+            return self.style.ERROR(f'{row}  errors {result["errors"]}')
+        return row
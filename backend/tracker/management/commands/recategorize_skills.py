@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from tracker.categorization import categorize
+from tracker.models import Skill
+from tracker.stats import schedule_stats_refresh
+
+
+class Command(BaseCommand):
+    help = 'Re-run auto-categorization over every skill, e.g. after the keyword lists change'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Number of skills categorized per transaction')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report changes without writing them')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        dry_run = options['dry_run']
+        checked = changed = 0
+        last_id = 0
+
+        while True:
+            with transaction.atomic():
+                skills = list(
+                    Skill.objects.select_for_update()
+                    .filter(pk__gt=last_id)
+                    .order_by('pk')
+                    .only('id', 'owner_id', 'name', 'description', 'tags', 'category', 'updated_at')[:chunk_size]
+                )
+                if not skills:
+                    break
+                last_id = skills[-1].pk
+
+                recategorized = []
+                for skill in skills:
+                    category, _ = categorize(skill.name, skill.description, skill.tags)
+                    if category == skill.category:
+                        continue
+                    self.stdout.write(f'Skill {skill.pk}: {skill.category} -> {category}')
+                    skill.category = category
+                    # Lets list ETags and delta syncs see the change
+                    skill.updated_at = timezone.now()
+                    recategorized.append(skill)
+
+                if recategorized and not dry_run:
+                    Skill.objects.bulk_update(recategorized, ['category', 'updated_at'])
+                    for owner_id in {skill.owner_id for skill in recategorized}:
+                        schedule_stats_refresh(owner_id)
+
+            checked += len(skills)
+            changed += len(recategorized)
+
+        action = 'Found' if dry_run else 'Recategorized'
+        self.stdout.write(self.style.SUCCESS(f'{action} {changed} of {checked} skills'))
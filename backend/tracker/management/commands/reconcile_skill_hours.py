@@ -0,0 +1,118 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from tracker.insights import invalidate_insights
+from tracker.models import ArchivedActivity, DailySkillHours, LearningActivity, MonthlySkillHours, Skill
+from tracker.stats import schedule_stats_refresh
+
+
+class Command(BaseCommand):
+    help = 'Find and repair skill hours and daily rollups that have drifted from their activities'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Number of skills checked per transaction')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report drift without writing any changes')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        dry_run = options['dry_run']
+        checked = repaired = repaired_daily = 0
+        last_id = 0
+        # Owners whose cached insights are stale after repairing their daily rollups
+        stale_owners = set()
+
+        while True:
+            with transaction.atomic():
+                # Lock the chunk so concurrent deltas queue up behind the repair
+                skills = list(
+                    Skill.objects.select_for_update()
+                    .filter(pk__gt=last_id)
+                    .order_by('pk')
+                    .only('id', 'owner_id', 'hours_spent', 'status', 'estimated_hours')[:chunk_size]
+                )
+                if not skills:
+                    break
+                last_id = skills[-1].pk
+
+                # Live activities plus the monthly totals of archived ones
+                totals = defaultdict(Decimal)
+                for model, field in ((LearningActivity, 'hours_spent'), (MonthlySkillHours, 'hours')):
+                    for skill_id, total in (model.objects.filter(skill_id__in=[skill.pk for skill in skills])
+                                            .order_by()
+                                            .values_list('skill_id')
+                                            .annotate(total=Sum(field))):
+                        totals[skill_id] += total
+
+                drifted = []
+                for skill in skills:
+                    total = Decimal(totals.get(skill.pk) or 0).quantize(Decimal('0.01'))
+                    if Decimal(skill.hours_spent).quantize(Decimal('0.01')) == total:
+                        continue
+                    self.stdout.write(f'Skill {skill.pk}: {skill.hours_spent} -> {total}')
+                    skill.hours_spent = total
+                    skill.status = skill.status_for_hours(total)
+                    skill.updated_at = timezone.now()
+                    drifted.append(skill)
+
+                if drifted and not dry_run:
+                    Skill.objects.bulk_update(drifted, ['hours_spent', 'status', 'updated_at'])
+                    for owner_id in {skill.owner_id for skill in drifted}:
+                        schedule_stats_refresh(owner_id)
+
+                drifted_daily = set(self.reconcile_daily_hours([skill.pk for skill in skills], dry_run))
+                stale_owners.update(skill.owner_id for skill in skills if skill.pk in drifted_daily)
+                repaired_daily += len(drifted_daily)
+
+            checked += len(skills)
+            repaired += len(drifted)
+
+        if not dry_run:
+            for owner_id in stale_owners:
+                invalidate_insights(owner_id)
+
+        action = 'Found' if dry_run else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {repaired} drifted of {checked} skills '
+            f'and {repaired_daily} skills with drifted daily rollups'
+        ))
+
+    def reconcile_daily_hours(self, skill_ids, dry_run):
+        """Rebuild the daily rollup rows of any skill in the chunk that drifted, and return their ids"""
+        # Archived activities keep their days in the rollup
+        expected = defaultdict(lambda: defaultdict(lambda: [Decimal(0), 0]))
+        for model in (LearningActivity, ArchivedActivity):
+            for row in (model.objects.filter(skill_id__in=skill_ids).order_by()
+                        .values('skill_id', 'date')
+                        .annotate(hours=Sum('hours_spent'), activity_count=Count('id'))):
+                day = expected[row['skill_id']][row['date']]
+                day[0] += Decimal(row['hours'])
+                day[1] += row['activity_count']
+        expected = {
+            skill_id: {date: (hours.quantize(Decimal('0.01')), count) for date, (hours, count) in days.items()}
+            for skill_id, days in expected.items()
+        }
+        actual = defaultdict(dict)
+        for row in (DailySkillHours.objects.filter(skill_id__in=skill_ids)
+                    .values('skill_id', 'date', 'hours', 'activity_count')):
+            actual[row['skill_id']][row['date']] = (
+                Decimal(row['hours']).quantize(Decimal('0.01')), row['activity_count']
+            )
+
+        drifted = [skill_id for skill_id in skill_ids if expected.get(skill_id, {}) != actual[skill_id]]
+        if drifted and not dry_run:
+            DailySkillHours.objects.filter(skill_id__in=drifted).delete()
+            DailySkillHours.objects.bulk_create([
+                DailySkillHours(skill_id=skill_id, date=date, hours=hours, activity_count=count)
+                for skill_id in drifted
+                for date, (hours, count) in expected.get(skill_id, {}).items()
+            ])
+        for skill_id in drifted:
+            self.stdout.write(f'Skill {skill_id}: daily rollup drifted')
+        return drifted
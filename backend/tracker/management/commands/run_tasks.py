@@ -0,0 +1,54 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from tracker.tasks import LEASE_SECONDS, MAX_ATTEMPTS, claim_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Run the jobs queued with BACKGROUND_TASKS on, until stopped'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once no job is due instead of waiting for more')
+        parser.add_argument('--batch-size', type=int, default=10,
+                            help='Jobs claimed at a time')
+        parser.add_argument('--poll', type=float, default=1,
+                            help='Seconds to wait before looking again when no job is due')
+        parser.add_argument('--lease', type=int, default=LEASE_SECONDS,
+                            help='Seconds a job may run before other workers take it over')
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS,
+                            help='Attempts before a job is marked failed')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['max_attempts'] < 1:
+            raise CommandError('--batch-size and --max-attempts must be at least 1')
+        self.stopping = False
+        # Finish the jobs already claimed, then exit
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self.stop)
+
+        succeeded = failed = 0
+        while not self.stopping:
+            # Long-running: drop connections the database has closed or that outlived CONN_MAX_AGE
+            close_old_connections()
+            jobs = claim_jobs(options['batch_size'], lease=options['lease'])
+            if not jobs:
+                if options['once']:
+                    break
+                time.sleep(options['poll'])
+                continue
+            for job in jobs:
+                if run_job(job, max_attempts=options['max_attempts']):
+                    succeeded += 1
+                else:
+                    failed += 1
+                    self.stderr.write(f'Job {job.pk} ({job.name}) failed on attempt {job.attempts}')
+
+        close_old_connections()
+        self.stdout.write(self.style.SUCCESS(f'Ran {succeeded} jobs, {failed} failed'))
+
+    def stop(self, signum, frame):
+        self.stopping = True
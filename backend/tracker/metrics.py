@@ -0,0 +1,199 @@
+import logging
+import threading
+import time
+import traceback
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+slow_query_logger = logging.getLogger('tracker.slow_queries')
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Counter:
+    metric_type = 'counter'
+
+    def __init__(self, name, documentation, labels):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            yield self.name, self._format_labels(label_values), value
+
+    def _format_labels(self, label_values, **extra):
+        pairs = list(zip(self.labels, label_values)) + list(extra.items())
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Histogram(Counter):
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, labels, buckets):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, label_values, value):
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [[0] * len(self.buckets), 0, 0.0]
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def samples(self):
+        with self._lock:
+            values = {key: (list(counts), count, total) for key, (counts, count, total) in self._values.items()}
+        for label_values, (counts, count, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f'{self.name}_bucket', self._format_labels(label_values, le=bound), cumulative
+            yield f'{self.name}_bucket', self._format_labels(label_values, le='+Inf'), count
+            yield f'{self.name}_count', self._format_labels(label_values), count
+            yield f'{self.name}_sum', self._format_labels(label_values), total
+
+
+REQUESTS = Counter(
+    'skillstack_http_requests_total', 'HTTP requests handled.', ('view', 'method', 'status'))
+REQUEST_DURATION = Histogram(
+    'skillstack_http_request_duration_seconds', 'Time to produce a response.',
+    ('view', 'method'), DURATION_BUCKETS)
+REQUEST_DB_DURATION = Histogram(
+    'skillstack_http_request_db_duration_seconds', 'Time spent executing SQL per request.',
+    ('view', 'method'), DURATION_BUCKETS)
+REQUEST_SERIALIZE_DURATION = Histogram(
+    'skillstack_http_request_serialization_duration_seconds', 'Time spent turning rows into response data.',
+    ('view', 'method'), DURATION_BUCKETS)
+REQUEST_RENDER_DURATION = Histogram(
+    'skillstack_http_request_render_duration_seconds', 'Time spent rendering the response body.',
+    ('view', 'method'), DURATION_BUCKETS)
+REQUEST_QUERIES = Histogram(
+    'skillstack_http_request_queries', 'SQL queries executed per request.',
+    ('view', 'method'), QUERY_COUNT_BUCKETS)
+SLOW_QUERIES = Counter(
+    'skillstack_slow_queries_total', 'Queries slower than SLOW_QUERY_MS.', ('view',))
+
+REGISTRY = [
+    REQUESTS, REQUEST_DURATION, REQUEST_DB_DURATION, REQUEST_SERIALIZE_DURATION, REQUEST_RENDER_DURATION,
+    REQUEST_QUERIES, SLOW_QUERIES,
+]
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def render_metrics():
+    """The registry in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.metric_type}')
+        for name, labels, value in metric.samples():
+            lines.append(f'{name}{labels} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; requires ``Authorization: Bearer <METRICS_TOKEN>``,
+    and without a token is only served with DEBUG on
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse(status=404)
+    elif not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+_APP_ROOT = str(Path(__file__).resolve().parent.parent)
+_THIS_FILE = str(Path(__file__).resolve())
+
+
+def _call_site():
+    """The innermost project frame outside this module that led to a query"""
+    for frame in reversed(traceback.extract_stack()):
+        filename = frame.filename
+        if filename.startswith(_APP_ROOT) and filename != _THIS_FILE and 'site-packages' not in filename:
+            return f'{filename[len(_APP_ROOT) + 1:]}:{frame.lineno} in {frame.name}'
+    return 'unknown'
+
+
+@contextmanager
+def serialization_timer(request):
+    """Count the time spent in the block as ``request``'s serialization time.
+
+    Serializers nested in a timed one do not count a second time.
+    """
+    request = getattr(request, '_request', request)
+    if request is None or getattr(request, '_serializing', False):
+        yield
+        return
+    request._serializing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        request._serializing = False
+        request._serialize_duration = getattr(request, '_serialize_duration', 0.0) + time.perf_counter() - start
+
+
+def view_label(request):
+    """Metric label for the view that handled a request, bounded to named routes"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route or 'unnamed'
+
+
+class QueryRecorder:
+    """Database execute wrapper that counts and times the queries of one request"""
+
+    def __init__(self, request):
+        self.request = request
+        self.count = 0
+        self.duration = 0.0
+        self.slow_threshold = settings.SLOW_QUERY_MS / 1000
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if self.slow_threshold and elapsed >= self.slow_threshold:
+                view = view_label(self.request)
+                SLOW_QUERIES.inc((view,))
+                slow_query_logger.warning(
+                    'Slow query (%.1f ms) in %s at %s: %s', elapsed * 1000, view, _call_site(), sql
+                )
@@ -0,0 +1,170 @@
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .metrics import (
+    REQUEST_DB_DURATION, REQUEST_DURATION, REQUEST_QUERIES, REQUEST_RENDER_DURATION, REQUEST_SERIALIZE_DURATION,
+    REQUESTS, QueryRecorder, view_label,
+)
+from .routers import pick_replica, read_from
+
+
+class RequestMetricsMiddleware:
+    """Record query count, DB, serialization and render time for every request.
+
+    The numbers go into the histograms served at ``/metrics`` and into a
+    ``Server-Timing`` header, so they also show up in the browser's network
+    panel. Put it first in MIDDLEWARE so ``total`` covers the whole stack.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        recorder = QueryRecorder(request)
+        request._serialize_duration = request._render_duration = 0.0
+        with self.record_queries(recorder):
+            response = self.get_response(request)
+        return self.finish(request, response, recorder, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        recorder = QueryRecorder(request)
+        request._serialize_duration = request._render_duration = 0.0
+        # Connections are per thread, and under ASGI the async ORM and sync
+        # views run on the request's sync thread, so hook that thread's ones
+        stack = await sync_to_async(self.record_queries)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, recorder, time.perf_counter() - start)
+
+    @staticmethod
+    def record_queries(recorder):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    def finish(self, request, response, recorder, total):
+        view = view_label(request)
+        labels = (view, request.method)
+        REQUESTS.inc((view, request.method, str(response.status_code)))
+        REQUEST_DURATION.observe(labels, total)
+        REQUEST_DB_DURATION.observe(labels, recorder.duration)
+        REQUEST_SERIALIZE_DURATION.observe(labels, request._serialize_duration)
+        REQUEST_RENDER_DURATION.observe(labels, request._render_duration)
+        REQUEST_QUERIES.observe(labels, recorder.count)
+
+        # Queries a serializer triggers count as both db and serialize time
+        app = max(total - recorder.duration - request._serialize_duration - request._render_duration, 0)
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={recorder.duration * 1000:.2f};desc="{recorder.count} queries"',
+            f'serialize;dur={request._serialize_duration * 1000:.2f}',
+            f'render;dur={request._render_duration * 1000:.2f}',
+            f'app;dur={app * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time that step
+        render_start = time.perf_counter()
+
+        def record_render(rendered):
+            request._render_duration = time.perf_counter() - render_start
+        response.add_post_render_callback(record_render)
+        return response
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoiseMiddleware that also runs in async mode.
+
+    WhiteNoise 6.6 is sync-only, and a single sync middleware makes Django
+    hop to a thread and back for every request under ASGI, which holds a
+    thread for the whole of each async view.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class ReplicaRoutingMiddleware:
+    """Serve safe requests to the API from a read replica.
+
+    Reads of GET/HEAD/OPTIONS requests under REPLICA_ROUTED_PATHS go to a
+    replica picked per request. A successful write sets a short-lived
+    cookie that keeps that client's reads on the primary for
+    REPLICA_PIN_SECONDS, so it always reads its own writes despite
+    replication lag.
+    """
+    sync_capable = True
+    async_capable = True
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with read_from(self.read_alias(request)):
+            response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        with read_from(self.read_alias(request)):
+            response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def read_alias(self, request):
+        if request.method not in self.safe_methods or request.COOKIES.get(settings.REPLICA_PIN_COOKIE):
+            return None
+        if not request.path.startswith(tuple(settings.REPLICA_ROUTED_PATHS)):
+            return None
+        return pick_replica()
+
+    def process_response(self, request, response):
+        if settings.REPLICA_DATABASES and request.method not in self.safe_methods and response.status_code < 400:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                secure=not settings.DEBUG,
+                httponly=True,
+                # The frontend is served from another site
+                samesite='Lax' if settings.DEBUG else 'None',
+            )
+        return response
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0002_stats_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='learningactivity',
+            index=models.Index(fields=['-date', '-id'], name='activity_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='learningactivity',
+            index=models.Index(fields=['skill', '-date', '-id'], name='activity_skill_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['-created_at', '-id'], name='skill_created_id_idx'),
+        ),
+    ]
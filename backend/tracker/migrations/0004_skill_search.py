@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:49
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+# The search vector is maintained in the database so that every write path
+# (ORM saves, bulk operations, raw SQL) keeps it current.
+CREATE_SEARCH_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION tracker_skill_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('pg_catalog.english', coalesce(NEW.name, '')), 'A') ||
+            setweight(to_tsvector('pg_catalog.english', coalesce(NEW.tags, '')), 'B') ||
+            setweight(to_tsvector('pg_catalog.english', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER tracker_skill_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, tags, description, search_vector ON tracker_skill
+    FOR EACH ROW EXECUTE PROCEDURE tracker_skill_search_vector_update()
+    """,
+    'UPDATE tracker_skill SET name = name',
+    'CREATE INDEX tracker_skill_search_vector_idx ON tracker_skill USING gin (search_vector)',
+    'CREATE INDEX tracker_skill_name_trgm_idx ON tracker_skill USING gin (name gin_trgm_ops)',
+]
+
+DROP_SEARCH_SQL = [
+    'DROP INDEX IF EXISTS tracker_skill_name_trgm_idx',
+    'DROP INDEX IF EXISTS tracker_skill_search_vector_idx',
+    'DROP TRIGGER IF EXISTS tracker_skill_search_vector_trigger ON tracker_skill',
+    'DROP FUNCTION IF EXISTS tracker_skill_search_vector_update()',
+]
+
+
+def create_search_objects(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in CREATE_SEARCH_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_search_objects(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in DROP_SEARCH_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0003_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='skill',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_objects, drop_search_objects),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:49
+
+from django.db import migrations, models
+
+
+def populate_tags(apps, schema_editor):
+    """Parse the existing comma-separated tag strings into Tag rows"""
+    Skill = apps.get_model('tracker', 'Skill')
+    Tag = apps.get_model('tracker', 'Tag')
+    SkillTag = Skill.tag_set.through
+
+    skill_tags = {}
+    for skill_id, value in Skill.objects.values_list('id', 'tags').iterator():
+        names = []
+        for name in (value or '').split(','):
+            name = name.strip().lower()
+            if name and name not in names:
+                names.append(name)
+        if names:
+            skill_tags[skill_id] = names
+
+    all_names = {name for names in skill_tags.values() for name in names}
+    Tag.objects.bulk_create([Tag(name=name) for name in all_names], ignore_conflicts=True)
+    tag_ids = dict(Tag.objects.values_list('name', 'id'))
+    SkillTag.objects.bulk_create(
+        [
+            SkillTag(skill_id=skill_id, tag_id=tag_ids[name])
+            for skill_id, names in skill_tags.items()
+            for name in names
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0004_skill_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='tag_set',
+            field=models.ManyToManyField(blank=True, related_name='skills', to='tracker.tag'),
+        ),
+        migrations.RunPython(populate_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_daily_hours(apps, schema_editor):
+    """Build the daily rollup from the existing activities"""
+    LearningActivity = apps.get_model('tracker', 'LearningActivity')
+    DailySkillHours = apps.get_model('tracker', 'DailySkillHours')
+    totals = (
+        LearningActivity.objects.order_by()
+        .values('skill_id', 'date')
+        .annotate(hours=models.Sum('hours_spent'), activity_count=models.Count('id'))
+    )
+    DailySkillHours.objects.bulk_create(
+        (DailySkillHours(**row) for row in totals.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0005_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySkillHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('hours', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('activity_count', models.IntegerField(default=0)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_hours', to='tracker.skill')),
+            ],
+            options={
+                'verbose_name_plural': 'Daily Skill Hours',
+                'ordering': ['date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyskillhours',
+            constraint=models.UniqueConstraint(fields=('date', 'skill'), name='daily_hours_date_skill_uniq'),
+        ),
+        migrations.RunPython(backfill_daily_hours, migrations.RunPython.noop),
+    ]
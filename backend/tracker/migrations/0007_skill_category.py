@@ -0,0 +1,89 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:56
+
+from django.db import migrations, models
+
+# The keywords and rules of tracker.categorization as they were when this
+# migration was written; later changes there must not change what it does
+CATEGORY_KEYWORDS = {
+    'Frontend Development': [
+        'react', 'vue', 'angular', 'javascript', 'html', 'css', 'scss', 'sass',
+        'typescript', 'bootstrap', 'tailwind', 'frontend', 'ui', 'ux', 'design',
+        'web design', 'responsive', 'jquery', 'dom', 'browser', 'webpack', 'vite',
+    ],
+    'Backend Development': [
+        'node', 'express', 'django', 'flask', 'spring', 'laravel', 'php',
+        'python', 'java', 'backend', 'api', 'rest', 'graphql', 'server',
+        'microservices', 'fastapi', 'rails', 'ruby', 'go', 'rust',
+    ],
+    'Database & Storage': [
+        'mysql', 'postgresql', 'mongodb', 'redis', 'database', 'sql', 'nosql',
+        'sqlite', 'oracle', 'cassandra', 'elasticsearch', 'firebase', 'supabase',
+    ],
+    'Mobile Development': [
+        'react native', 'flutter', 'ios', 'android', 'mobile', 'app development',
+        'swift', 'kotlin', 'xamarin', 'ionic', 'cordova', 'native',
+    ],
+    'DevOps & Cloud': [
+        'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'jenkins', 'gitlab',
+        'devops', 'ci/cd', 'terraform', 'ansible', 'cloud', 'deployment',
+        'nginx', 'apache', 'linux', 'unix',
+    ],
+    'Data Science & Analytics': [
+        'python', 'pandas', 'numpy', 'matplotlib', 'scikit', 'tensorflow',
+        'pytorch', 'machine learning', 'data science', 'analytics', 'jupyter',
+        'statistics', 'data analysis', 'visualization', 'tableau', 'power bi',
+    ],
+    'Programming Languages': [
+        'javascript', 'python', 'java', 'c++', 'c#', 'go', 'rust', 'php',
+        'ruby', 'swift', 'kotlin', 'scala', 'clojure', 'haskell', 'programming',
+    ],
+    'Testing & Quality': [
+        'testing', 'jest', 'cypress', 'selenium', 'junit', 'pytest',
+        'test automation', 'tdd', 'bdd', 'quality assurance', 'qa',
+    ],
+    'Design & Creative': [
+        'figma', 'sketch', 'photoshop', 'illustrator', 'design', 'ui/ux',
+        'graphic design', 'web design', 'prototyping', 'wireframe', 'adobe',
+    ],
+    'Business & Management': [
+        'project management', 'agile', 'scrum', 'kanban', 'leadership',
+        'business', 'marketing', 'sales', 'strategy', 'management',
+    ],
+}
+
+
+def categorize(name, description, tags):
+    """The category with the most distinct keywords in the text; the earlier one on a tie"""
+    text = f'{name} {description or ""} {tags or ""}'.lower()
+    best, best_count = 'General', 0
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        count = sum(1 for keyword in set(keywords) if keyword in text)
+        if count > best_count:
+            best, best_count = category, count
+    return best
+
+
+def populate_categories(apps, schema_editor):
+    """Categorize the existing skills"""
+    Skill = apps.get_model('tracker', 'Skill')
+    skills = []
+    for skill in Skill.objects.only('id', 'name', 'description', 'tags').iterator(chunk_size=1000):
+        skill.category = categorize(skill.name, skill.description, skill.tags)
+        skills.append(skill)
+    Skill.objects.bulk_update(skills, ['category'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0006_daily_skill_hours'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='category',
+            field=models.CharField(choices=[('Frontend Development', 'Frontend Development'), ('Backend Development', 'Backend Development'), ('Database & Storage', 'Database & Storage'), ('Mobile Development', 'Mobile Development'), ('DevOps & Cloud', 'DevOps & Cloud'), ('Data Science & Analytics', 'Data Science & Analytics'), ('Programming Languages', 'Programming Languages'), ('Testing & Quality', 'Testing & Quality'), ('Design & Creative', 'Design & Creative'), ('Business & Management', 'Business & Management'), ('General', 'General')], db_index=True, default='General', editable=False, max_length=50),
+        ),
+        migrations.RunPython(populate_categories, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0007_skill_category'),
+    ]
+
+    operations = [
+        # Create the composite indexes before dropping the single-column ones they replace
+        migrations.AddIndex(
+            model_name='dailyskillhours',
+            index=models.Index(fields=['skill', 'date'], name='daily_hours_skill_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='learningactivity',
+            index=models.Index(fields=['skill', 'updated_at', 'hours_spent'], name='activity_skill_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='skill_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['platform', '-created_at', '-id'], name='skill_platform_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['resource_type', '-created_at', '-id'], name='skill_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['category', '-created_at', '-id'], name='skill_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['updated_at'], name='skill_updated_idx'),
+        ),
+        migrations.AlterField(
+            model_name='dailyskillhours',
+            name='skill',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='daily_hours', to='tracker.skill'),
+        ),
+        migrations.AlterField(
+            model_name='learningactivity',
+            name='skill',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='activities', to='tracker.skill'),
+        ),
+        migrations.AlterField(
+            model_name='skill',
+            name='category',
+            field=models.CharField(choices=[('Frontend Development', 'Frontend Development'), ('Backend Development', 'Backend Development'), ('Database & Storage', 'Database & Storage'), ('Mobile Development', 'Mobile Development'), ('DevOps & Cloud', 'DevOps & Cloud'), ('Data Science & Analytics', 'Data Science & Analytics'), ('Programming Languages', 'Programming Languages'), ('Testing & Quality', 'Testing & Quality'), ('Design & Creative', 'Design & Creative'), ('Business & Management', 'Business & Management'), ('General', 'General')], default='General', editable=False, max_length=50),
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0008_query_indexes'),
+    ]
+
+    operations = [
+        # Existing rows keep a null owner and become the shared data anonymous requests see.
+        # The owner-led indexes are created before the ones they replace are dropped.
+        migrations.AddField(
+            model_name='learningactivity',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='skills', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='statssummary',
+            name='owner',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='learningactivity',
+            index=models.Index(fields=['owner', '-date', '-id'], name='activity_owner_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='learningactivity',
+            index=models.Index(fields=['owner', 'updated_at'], name='activity_owner_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='skill_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['owner', 'status', '-created_at', '-id'], name='skill_owner_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['owner', 'platform', '-created_at', '-id'], name='skill_owner_platform_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['owner', 'resource_type', '-created_at', '-id'], name='skill_owner_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['owner', 'category', '-created_at', '-id'], name='skill_owner_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['owner', 'updated_at'], name='skill_owner_updated_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='statssummary',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('owner', models.Value(0)), name='stats_summary_owner_uniq'),
+        ),
+        migrations.RemoveIndex(
+            model_name='learningactivity',
+            name='activity_date_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='skill',
+            name='skill_created_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='skill',
+            name='skill_status_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='skill',
+            name='skill_platform_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='skill',
+            name='skill_type_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='skill',
+            name='skill_category_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='skill',
+            name='skill_updated_idx',
+        ),
+    ]
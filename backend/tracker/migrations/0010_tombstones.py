@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0009_owner'),
+    ]
+
+    operations = [
+        # The (updated_at, id) indexes are created before the ones they extend are dropped
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('skill', 'Skill'), ('activity', 'Learning activity')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='learningactivity',
+            index=models.Index(fields=['owner', 'updated_at', 'id'], name='activity_owner_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['owner', 'updated_at', 'id'], name='skill_owner_updated_id_idx'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='owner',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['owner', 'kind', 'deleted_at', 'id'], name='tombstone_owner_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='learningactivity',
+            name='activity_owner_updated_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='skill',
+            name='skill_owner_updated_idx',
+        ),
+    ]
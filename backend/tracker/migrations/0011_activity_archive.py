@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0010_tombstones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlySkillHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('hours', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('activity_count', models.IntegerField(default=0)),
+                ('skill', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_hours', to='tracker.skill')),
+            ],
+            options={
+                'verbose_name_plural': 'Monthly Skill Hours',
+                'ordering': ['month'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedActivity',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('hours_spent', models.DecimalField(decimal_places=2, max_digits=4)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('owner', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('skill', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_activities', to='tracker.skill')),
+            ],
+            options={
+                'verbose_name_plural': 'Archived Activities',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyskillhours',
+            constraint=models.UniqueConstraint(fields=('skill', 'month'), name='monthly_hours_skill_month_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedactivity',
+            index=models.Index(fields=['skill', 'date'], name='archived_activity_skill_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:15
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0012_job_queue'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='learningactivity',
+            options={'ordering': ['-date', '-id'], 'verbose_name_plural': 'Learning Activities'},
+        ),
+        migrations.AlterModelOptions(
+            name='skill',
+            options={'ordering': ['-created_at', '-id']},
+        ),
+    ]
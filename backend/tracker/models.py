@@ -1,7 +1,76 @@
-from django.db import models
+from collections import defaultdict
+from decimal import Decimal
+
+from django.contrib.postgres.search import SearchVectorField
+from django.db import DatabaseError, connections, models, router, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import Sum
+from django.db.models import Case, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, Round
+from django.db.models.lookups import GreaterThanOrEqual, LessThanOrEqual
+from django.utils import timezone
+
+from .categorization import CATEGORY_CHOICES, DEFAULT_CATEGORY, categorize
+
+def parse_tags(value):
+    """Split a comma-separated tag string into unique, normalized tag names"""
+    names = []
+    for name in (value or '').split(','):
+        name = name.strip().lower()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def owner_id_of(user):
+    """Owner id of the rows ``user`` sees and creates.
+    
+    Anonymous requests share the rows without an owner (None), so the API
+    keeps working for clients that do not log in.
+    """
+    return user.pk if user is not None and user.is_authenticated else None
+
+class OwnedQuerySet(models.QuerySet):
+    def owned_by(self, user):
+        """Rows belonging to ``user``"""
+        return self.filter(owner_id=owner_id_of(user))
+    
+    def delete(self, tombstones=True):
+        # Leave tombstones so delta syncs see the deletions
+        with transaction.atomic(using=self.db):
+            if tombstones:
+                Tombstone.record(self)
+            return super().delete()
+
+class ActivityQuerySet(OwnedQuerySet):
+    def delete(self, apply_rollups=True, tombstones=True):
+        """Delete the activities and take their hours back off skill totals and
+        the daily rollups, as LearningActivity.delete() does.
+        
+        Callers that account for the hours themselves pass apply_rollups=False;
+        moves out of the live table, which syncs must not report, also pass
+        tombstones=False.
+        """
+        with transaction.atomic(using=self.db):
+            removed = []
+            if apply_rollups:
+                # Locked so the hours taken off are the ones deleted
+                removed = [
+                    (skill_id, date, -hours, -1)
+                    for skill_id, date, hours in self.select_for_update().values_list('skill_id', 'date', 'hours_spent')
+                ]
+            result = super().delete(tombstones=tombstones)
+            if removed:
+                LearningActivity.apply_rollups(removed, using=self.db)
+            return result
+
+class Tag(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
 
 class Skill(models.Model):
     RESOURCE_TYPE_CHOICES = [
@@ -39,6 +108,11 @@ class Skill(models.Model):
         (4, 'Expert'),
     ]
     
+    # Every query is scoped to one owner; see owner_id_of()
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, blank=True, editable=False,
+        related_name='skills', db_index=False
+    )
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     resource_type = models.CharField(max_length=20, choices=RESOURCE_TYPE_CHOICES)
@@ -50,35 +124,138 @@ class Skill(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='not_started')
     notes = models.TextField(blank=True)
     tags = models.CharField(max_length=255, blank=True, help_text="Comma-separated tags")
+    # Normalized form of ``tags``, kept in sync on save
+    tag_set = models.ManyToManyField(Tag, related_name='skills', blank=True)
+    # Derived from name, description and tags on save
+    category = models.CharField(
+        max_length=50, choices=CATEGORY_CHOICES, default=DEFAULT_CATEGORY, editable=False
+    )
+    # Maintained by a database trigger on PostgreSQL, see migration 0004
+    search_vector = SearchVectorField(null=True, editable=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = OwnedQuerySet.as_manager()
+    
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        # Every index leads with owner, so a request only reads its owner's entries
+        indexes = [
+            # Keyset pagination walks (created_at, id) in descending order
+            models.Index(fields=['owner', '-created_at', '-id'], name='skill_owner_created_idx'),
+            # Each list filter, in list order, so a filtered page and its count read one index range
+            models.Index(fields=['owner', 'status', '-created_at', '-id'], name='skill_owner_status_idx'),
+            models.Index(fields=['owner', 'platform', '-created_at', '-id'], name='skill_owner_platform_idx'),
+            models.Index(fields=['owner', 'resource_type', '-created_at', '-id'], name='skill_owner_type_idx'),
+            models.Index(fields=['owner', 'category', '-created_at', '-id'], name='skill_owner_category_idx'),
+            # Max(updated_at) for list ETags, and delta syncs walking (updated_at, id)
+            models.Index(fields=['owner', 'updated_at', 'id'], name='skill_owner_updated_id_idx'),
+        ]
     
     def __str__(self):
         return self.name
     
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'name', 'description', 'tags'} & set(update_fields):
+            self.category, _ = categorize(self.name, self.description, self.tags)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'category'}
+        super().save(*args, **kwargs)
+        if update_fields is None or 'tags' in update_fields:
+            self.sync_tags()
+    
+    def sync_tags(self):
+        """Mirror the comma-separated ``tags`` string into ``tag_set``"""
+        names = parse_tags(self.tags)
+        tags = list(Tag.objects.filter(name__in=names))
+        missing = set(names) - {tag.name for tag in tags}
+        if missing:
+            Tag.objects.bulk_create([Tag(name=name) for name in missing], ignore_conflicts=True)
+            tags = list(Tag.objects.filter(name__in=names))
+        self.tag_set.set(tags)
+    
+    def delete(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(Skill, instance=self)
+        with transaction.atomic(using=using):
+            # Covers the activities the delete cascades to
+            Tombstone.record(Skill.objects.using(using).filter(pk=self.pk))
+            return super().delete(*args, **kwargs)
+    
+    def status_for_hours(self, total_hours):
+        """Return the status implied by a total of logged hours"""
+        if total_hours <= 0:
+            return 'not_started'
+        elif self.estimated_hours > 0 and total_hours >= self.estimated_hours:
+            return 'completed'
+        elif total_hours > 0:
+            if self.status == 'not_started':
+                return 'in_progress'
+        return self.status
+    
     def update_hours_and_status(self):
         """Update hours spent and status based on activities"""
         total_hours = self.activities.aggregate(
             total=Sum('hours_spent')
         )['total'] or 0
+        # Plus the activities compacted into monthly totals
+        total_hours += self.monthly_hours.aggregate(total=Sum('hours'))['total'] or 0
         
         self.hours_spent = total_hours
         
         # Auto-update status based on progress
-        if total_hours == 0:
-            self.status = 'not_started'
-        elif self.estimated_hours > 0 and total_hours >= self.estimated_hours:
-            self.status = 'completed'
-        elif total_hours > 0:
-            if self.status == 'not_started':
-                self.status = 'in_progress'
+        self.status = self.status_for_hours(total_hours)
         
         self.save(update_fields=['hours_spent', 'status', 'updated_at'])
     
+    @classmethod
+    def apply_hours_delta(cls, skill_id, delta, using=None):
+        """Atomically add delta hours to a skill and re-evaluate its status.
+        
+        Runs as a single UPDATE so concurrent activity writes cannot lose
+        each other's changes; the status rules mirror status_for_hours().
+        """
+        new_total = Round(F('hours_spent') + Value(delta, output_field=models.DecimalField()), 2)
+        cls.objects.using(using or router.db_for_write(cls)).filter(pk=skill_id).update(
+            hours_spent=new_total,
+            status=Case(
+                When(LessThanOrEqual(new_total, 0), then=Value('not_started')),
+                When(
+                    Q(estimated_hours__gt=0) & GreaterThanOrEqual(new_total, F('estimated_hours')),
+                    then=Value('completed'),
+                ),
+                When(status='not_started', then=Value('in_progress')),
+                default=F('status'),
+            ),
+            updated_at=timezone.now(),
+        )
+    
+    @staticmethod
+    def progress_percentage_expression():
+        """progress_percentage computed in SQL, for values() queries.
+        
+        Uses the same float arithmetic as the property, so results match it
+        exactly; callers needing its int results can convert with
+        progress_percentage_from_values().
+        """
+        ratio = Cast('hours_spent', FloatField()) / Cast('estimated_hours', FloatField()) * Value(100.0)
+        return Case(
+            When(Q(estimated_hours__gt=0) & GreaterThanOrEqual(ratio, 100), then=Value(100.0)),
+            When(estimated_hours__gt=0, then=ratio),
+            When(status='completed', then=Value(100.0)),
+            When(status='in_progress', then=Value(50.0)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    
+    @staticmethod
+    def progress_percentage_from_values(value, estimated_hours):
+        """Give a progress_percentage_expression() result the property's type"""
+        if estimated_hours > 0 and value < 100:
+            return value
+        return int(value)
+    
     @property
     def progress_percentage(self):
         if self.estimated_hours > 0:
@@ -92,8 +269,22 @@ class Skill(models.Model):
             else:
                 return 0
 
+def recount_skill_hours(skill_id):
+    """Recompute a skill's hours and status from scratch; run through tracker.tasks.enqueue"""
+    with transaction.atomic():
+        # Concurrent activity deltas wait for the lock, so the recount cannot overwrite them
+        skill = Skill.objects.select_for_update().filter(pk=skill_id).first()
+        if skill is not None:
+            skill.update_hours_and_status()
+
 class LearningActivity(models.Model):
-    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='activities')
+    # Indexed by the composite indexes below, which all lead with skill
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='activities', db_index=False)
+    # Copy of skill.owner, so owner-scoped lists can walk an index led by owner
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, blank=True, editable=False,
+        related_name='+', db_index=False
+    )
     date = models.DateField()
     hours_spent = models.DecimalField(max_digits=4, decimal_places=2, validators=[MinValueValidator(0.1)])
     notes = models.TextField(blank=True)
@@ -101,20 +292,334 @@ class LearningActivity(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ActivityQuerySet.as_manager()
+    
     class Meta:
-        ordering = ['-date']
+        ordering = ['-date', '-id']
         verbose_name_plural = 'Learning Activities'
+        indexes = [
+            # Keyset pagination walks (date, id) within one owner or one skill
+            models.Index(fields=['owner', '-date', '-id'], name='activity_owner_date_idx'),
+            models.Index(fields=['skill', '-date', '-id'], name='activity_skill_date_id_idx'),
+            # Cover list ETags (Max(updated_at) and Count, per owner or per skill),
+            # delta syncs walking (updated_at, id) and hour totals per skill without reading the table
+            models.Index(fields=['owner', 'updated_at', 'id'], name='activity_owner_updated_id_idx'),
+            models.Index(fields=['skill', 'updated_at', 'hours_spent'], name='activity_skill_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.skill.name} - {self.date} ({self.hours_spent}h)"
     
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Update the skill's hours and status after saving activity
-        self.skill.update_hours_and_status()
+        using = kwargs.get('using') or router.db_for_write(LearningActivity, instance=self)
+        with transaction.atomic(using=using):
+            previous = None
+            if not self._state.adding:
+                previous = LearningActivity.objects.using(using).select_for_update().filter(
+                    pk=self.pk
+                ).values('skill_id', 'date', 'hours_spent').first()
+                if previous is None:
+                    # Deleted or archived since it was read; saving would insert it again
+                    raise DatabaseError(f'Activity {self.pk} no longer exists.')
+            self.owner_id = self.skill.owner_id
+            super().save(*args, **kwargs)
+            
+            # Roll the change into the rollups instead of re-aggregating
+            changes = [(self.skill_id, self.date, self.hours_spent, 1)]
+            if previous is not None:
+                changes.append((previous['skill_id'], previous['date'], -previous['hours_spent'], -1))
+            LearningActivity.apply_rollups(changes, using=using)
     
     def delete(self, *args, **kwargs):
-        skill = self.skill
-        super().delete(*args, **kwargs)
-        # Update the skill's hours and status after deleting activity
-        skill.update_hours_and_status()
\ No newline at end of file
+        using = kwargs.get('using') or router.db_for_write(LearningActivity, instance=self)
+        previous_pk = self.pk
+        with transaction.atomic(using=using):
+            previous = LearningActivity.objects.using(using).select_for_update().filter(
+                pk=self.pk
+            ).values('skill_id', 'date', 'hours_spent').first()
+            result = super().delete(*args, **kwargs)
+            # Take the deleted hours back off the rollups
+            if previous is not None:
+                Tombstone.objects.using(using).create(
+                    owner_id=self.owner_id, kind=Tombstone.ACTIVITY, object_id=previous_pk
+                )
+                LearningActivity.apply_rollups(
+                    [(previous['skill_id'], previous['date'], -previous['hours_spent'], -1)],
+                    using=using
+                )
+        return result
+    
+    @classmethod
+    def apply_rollups(cls, changes, using=None):
+        """Apply signed (skill_id, date, hours, activity count) changes to the
+        skill hours and daily rollups.
+        
+        Changes are merged first so every skill is updated exactly once, in
+        primary key order so concurrent writers lock rows consistently.
+        """
+        using = using or router.db_for_write(cls)
+        skill_hours = defaultdict(Decimal)
+        daily = defaultdict(lambda: [Decimal(0), 0])
+        changes = list(changes)
+        for skill_id, date, hours, count in changes:
+            hours = Decimal(str(hours))
+            skill_hours[skill_id] += hours
+            daily[(skill_id, date)][0] += hours
+            daily[(skill_id, date)][1] += count
+        
+        for skill_id in sorted(skill_hours):
+            Skill.apply_hours_delta(skill_id, skill_hours[skill_id], using=using)
+        DailySkillHours.apply_deltas(
+            [(skill_id, date, hours, count) for (skill_id, date), (hours, count) in sorted(daily.items())
+             if hours or count],
+            using=using
+        )
+        
+        from .events import record_change, record_stats
+        from .insights import update_insights
+        owners = dict(Skill.objects.using(using).filter(pk__in=skill_hours).values_list('id', 'owner_id'))
+        update_insights(changes, owners, using=using)
+        # Live dashboards get the changed skill totals and an hours delta per owner
+        owner_totals = defaultdict(lambda: [Decimal(0), 0])
+        for (skill_id, _), (hours, count) in daily.items():
+            if skill_id in owners:
+                record_change(owners[skill_id], 'skills', 'updated', skill_id, using=using)
+                owner_totals[owners[skill_id]][0] += hours
+                owner_totals[owners[skill_id]][1] += count
+        for owner_id, (hours, count) in owner_totals.items():
+            record_stats(owner_id, hours, count, using=using)
+
+class SkillHoursRollup(models.Model):
+    """Hours and activity counts per skill per period, kept by adding deltas.
+    
+    Subclasses define ``skill``, ``hours`` and ``activity_count`` plus the
+    date field named by ``period_field``, unique together with ``skill``.
+    """
+    UPSERT_BATCH_SIZE = 500
+    period_field = None
+    
+    class Meta:
+        abstract = True
+    
+    @classmethod
+    def apply_deltas(cls, deltas, using=None):
+        """Add signed (skill_id, period, hours, activity count) deltas with one
+        INSERT ... ON CONFLICT DO UPDATE per batch, then drop emptied periods.
+        """
+        if not deltas:
+            return
+        using = using or router.db_for_write(cls)
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        table = quote(cls._meta.db_table)
+        period = quote(cls.period_field)
+        hours_field = cls._meta.get_field('hours')
+        
+        for start in range(0, len(deltas), cls.UPSERT_BATCH_SIZE):
+            batch = deltas[start:start + cls.UPSERT_BATCH_SIZE]
+            params = []
+            for skill_id, date, hours, count in batch:
+                params.extend([
+                    skill_id,
+                    connection.ops.adapt_datefield_value(date),
+                    connection.ops.adapt_decimalfield_value(
+                        hours, hours_field.max_digits, hours_field.decimal_places
+                    ),
+                    count,
+                ])
+            values = ', '.join(['(%s, %s, %s, %s)'] * len(batch))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {table} ({quote("skill_id")}, {period}, {quote("hours")}, '
+                    f'{quote("activity_count")}) VALUES {values} '
+                    f'ON CONFLICT ({period}, {quote("skill_id")}) DO UPDATE SET '
+                    f'{quote("hours")} = ROUND({table}.{quote("hours")} + excluded.{quote("hours")}, 2), '
+                    f'{quote("activity_count")} = {table}.{quote("activity_count")} + excluded.{quote("activity_count")}',
+                    params
+                )
+        
+        if any(count < 0 for _, _, _, count in deltas):
+            cls.objects.using(using).filter(
+                skill_id__in={skill_id for skill_id, _, _, _ in deltas},
+                activity_count__lte=0
+            ).delete()
+
+class DailySkillHours(SkillHoursRollup):
+    """Hours logged per skill per day, maintained incrementally by activity writes"""
+    period_field = 'date'
+    
+    # Indexed by daily_hours_skill_date_idx below
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='daily_hours', db_index=False)
+    date = models.DateField()
+    hours = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    activity_count = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['date']
+        verbose_name_plural = 'Daily Skill Hours'
+        constraints = [
+            # Leads with date so time-range scans read a contiguous slice
+            models.UniqueConstraint(fields=['date', 'skill'], name='daily_hours_date_skill_uniq'),
+        ]
+        indexes = [
+            # One skill's days in date order, for per-skill time series
+            models.Index(fields=['skill', 'date'], name='daily_hours_skill_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.skill_id} - {self.date} ({self.hours}h)"
+
+class MonthlySkillHours(SkillHoursRollup):
+    """Hours of archived activities per skill per month, written by
+    ``compact_activities`` when it moves them to ArchivedActivity.
+    
+    Recounts of skill hours add these to the live activities. Timeseries and
+    insights keep reading DailySkillHours, which compaction leaves in place:
+    streaks and active days need every day, however old.
+    """
+    period_field = 'month'
+    
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='monthly_hours', db_index=False)
+    # First day of the month
+    month = models.DateField()
+    hours = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    activity_count = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['month']
+        verbose_name_plural = 'Monthly Skill Hours'
+        constraints = [
+            # Also serves a skill's archived totals
+            models.UniqueConstraint(fields=['skill', 'month'], name='monthly_hours_skill_month_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.skill_id} - {self.month:%Y-%m} ({self.hours}h)"
+
+class ArchivedActivity(models.Model):
+    """A learning activity moved out of the live table by ``compact_activities``.
+    
+    Keeps the original id and columns; its hours count towards the skill
+    through MonthlySkillHours.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    # Indexed by archived_activity_skill_idx below
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='archived_activities', db_index=False)
+    # Indexed for the cascade when a user is deleted
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, null=True, related_name='+')
+    date = models.DateField()
+    hours_spent = models.DecimalField(max_digits=4, decimal_places=2)
+    notes = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-date']
+        verbose_name_plural = 'Archived Activities'
+        indexes = [
+            models.Index(fields=['skill', 'date'], name='archived_activity_skill_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.skill_id} - {self.date} ({self.hours_spent}h, archived)"
+
+class StatsSummary(models.Model):
+    """Materialized payload of the skills stats endpoint, one row per owner"""
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, null=True, related_name='+', db_index=False)
+    data = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Stats Summaries'
+        constraints = [
+            # Coalesced so the shared, ownerless skills get exactly one row too
+            models.UniqueConstraint(Coalesce('owner', Value(0)), name='stats_summary_owner_uniq'),
+        ]
+
+    def __str__(self):
+        return f"Stats summary ({self.updated_at})"
+
+
+class Tombstone(models.Model):
+    """Marks a deleted skill or activity so delta syncs can report the deletion.
+    
+    Written by the models' ``delete()`` and by queryset deletes, which also
+    cover the activities a skill delete cascades to. ``prune_tombstones``
+    removes them once no sync cursor can be that old.
+    """
+    SKILL = 'skill'
+    ACTIVITY = 'activity'
+    KIND_CHOICES = [
+        (SKILL, 'Skill'),
+        (ACTIVITY, 'Learning activity'),
+    ]
+    
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, null=True, related_name='+', db_index=False)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        indexes = [
+            # Delta syncs walk (deleted_at, id) within one owner and kind
+            models.Index(fields=['owner', 'kind', 'deleted_at', 'id'], name='tombstone_owner_sync_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.object_id} deleted {self.deleted_at}"
+    
+    @classmethod
+    def record(cls, queryset):
+        """Create tombstones for the rows of ``queryset``, about to be deleted"""
+        using = queryset.db
+        if queryset.model is Skill:
+            cascaded = LearningActivity.objects.using(using).filter(skill__in=queryset.values('pk'))
+            kinds = [(queryset, cls.SKILL), (cascaded, cls.ACTIVITY)]
+        else:
+            kinds = [(queryset, cls.ACTIVITY)]
+        now = timezone.now()
+        for rows, kind in kinds:
+            cls.objects.using(using).bulk_create([
+                cls(owner_id=owner_id, kind=kind, object_id=pk, deleted_at=now)
+                for pk, owner_id in rows.values_list('pk', 'owner_id')
+            ], batch_size=1000)
+
+
+class Job(models.Model):
+    """A call waiting for ``manage.py run_tasks``, see tracker/tasks.py"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (FAILED, 'Failed'),
+    ]
+    
+    # Dotted path of a module-level function, called with args
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    # At most one pending job per key; enqueueing another while one waits does nothing
+    key = models.CharField(max_length=200, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    # When a pending job is due, or when a running job's lease runs out
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['run_after', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['key'], condition=Q(status='pending'), name='job_pending_key_uniq'),
+        ]
+        indexes = [
+            # Workers pick due jobs in order
+            models.Index(fields=['status', 'run_after', 'id'], name='job_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name}{tuple(self.args)} ({self.status})"
@@ -0,0 +1,327 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .models import Tombstone, owner_id_of
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination on a descending (field, id) key.
+
+    Each page is an index range scan that starts right after the previous
+    page's last row, so deep pages cost the same as the first one and no
+    COUNT(*) is issued. ``id`` breaks ties between rows sharing a key value.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    ordering_field = 'created_at'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, position = self.page_queryset(queryset, request)
+        return self.set_page(list(queryset), position)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async version of paginate_queryset"""
+        queryset, position = self.page_queryset(queryset, request)
+        return self.set_page([row async for row in queryset], position)
+
+    def page_queryset(self, queryset, request):
+        """The queryset for the requested page plus one row, and the decoded cursor"""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.model_field = queryset.model._meta.get_field(self.ordering_field)
+
+        position = self.decode_cursor(request)
+        field = self.ordering_field
+        if position is None:
+            queryset = queryset.order_by(f'-{field}', '-id')
+        else:
+            value, pk, reverse = position
+            if reverse:
+                queryset = queryset.filter(
+                    Q(**{f'{field}__gte': value}),
+                    Q(**{f'{field}__gt': value}) | Q(id__gt=pk)
+                ).order_by(field, 'id')
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{field}__lte': value}),
+                    Q(**{f'{field}__lt': value}) | Q(id__lt=pk)
+                ).order_by(f'-{field}', '-id')
+        return queryset[:self.page_size + 1], position
+
+    def set_page(self, results, position):
+        reverse = position is not None and position[2]
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.build_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.build_link(self.page[0], reverse=True)
+
+    def build_link(self, row, reverse):
+        cursor = self.encode_cursor(row, reverse)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def encode_cursor(self, row, reverse=False):
+        """Encode the position of a row (model instance or values() dict)"""
+        if isinstance(row, dict):
+            value, pk = row[self.ordering_field], row['id']
+        else:
+            value, pk = getattr(row, self.ordering_field), row.pk
+        payload = json.dumps([value.isoformat(), pk, int(reverse)], separators=(',', ':'))
+        return urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            value, pk, reverse = json.loads(urlsafe_b64decode(padded.encode()).decode())
+            value = self.model_field.to_python(value)
+            return value, int(pk), bool(reverse)
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+
+class SkillKeysetPagination(KeysetPagination):
+    ordering_field = 'created_at'
+
+
+class ActivityKeysetPagination(KeysetPagination):
+    ordering_field = 'date'
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'Sync cursor is older than the kept deletions; sync again without one.'
+    default_code = 'cursor_expired'
+
+
+class DeltaSyncPagination(KeysetPagination):
+    """The rows changed and deleted since a ``?since=`` cursor, oldest first.
+
+    Rows are walked in ascending (updated_at, id) order and deletions in
+    (deleted_at, id) order through the tombstones, each from its own
+    position in the cursor. An empty ``?since=`` starts a full sync.
+    ``next`` is set while changes remain; otherwise ``cursor`` is where the
+    next sync starts.
+
+    A write can commit after a later one was read, so once a walk is done
+    its position goes back to ``now - settle_seconds``: recent changes are
+    sent again on the next sync rather than risk being skipped. Clients
+    apply rows as upserts.
+    """
+    cursor_query_param = 'since'
+    ordering_field = 'updated_at'
+    tombstone_kind = None
+    settle_seconds = 5
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, tombstones = self.page_querysets(queryset, request)
+        return self.set_pages(list(queryset), list(tombstones))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async version of paginate_queryset"""
+        queryset, tombstones = self.page_querysets(queryset, request)
+        return self.set_pages([row async for row in queryset], [row async for row in tombstones])
+
+    def page_querysets(self, queryset, request):
+        """Changed rows and tombstones after the cursor, each plus one row"""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.model_field = queryset.model._meta.get_field(self.ordering_field)
+        self.now = timezone.now()
+
+        positions = self.decode_cursor(request)
+        if positions is None:
+            # A full sync: every row, and the deletions from now on
+            self.positions = (None, self.settled_position())
+            tombstones = Tombstone.objects.none()
+        else:
+            self.positions = positions
+            if positions[1][0] < self.now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS):
+                raise CursorExpired()
+            queryset = self.after(queryset, self.ordering_field, positions[0])
+            tombstones = self.after(
+                Tombstone.objects.using(queryset.db).filter(
+                    owner_id=owner_id_of(request.user), kind=self.tombstone_kind
+                ),
+                'deleted_at', positions[1]
+            ).values('id', 'object_id', 'deleted_at')
+        queryset = queryset.order_by(self.ordering_field, 'id')[:self.page_size + 1]
+        return queryset, tombstones.order_by('deleted_at', 'id')[:self.page_size + 1]
+
+    @staticmethod
+    def after(queryset, field, position):
+        value, pk = position
+        return queryset.filter(Q(**{f'{field}__gte': value}), Q(**{f'{field}__gt': value}) | Q(id__gt=pk))
+
+    def settled_position(self):
+        return self.now - timedelta(seconds=self.settle_seconds), 0
+
+    def set_pages(self, rows, tombstones):
+        positions = []
+        for items, field, previous in ((rows, self.ordering_field, self.positions[0]),
+                                       (tombstones, 'deleted_at', self.positions[1])):
+            if len(items) > self.page_size:
+                last = items[self.page_size - 1]
+                if isinstance(last, dict):
+                    position = (last[field], last['id'])
+                else:
+                    position = (getattr(last, field), last.pk)
+                positions.append(position)
+            else:
+                positions.append(self.settled_position())
+        self.has_next = len(rows) > self.page_size or len(tombstones) > self.page_size
+        self.cursor = self.encode_positions(*positions)
+
+        self.page = rows[:self.page_size]
+        self.deleted = [row['object_id'] for row in tombstones[:self.page_size]]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('cursor', self.cursor),
+            ('results', data),
+            ('deleted', self.deleted),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'cursor': {'type': 'string'},
+                'results': schema,
+                'deleted': {'type': 'array', 'items': {'type': 'integer'}},
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.cursor)
+
+    def get_previous_link(self):
+        return None
+
+    def encode_positions(self, rows, deleted):
+        payload = json.dumps(
+            [rows[0].isoformat(), rows[1], deleted[0].isoformat(), deleted[1]], separators=(',', ':')
+        )
+        return urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            value, pk, deleted_value, deleted_pk = json.loads(urlsafe_b64decode(padded.encode()).decode())
+            return (
+                (self.model_field.to_python(value), int(pk)),
+                (self.model_field.to_python(deleted_value), int(deleted_pk)),
+            )
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+
+class SkillDeltaSyncPagination(DeltaSyncPagination):
+    tombstone_kind = Tombstone.SKILL
+
+
+class ActivityDeltaSyncPagination(DeltaSyncPagination):
+    tombstone_kind = Tombstone.ACTIVITY
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """PageNumberPagination for async views: the count and the page are
+    fetched with the async ORM, the response has the same shape.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator caches the count; fill it in so page() never queries
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+
+        self.request = request
+        return [row async for row in self.page.object_list]
+
+
+class KeysetPaginationMixin:
+    """Use ``keyset_pagination_class`` instead of the default paginator when
+    the client opts in with ``?pagination=cursor``, and
+    ``delta_pagination_class`` when it asks for changes with ``?since=``.
+    """
+    keyset_pagination_class = None
+    delta_pagination_class = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.delta_pagination_class is not None and 'since' in self.request.query_params:
+                self._paginator = self.delta_pagination_class()
+            elif self.keyset_pagination_class is not None and \
+                    self.request.query_params.get('pagination') == 'cursor':
+                self._paginator = self.keyset_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
@@ -0,0 +1,53 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Database alias reads of the current request should use, or None for the primary
+_read_alias = ContextVar('read_alias', default=None)
+
+
+@contextmanager
+def read_from(alias):
+    """Route reads inside the block to ``alias`` (None for the primary)"""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def pick_replica():
+    """A random replica alias, or None when no replicas are configured"""
+    if not settings.REPLICA_DATABASES:
+        return None
+    return random.choice(settings.REPLICA_DATABASES)
+
+
+class ReplicaRouter:
+    """Send reads to the replica chosen for the current request.
+
+    ReplicaRoutingMiddleware picks the replica for safe requests to the API;
+    everything else, and every write, uses ``default``. Objects keep the
+    database they were loaded from, so related lookups stay on one side.
+    """
+
+    # Sessions and users are read by every request, including the ones right
+    # after the login that wrote them, so they never come from a lagging replica
+    primary_apps = {'auth', 'sessions'}
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in self.primary_apps:
+            return 'default'
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
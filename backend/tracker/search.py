@@ -0,0 +1,48 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+SEARCH_CONFIG = 'english'
+
+
+def search_skills(queryset, term):
+    """Filter skills matching a search term, best matches first.
+
+    PostgreSQL uses the trigger-maintained ``search_vector`` (GIN indexed)
+    plus trigram word similarity on the name for typo tolerance. Other
+    databases fall back to matching every word with icontains.
+    """
+    term = term.strip()
+    if not term:
+        return queryset
+    if connections[queryset.db].vendor == 'postgresql':
+        return _search_postgres(queryset, term)
+    return _search_fallback(queryset, term)
+
+
+def _search_postgres(queryset, term):
+    query = SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch')
+    return queryset.annotate(
+        rank=SearchRank(F('search_vector'), query),
+        similarity=TrigramWordSimilarity(term, 'name'),
+    ).filter(
+        Q(search_vector=query) | Q(name__trigram_word_similar=term)
+    ).order_by('-rank', '-similarity', '-created_at', '-id')
+
+
+def _search_fallback(queryset, term):
+    rank = Value(0, output_field=IntegerField())
+    for word in term.split():
+        queryset = queryset.filter(
+            Q(name__icontains=word) |
+            Q(description__icontains=word) |
+            Q(tags__icontains=word)
+        )
+        # Weight matches like the search vector does: name, then tags, then description
+        rank = rank + Case(
+            When(name__icontains=word, then=Value(3)),
+            When(tags__icontains=word, then=Value(2)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    return queryset.annotate(rank=rank).order_by('-rank', '-created_at', '-id')
@@ -1,30 +1,190 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.reverse import reverse
+from .metrics import serialization_timer
 from .models import Skill, LearningActivity
+from .pagination import ActivityKeysetPagination
 
-class LearningActivitySerializer(serializers.ModelSerializer):
+def split_param(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+class TimedDataMixin:
+    """Counts building ``.data`` as the request's serialization time"""
+    
+    @property
+    def data(self):
+        with serialization_timer(self.context.get('request')):
+            return super().data
+
+class TimedListSerializer(TimedDataMixin, serializers.ListSerializer):
+    pass
+
+class SparseFieldsetMixin:
+    """Lets read requests choose fields with ``?fields=a,b`` and ``?expand=x``.
+    
+    ``expandable_fields`` maps an ``?expand=`` key to fields that are only
+    rendered when expanded; ``companion_fields`` are rendered whenever their
+    key field is; and ``field_sources`` maps computed fields to the model
+    columns they read, so views can restrict their queries with ``only()``.
+    Only the serializer the view instantiates reacts to the query string.
+    """
+    expandable_fields = {}
+    companion_fields = {}
+    field_sources = {}
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        rendered = self.get_rendered_fields(self.context.get('request'))
+        for name in list(self.fields):
+            if name not in rendered:
+                self.fields.pop(name)
+    
+    @classmethod
+    def get_rendered_fields(cls, request):
+        """Names of the fields rendered for a request"""
+        requested = expanded = set()
+        if request is not None and request.method in SAFE_METHODS:
+            requested = split_param(request.query_params.get('fields'))
+            expanded = split_param(request.query_params.get('expand'))
+        
+        hidden = {name for names in cls.expandable_fields.values() for name in names}
+        shown = {name for key in expanded for name in cls.expandable_fields.get(key, ())}
+        names = [name for name in cls.Meta.fields if name not in hidden or name in shown]
+        
+        if requested:
+            wanted = {'id'} | shown
+            for name in requested:
+                wanted.add(name)
+                wanted.update(cls.companion_fields.get(name, ()))
+            names = [name for name in names if name in wanted]
+        return names
+    
+    @classmethod
+    def get_model_fields(cls, request):
+        """Model columns needed for a request, or None when every field is rendered"""
+        if request is None or not split_param(request.query_params.get('fields')):
+            return None
+        concrete = {field.name for field in cls.Meta.model._meta.concrete_fields}
+        columns = []
+        for name in cls.get_rendered_fields(request):
+            for source in cls.field_sources.get(name, (name,)):
+                if source in concrete and source not in columns:
+                    columns.append(source)
+        return columns
+
+class SkillRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key of one of the requesting user's skills; resolves from a
+    preloaded ``skills`` map in the context when present
+    """
+    
+    def get_queryset(self):
+        request = self.context.get('request')
+        return Skill.objects.owned_by(request.user if request is not None else None)
+    
+    def to_internal_value(self, data):
+        # int() alone would take 1.5 and True as ids
+        if isinstance(data, bool) or not (
+            isinstance(data, int) or isinstance(data, str) and data.isascii() and data.isdigit()
+        ):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        skills = self.context.get('skills')
+        if skills is None:
+            return super().to_internal_value(int(data))
+        try:
+            return skills[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+
+class SkillSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Skill
+        fields = ['id', 'name', 'platform', 'resource_type', 'status']
+
+class LearningActivitySerializer(TimedDataMixin, SparseFieldsetMixin, serializers.ModelSerializer):
+    skill = SkillRelatedField(queryset=Skill.objects.all())
+    skill_detail = SkillSummarySerializer(source='skill', read_only=True)
+    
+    expandable_fields = {'skill': ('skill_detail',)}
+    field_sources = {'skill_detail': ('skill',)}
+    
     class Meta:
         model = LearningActivity
-        fields = ['id', 'skill', 'date', 'hours_spent', 'notes', 'created_at', 'updated_at']
+        list_serializer_class = TimedListSerializer
+        fields = ['id', 'skill', 'skill_detail', 'date', 'hours_spent', 'notes', 'created_at', 'updated_at']
+
+class ActivityPreviewMixin(serializers.Serializer):
+    """The most recent activities of a skill, capped at ``activity_preview_limit``,
+    with ``activities_next`` linking to the cursor page that continues the list.
+    """
+    activities = serializers.SerializerMethodField()
+    activities_next = serializers.SerializerMethodField()
+    
+    activity_preview_limit = 20
+    companion_fields = {'activities': ('activities_next',)}
+    field_sources = {
+        'progress_percentage': ('estimated_hours', 'hours_spent', 'status'),
+        'activities': (),
+        'activities_next': (),
+    }
+    # SQL equivalents of computed fields, for ValuesListMixin
+    value_expressions = {'progress_percentage': Skill.progress_percentage_expression}
+    
+    @staticmethod
+    def progress_percentage_from_values(value, row):
+        return Skill.progress_percentage_from_values(value, row['estimated_hours'])
+    
+    @classmethod
+    def activity_prefetch(cls):
+        """Prefetch that loads one activity past the cap for every skill in a single query"""
+        return Prefetch(
+            'activities',
+            queryset=LearningActivity.objects.order_by('-date', '-id')[:cls.activity_preview_limit + 1],
+            to_attr='activity_preview'
+        )
+    
+    def _activity_preview(self, skill):
+        if not hasattr(skill, 'activity_preview'):
+            skill.activity_preview = list(
+                skill.activities.order_by('-date', '-id')[:self.activity_preview_limit + 1]
+            )
+        return skill.activity_preview
+    
+    def get_activities(self, skill):
+        activities = self._activity_preview(skill)[:self.activity_preview_limit]
+        return LearningActivitySerializer(activities, many=True).data
+    
+    def get_activities_next(self, skill):
+        activities = self._activity_preview(skill)
+        if len(activities) <= self.activity_preview_limit:
+            return None
+        cursor = ActivityKeysetPagination().encode_cursor(activities[self.activity_preview_limit - 1])
+        url = reverse('learningactivity-list', request=self.context.get('request'))
+        return f'{url}?skill={skill.pk}&pagination=cursor&cursor={cursor}'
 
-class SkillSerializer(serializers.ModelSerializer):
-    activities = LearningActivitySerializer(many=True, read_only=True)
+class SkillSerializer(TimedDataMixin, ActivityPreviewMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     progress_percentage = serializers.ReadOnlyField()
     
     class Meta:
         model = Skill
+        list_serializer_class = TimedListSerializer
         fields = [
             'id', 'name', 'description', 'resource_type', 'platform', 
             'resource_url', 'difficulty', 'estimated_hours', 'hours_spent', 
-            'status', 'notes', 'tags', 'progress_percentage', 'activities',
-            'created_at', 'updated_at'
+            'status', 'category', 'notes', 'tags', 'progress_percentage', 'activities',
+            'activities_next', 'created_at', 'updated_at'
         ]
 
-class SkillListSerializer(serializers.ModelSerializer):
+class SkillListSerializer(TimedDataMixin, ActivityPreviewMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     progress_percentage = serializers.ReadOnlyField()
     
+    expandable_fields = {'activities': ('activities', 'activities_next')}
+    
     class Meta:
         model = Skill
+        list_serializer_class = TimedListSerializer
         fields = [
             'id', 'name', 'resource_type', 'platform', 'difficulty', 
-            'hours_spent', 'status', 'progress_percentage', 'created_at'
+            'hours_spent', 'status', 'category', 'progress_percentage', 'activities',
+            'activities_next', 'created_at'
         ]
\ No newline at end of file
@@ -0,0 +1,39 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .events import record_change
+from .insights import invalidate_insights
+from .models import Skill, LearningActivity
+from .stats import schedule_stats_refresh
+
+# Names of the models in change events
+EVENT_KINDS = {Skill: 'skills', LearningActivity: 'activities'}
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(post_save, sender=LearningActivity)
+@receiver(post_delete, sender=LearningActivity)
+def refresh_stats_on_change(sender, instance, using=None, **kwargs):
+    schedule_stats_refresh(instance.owner_id, using)
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_save, sender=LearningActivity)
+def record_save(sender, instance, created, using=None, **kwargs):
+    record_change(instance.owner_id, EVENT_KINDS[sender], 'created' if created else 'updated', instance.pk, using)
+
+
+@receiver(post_delete, sender=Skill)
+@receiver(post_delete, sender=LearningActivity)
+def record_delete(sender, instance, using=None, **kwargs):
+    record_change(instance.owner_id, EVENT_KINDS[sender], 'deleted', instance.pk, using)
+
+
+@receiver(post_delete, sender=Skill)
+def invalidate_insights_on_skill_delete(sender, instance, using=None, **kwargs):
+    # Cascaded activity deletes bypass LearningActivity.delete()
+    transaction.on_commit(partial(invalidate_insights, instance.owner_id), using=using)
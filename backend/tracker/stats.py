@@ -0,0 +1,164 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import router
+from django.db.models import Avg, Count, Q, Sum
+
+from .categorization import CATEGORY_CHOICES
+from .conditional import aqueryset_version, queryset_version
+from .models import Skill, StatsSummary
+from .tasks import enqueue
+
+
+def skill_stats_aggregates():
+    """Every count and sum the stats payload needs, as one aggregate() call"""
+    aggregates = {
+        'total_skills': Count('id'),
+        'total_hours': Sum('hours_spent'),
+        'avg_hours': Avg('hours_spent'),
+    }
+    for code, _ in Skill.STATUS_CHOICES:
+        aggregates[f'status_{code}'] = Count('id', filter=Q(status=code))
+    for code, _ in Skill.PLATFORM_CHOICES:
+        aggregates[f'platform_{code}'] = Count('id', filter=Q(platform=code))
+    for code, _ in Skill.RESOURCE_TYPE_CHOICES:
+        aggregates[f'resource_type_{code}'] = Count('id', filter=Q(resource_type=code))
+    for index, (category, _) in enumerate(CATEGORY_CHOICES):
+        aggregates[f'category_{index}'] = Count('id', filter=Q(category=category))
+    return aggregates
+
+
+def compute_skill_stats(skills):
+    """Build the stats payload for a skill queryset in a single aggregate query"""
+    return build_skill_stats(skills.order_by().aggregate(**skill_stats_aggregates()))
+
+
+def build_skill_stats(totals):
+    """Shape the result of the stats aggregate into the API payload"""
+    total_skills = totals['total_skills']
+    completed_skills = totals['status_completed']
+    in_progress_skills = totals['status_in_progress']
+    not_started_skills = totals['status_not_started']
+    paused_skills = totals['status_paused']
+    total_hours = totals['total_hours'] or 0
+    avg_hours_per_skill = totals['avg_hours'] or 0
+
+    # Platform breakdown
+    platform_stats = {}
+    for platform_code, platform_name in Skill.PLATFORM_CHOICES:
+        count = totals[f'platform_{platform_code}']
+        if count > 0:
+            platform_stats[platform_name] = count
+
+    # Resource type breakdown (category-wise)
+    resource_type_stats = {}
+    for resource_code, resource_name in Skill.RESOURCE_TYPE_CHOICES:
+        count = totals[f'resource_type_{resource_code}']
+        if count > 0:
+            resource_type_stats[resource_name] = count
+
+    # Auto-categorization breakdown
+    category_stats = {}
+    for index, (category, _) in enumerate(CATEGORY_CHOICES):
+        count = totals[f'category_{index}']
+        if count > 0:
+            category_stats[category] = count
+
+    # Status breakdown
+    status_stats = {
+        'Not Started': not_started_skills,
+        'In Progress': in_progress_skills,
+        'Completed': completed_skills,
+        'Paused': paused_skills,
+    }
+    # Remove zero values
+    status_stats = {k: v for k, v in status_stats.items() if v > 0}
+
+    # Additional insights
+    most_used_platform = max(platform_stats.items(), key=lambda x: x[1])[0] if platform_stats else None
+    most_used_resource_type = max(resource_type_stats.items(), key=lambda x: x[1])[0] if resource_type_stats else None
+
+    return {
+        'total_skills': total_skills,
+        'completed_skills': completed_skills,
+        'in_progress_skills': in_progress_skills,
+        'not_started_skills': not_started_skills,
+        'paused_skills': paused_skills,
+        'completion_rate': round((completed_skills / total_skills * 100) if total_skills > 0 else 0, 2),
+        'total_hours': float(total_hours),
+        'avg_hours_per_skill': round(float(avg_hours_per_skill), 2),
+        'platform_breakdown': platform_stats,
+        'resource_type_breakdown': resource_type_stats,
+        'status_breakdown': status_stats,
+        'category_breakdown': category_stats,
+        'most_used_platform': most_used_platform,
+        'most_used_resource_type': most_used_resource_type,
+    }
+
+
+def refresh_stats_summary(owner_id=None):
+    """Recompute the materialized stats row of one owner"""
+    # Aggregate on the primary so a lagging replica cannot store stale totals
+    skills = Skill.objects.using(router.db_for_write(StatsSummary)).filter(owner_id=owner_id)
+    summary, _ = StatsSummary.objects.update_or_create(
+        owner_id=owner_id,
+        defaults={'data': compute_skill_stats(skills)},
+    )
+    return summary
+
+
+def get_skill_stats(owner_id=None):
+    """Return the stats payload of one owner, from the materialized row when enabled"""
+    if not settings.SKILL_STATS_MATERIALIZED:
+        return compute_skill_stats(Skill.objects.filter(owner_id=owner_id))
+
+    summary = StatsSummary.objects.filter(owner_id=owner_id).first()
+    if summary is None:
+        summary = refresh_stats_summary(owner_id)
+    return summary.data
+
+
+async def aget_skill_stats(owner_id=None):
+    """Async version of get_skill_stats"""
+    if not settings.SKILL_STATS_MATERIALIZED:
+        totals = await Skill.objects.filter(owner_id=owner_id).order_by().aaggregate(**skill_stats_aggregates())
+        return build_skill_stats(totals)
+
+    summary = await StatsSummary.objects.filter(owner_id=owner_id).afirst()
+    if summary is None:
+        summary = await sync_to_async(refresh_stats_summary)(owner_id)
+    return summary.data
+
+
+def stats_version(owner_id=None):
+    """Values the stats ETag of one owner is built from.
+
+    The skills' version changes with every write, and the summary row's
+    timestamp with every refresh, which a worker may only run after the write.
+    """
+    version = queryset_version(Skill.objects.filter(owner_id=owner_id))
+    if settings.SKILL_STATS_MATERIALIZED:
+        version.append(_summary_updated_at(StatsSummary.objects.filter(owner_id=owner_id).first()))
+    return version
+
+
+async def astats_version(owner_id=None):
+    """Async version of stats_version"""
+    version = await aqueryset_version(Skill.objects.filter(owner_id=owner_id))
+    if settings.SKILL_STATS_MATERIALIZED:
+        version.append(_summary_updated_at(await StatsSummary.objects.filter(owner_id=owner_id).afirst()))
+    return version
+
+
+def _summary_updated_at(summary):
+    return summary.updated_at.isoformat() if summary is not None else None
+
+
+def schedule_stats_refresh(owner_id=None, using=None):
+    """Refresh one owner's materialized stats once the current transaction commits.
+
+    Repeated calls for an owner inside one transaction collapse into a single
+    refresh; with BACKGROUND_TASKS on, so do calls while its job waits.
+    """
+    if not settings.SKILL_STATS_MATERIALIZED:
+        return
+    enqueue(refresh_stats_summary, owner_id, key=f'stats:{owner_id}', using=using)
@@ -0,0 +1,129 @@
+"""Recomputation moved off the request path.
+
+``enqueue(func, *args, key=...)`` schedules ``func(*args)`` for after the
+current transaction commits; ``func`` must be a module-level function and
+``args`` JSON-serializable. Calls with the same ``key`` collapse: while one
+is waiting, enqueueing another does nothing.
+
+With ``BACKGROUND_TASKS`` off (the default), the call runs in the request's
+process once the transaction commits, as before. With it on, it is stored
+as a ``Job`` row in the same transaction, so a rollback discards it, and
+``manage.py run_tasks`` workers pick it up. A worker takes jobs with
+``SELECT ... FOR UPDATE SKIP LOCKED`` where the database has it, so several
+workers never wait on each other; elsewhere (SQLite) it claims each job
+with a conditional UPDATE. A claimed job is leased: if its worker dies, the
+job is due again once the lease runs out. Failed jobs are retried with
+exponential backoff and kept with their traceback after the last attempt.
+"""
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+# Seconds a worker may run a job before other workers take it over
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 5
+# Delay before the first retry; it doubles with each attempt up to MAX_BACKOFF_SECONDS
+BACKOFF_SECONDS = 10
+MAX_BACKOFF_SECONDS = 3600
+
+
+def task_name(func):
+    """Dotted path a worker imports ``func`` by"""
+    if '.' in func.__qualname__ or '<' in func.__qualname__:
+        raise ValueError(f'{func.__qualname__} is not a module-level function')
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+class PendingTask:
+    """On-commit callback of one enqueued call; runs it unless a worker will"""
+
+    def __init__(self, func, args, key, run):
+        self.func = func
+        self.args = args
+        self.key = key
+        self.run = run
+
+    def __call__(self):
+        if self.run:
+            self.func(*self.args)
+
+
+def enqueue(func, *args, key=None, using=None):
+    """Run ``func(*args)`` once the current transaction on ``using`` commits"""
+    name = task_name(func)
+    connection = transaction.get_connection(using)
+    if key is not None and connection.in_atomic_block:
+        for entry in connection.run_on_commit:
+            if isinstance(entry[1], PendingTask) and entry[1].key == key:
+                return
+
+    background = settings.BACKGROUND_TASKS
+    if background:
+        # A pending job with the same key already covers this call
+        Job.objects.using(using or router.db_for_write(Job)).bulk_create(
+            [Job(name=name, args=list(args), key=key)], ignore_conflicts=True
+        )
+    if connection.in_atomic_block or not background:
+        transaction.on_commit(PendingTask(func, args, key, run=not background), using=using)
+
+
+def claim_jobs(limit, lease=LEASE_SECONDS, using=None):
+    """Lease up to ``limit`` due jobs to this worker"""
+    db = using or router.db_for_write(Job)
+    now = timezone.now()
+    claim = {'status': Job.RUNNING, 'run_after': now + timedelta(seconds=lease), 'attempts': F('attempts') + 1}
+    # Running jobs are due again when their lease has run out
+    due = Job.objects.using(db).filter(status__in=[Job.PENDING, Job.RUNNING], run_after__lte=now)
+
+    if transaction.get_connection(db).features.has_select_for_update_skip_locked:
+        with transaction.atomic(using=db):
+            jobs = list(due.select_for_update(skip_locked=True)[:limit])
+            Job.objects.using(db).filter(pk__in=[job.pk for job in jobs]).update(**claim)
+    else:
+        # Only the worker whose UPDATE still finds the job as it was read gets it
+        jobs = [
+            job for job in due[:limit]
+            if Job.objects.using(db).filter(pk=job.pk, status=job.status, run_after=job.run_after).update(**claim)
+        ]
+
+    for job in jobs:
+        job.status = Job.RUNNING
+        job.run_after = claim['run_after']
+        job.attempts += 1
+    return jobs
+
+
+def run_job(job, max_attempts=MAX_ATTEMPTS, using=None):
+    """Run a claimed job; returns whether it succeeded"""
+    db = using or router.db_for_write(Job)
+    # Another worker owns the job once it has claimed it again
+    mine = Job.objects.using(db).filter(pk=job.pk, status=Job.RUNNING, attempts=job.attempts)
+    try:
+        if job.attempts > max_attempts:
+            # Its earlier attempts never finished, e.g. they took their worker down with them
+            raise RuntimeError(f'Lease ran out on all {max_attempts} attempts')
+        import_string(job.name)(*job.args)
+    except Exception:
+        error = traceback.format_exc()
+    else:
+        mine.delete()
+        return True
+
+    if job.attempts >= max_attempts:
+        mine.update(status=Job.FAILED, last_error=error)
+        return False
+    delay = min(BACKOFF_SECONDS * 2 ** (job.attempts - 1), MAX_BACKOFF_SECONDS)
+    try:
+        with transaction.atomic(using=db):
+            mine.update(status=Job.PENDING, run_after=timezone.now() + timedelta(seconds=delay), last_error=error)
+    except IntegrityError:
+        # A newer job with the same key is waiting and redoes the work
+        mine.delete()
+    return False
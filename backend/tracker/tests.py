@@ -1,3 +1,1774 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import re
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import DatabaseError, connection, connections, transaction
+from django.db.models import Avg, Count, QuerySet, Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+
+from .categorization import CATEGORY_CHOICES, CATEGORY_KEYWORDS, KeywordMatcher, categorize
+from .events import RETRY_MS, CancelOnDisconnect, get_broadcaster, stream_events
+from .metrics import REQUEST_SERIALIZE_DURATION, serialization_timer
+from .models import (
+    ArchivedActivity, DailySkillHours, Job, LearningActivity, MonthlySkillHours, Skill, Tombstone, recount_skill_hours,
+)
+from .pagination import (
+    ActivityDeltaSyncPagination, ActivityKeysetPagination, DeltaSyncPagination, KeysetPagination,
+    SkillDeltaSyncPagination, SkillKeysetPagination,
+)
+from .stats import refresh_stats_summary
+from .tasks import claim_jobs, enqueue, run_job
+from .views import LearningActivityViewSet, SkillViewSet
+
+# Tables that grow with usage; queries must reach them through an index
+LARGE_TABLES = {
+    model._meta.db_table
+    for model in (Skill, LearningActivity, DailySkillHours, MonthlySkillHours, ArchivedActivity, Tombstone)
+}
+
+# SQLite reports a full table scan as "SCAN <table>" (older versions "SCAN TABLE <table>")
+# and an index walk as "SCAN <table> USING [COVERING] INDEX <name>"
+SQLITE_FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+
+
+def full_scans(sql):
+    """Tables ``sql`` reads with a sequential scan, according to EXPLAIN"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # With sequential scans priced out, one that remains means no index can serve the query
+            cursor.execute('SET enable_seqscan = off')
+            try:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+                plan = cursor.fetchone()[0]
+            finally:
+                cursor.execute('RESET enable_seqscan')
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return set(_postgres_seq_scans(plan[0]['Plan']))
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return {match.group(1) for *_, detail in cursor.fetchall() if (match := SQLITE_FULL_SCAN.match(detail))}
+
+
+def _postgres_seq_scans(node):
+    if node['Node Type'] == 'Seq Scan':
+        yield node['Relation Name']
+    for child in node.get('Plans', ()):
+        yield from _postgres_seq_scans(child)
+
+
+class QueryPlanTests(TestCase):
+    """Runs EXPLAIN on every query the read endpoints issue against a generated
+    dataset and fails when one scans a large table from end to end.
+
+    Add new query shapes to ``ENDPOINTS``; a full scan that is the point of
+    the query (an all-time aggregate, an unfiltered export) goes in its
+    ``allowed`` set.
+    """
+    # (path, tables it may scan in full); {skill} and {activity} are replaced with ids,
+    # {since} with a delta sync cursor from a day ago and the *_cursor ones with
+    # keyset cursors that start a page after (or, back, before) that skill and activity
+    ENDPOINTS = [
+        ('/api/skills/', set()),
+        ('/api/skills/?pagination=cursor', set()),
+        ('/api/skills/?pagination=cursor&cursor={skill_cursor}', set()),
+        ('/api/skills/?pagination=cursor&cursor={skill_back_cursor}', set()),
+        ('/api/skills/?status=not_started', set()),
+        ('/api/skills/?platform=udemy', set()),
+        ('/api/skills/?resource_type=course', set()),
+        ('/api/skills/?category=Backend%20Development', set()),
+        ('/api/skills/?tag=python', set()),
+        ('/api/skills/?status=paused&pagination=cursor', set()),
+        ('/api/skills/?status=paused&pagination=cursor&cursor={skill_cursor}', set()),
+        ('/api/skills/?since=', set()),
+        ('/api/skills/?since={since}', set()),
+        ('/api/skills/{skill}/', set()),
+        ('/api/skills/tags/', set()),
+        # Computed from every skill when the materialized summary is missing
+        ('/api/skills/stats/', {'tracker_skill'}),
+        ('/api/activities/', set()),
+        ('/api/activities/?pagination=cursor', set()),
+        ('/api/activities/?pagination=cursor&cursor={activity_cursor}', set()),
+        ('/api/activities/?skill={skill}', set()),
+        ('/api/activities/?skill={skill}&pagination=cursor', set()),
+        ('/api/activities/?skill={skill}&pagination=cursor&cursor={activity_cursor}', set()),
+        ('/api/activities/?since=', set()),
+        ('/api/activities/?since={since}', set()),
+        ('/api/activities/{activity}/', set()),
+        ('/api/activities/timeseries/', set()),
+        ('/api/activities/timeseries/?skill={skill}', set()),
+        ('/api/activities/timeseries/?start=2024-01-01&bucket=week&group_by=skill', set()),
+        # All-time totals per day come from the whole rollup table
+        ('/api/activities/insights/', {'tracker_dailyskillhours'}),
+        ('/api/activities/export/?skill={skill}', set()),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        # Shared data for anonymous requests, and a second owner's data they must not touch
+        cls.user = User.objects.create_user('learner')
+        call_command('generate_data', skills=300, activities=6000, seed=19, stdout=StringIO())
+        call_command('generate_data', skills=300, activities=6000, seed=20, owner='learner', stdout=StringIO())
+        # Deletions for delta syncs to report, with the activities they cascade to
+        for owner in (None, cls.user):
+            Skill.objects.filter(pk__in=Skill.objects.filter(owner=owner).values('pk')[:20]).delete()
+
+    def setUp(self):
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            self.skipTest(f'No EXPLAIN parser for {connection.vendor}')
+        cache.clear()
+
+    def assert_indexed(self, queries, allowed=()):
+        for query in queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            scanned = (full_scans(sql) & LARGE_TABLES) - set(allowed)
+            self.assertFalse(scanned, f'Sequential scan of {", ".join(sorted(scanned))} in: {sql}')
+
+    def assert_endpoints_indexed(self, owner):
+        skill = Skill.objects.filter(owner=owner).order_by('-hours_spent').first()
+        activity = LearningActivity.objects.filter(skill=skill).first()
+        day_ago = (timezone.now() - timedelta(days=1), 0)
+        since = DeltaSyncPagination().encode_positions(day_ago, day_ago)
+        cursors = {
+            'skill_cursor': SkillKeysetPagination().encode_cursor(skill),
+            'skill_back_cursor': SkillKeysetPagination().encode_cursor(skill, reverse=True),
+            'activity_cursor': ActivityKeysetPagination().encode_cursor(activity),
+        }
+        for path, allowed in self.ENDPOINTS:
+            path = path.format(skill=skill.pk, activity=activity.pk, since=since, **cursors)
+            with self.subTest(path=path, owner=owner):
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(path, secure=True)
+                    # Exports run their queries while the body streams
+                    b''.join(getattr(response, 'streaming_content', ()))
+                self.assertEqual(response.status_code, 200)
+                self.assert_indexed(context.captured_queries, allowed)
+
+    def test_endpoints_use_indexes(self):
+        self.assert_endpoints_indexed(None)
+
+    def test_owner_endpoints_use_indexes(self):
+        self.client.force_login(self.user)
+        self.assert_endpoints_indexed(self.user)
+
+    def test_search_uses_indexes(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('Search uses the GIN indexes only on PostgreSQL')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/skills/?search=python', secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assert_indexed(context.captured_queries)
+
+    def test_skill_hour_totals_use_indexes(self):
+        skill = Skill.objects.order_by('-hours_spent').first()
+        with CaptureQueriesContext(connection) as context:
+            skill.update_hours_and_status()
+        self.assert_indexed(context.captured_queries)
+
+
+@override_settings(SKILL_STATS_MATERIALIZED=True, BACKGROUND_TASKS=True, THROTTLE_RATE=0)
+class StatsValidatorTests(TransactionTestCase):
+    """Stats served from a summary a worker refreshes must not be cached under a newer ETag"""
+
+    def setUp(self):
+        self.skill = Skill.objects.create(name='Django', platform='udemy', resource_type='course')
+        LearningActivity.objects.create(skill=self.skill, date=timezone.localdate(), hours_spent=9)
+        call_command('run_tasks', once=True, stdout=StringIO())
+
+    def assert_revalidates(self, path):
+        first = self.client.get(path, secure=True)
+        self.assertEqual(first.json()['total_hours'], 9.0)
+
+        LearningActivity.objects.create(skill=self.skill, date=timezone.localdate(), hours_spent=2)
+        # Before the worker runs the body is still the old summary, under a new ETag
+        stale = self.client.get(path, secure=True, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(stale.json()['total_hours'], 9.0)
+
+        call_command('run_tasks', once=True, stdout=StringIO())
+        fresh = self.client.get(path, secure=True, HTTP_IF_NONE_MATCH=stale['ETag'])
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual(fresh.json()['total_hours'], 11.0)
+        self.assertEqual(self.client.get(path, secure=True, HTTP_IF_NONE_MATCH=fresh['ETag']).status_code, 304)
+
+    def test_stats_revalidate_after_refresh(self):
+        self.assert_revalidates('/api/skills/stats/')
+
+    def test_async_stats_revalidate_after_refresh(self):
+        self.assert_revalidates('/api/async/skills/stats/')
+
+
+@override_settings(THROTTLE_RATE=0)
+class SkillUpdateTests(TestCase):
+
+    def setUp(self):
+        self.skill = Skill.objects.create(name='Django', platform='udemy', resource_type='course', estimated_hours=10)
+        LearningActivity.objects.create(skill=self.skill, date=timezone.localdate(), hours_spent=3)
+
+    def test_update_responds_with_recounted_status(self):
+        # Hours drifted by a bulk edit are recounted too
+        Skill.objects.filter(pk=self.skill.pk).update(hours_spent=99)
+        response = self.client.patch(
+            f'/api/skills/{self.skill.pk}/', {'estimated_hours': 3}, content_type='application/json', secure=True
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(float(response.json()['hours_spent']), 3.0)
+        self.assertEqual(response.json()['status'], 'completed')
+
+    @override_settings(BACKGROUND_TASKS=True)
+    def test_update_queues_recount(self):
+        self.client.patch(
+            f'/api/skills/{self.skill.pk}/', {'estimated_hours': 3}, content_type='application/json', secure=True
+        )
+        self.assertTrue(Job.objects.filter(key=f'skill-hours:{self.skill.pk}').exists())
+        self.assertEqual(Skill.objects.get(pk=self.skill.pk).status, 'in_progress')
+
+
+@override_settings(REPLICA_DATABASES=['replica'], THROTTLE_RATE=0)
+class ReplicaRoutingTests(TransactionTestCase):
+    """Routing against a second SQLite database standing in for a replica.
+
+    Unlike a mirrored replica it holds its own rows, so a read that goes to
+    the wrong side returns the wrong skills.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Added after the test case has guarded its databases, and emptied by the tests themselves
+        cls.replica_dir = tempfile.mkdtemp()
+        connections.settings['replica'] = {
+            **connections.settings['default'],
+            'NAME': os.path.join(cls.replica_dir, 'replica.sqlite3'),
+        }
+        call_command('migrate', database='replica', verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        os.remove(os.path.join(cls.replica_dir, 'replica.sqlite3'))
+        os.rmdir(cls.replica_dir)
+        super().tearDownClass()
+
+    def tearDown(self):
+        call_command('flush', database='replica', interactive=False, verbosity=0)
+
+    def setUp(self):
+        Skill.objects.using('default').create(name='On primary', platform='udemy', resource_type='course')
+        Skill.objects.using('replica').create(name='On replica', platform='udemy', resource_type='course')
+
+    def skill_names(self):
+        response = self.client.get('/api/skills/', secure=True)
+        self.assertEqual(response.status_code, 200)
+        return {skill['name'] for skill in response.json()['results']}
+
+    def test_safe_requests_read_from_replica(self):
+        self.assertEqual(self.skill_names(), {'On replica'})
+
+    def test_writes_go_to_primary_and_pin_reads(self):
+        response = self.client.post(
+            '/api/skills/', {'name': 'Written', 'platform': 'udemy', 'resource_type': 'course'},
+            content_type='application/json', secure=True,
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Skill.objects.using('default').filter(name='Written').exists())
+        self.assertFalse(Skill.objects.using('replica').filter(name='Written').exists())
+        self.assertIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+        # The client sends the pin back, so it reads its own write from the primary
+        self.assertEqual(self.skill_names(), {'On primary', 'Written'})
+
+        del self.client.cookies[settings.REPLICA_PIN_COOKIE]
+        self.assertEqual(self.skill_names(), {'On replica'})
+
+    def test_sessions_and_users_read_from_primary(self):
+        # The login only reached the primary; the replica has the user but not the session
+        user = User.objects.create_user('learner')
+        User.objects.using('replica').create(pk=user.pk, username='learner')
+        Skill.objects.using('replica').create(name='Mine', platform='udemy', resource_type='course', owner_id=user.pk)
+        self.client.force_login(user)
+        self.assertEqual(self.skill_names(), {'Mine'})
+
+
+@override_settings(THROTTLE_RATE=0)
+@mock.patch.object(SkillDeltaSyncPagination, 'page_size', 2)
+@mock.patch.object(ActivityDeltaSyncPagination, 'page_size', 2)
+class DeltaSyncTests(TestCase):
+
+    def setUp(self):
+        self.skills = [
+            Skill.objects.create(name=f'Skill {index}', platform='udemy', resource_type='course')
+            for index in range(3)
+        ]
+        self.activities = [
+            LearningActivity.objects.create(skill=skill, date=timezone.localdate(), hours_spent=1)
+            for skill in self.skills
+        ]
+        # Written well before the syncs start
+        hour_ago = timezone.now() - timedelta(hours=1)
+        Skill.objects.update(updated_at=hour_ago)
+        LearningActivity.objects.update(updated_at=hour_ago)
+
+    def sync(self, path, since='', at=None):
+        """Follow ``next`` to the end; the ids changed, the ids deleted and the cursor to sync from next"""
+        changed, deleted = [], []
+        url = f'{path}?since={since}'
+        with mock.patch('tracker.pagination.timezone.now', return_value=at or timezone.now()):
+            while url:
+                response = self.client.get(url, secure=True)
+                self.assertEqual(response.status_code, 200)
+                body = response.json()
+                changed += [row['id'] for row in body['results']]
+                deleted += body['deleted']
+                url = body['next']
+        return changed, deleted, body['cursor']
+
+    def test_sync_spans_updates_and_deletes(self):
+        changed, deleted, cursor = self.sync('/api/skills/')
+        self.assertEqual(sorted(changed), [skill.pk for skill in self.skills])
+        self.assertEqual(deleted, [])
+
+        first, second, third = self.skills
+        deleted_ids = [second.pk, third.pk]
+        first.name = 'Renamed'
+        first.save()
+        second.delete()
+        Skill.objects.filter(pk=third.pk).delete()
+        added = Skill.objects.create(name='Added', platform='udemy', resource_type='course')
+
+        # Once the writes have settled, one walk reports them and the next finds nothing
+        settled = timezone.now() + timedelta(minutes=1)
+        changed, deleted, cursor = self.sync('/api/skills/', cursor, at=settled)
+        self.assertEqual(sorted(changed), [first.pk, added.pk])
+        self.assertEqual(sorted(deleted), deleted_ids)
+        self.assertEqual(self.sync('/api/skills/', cursor, at=settled)[:2], ([], []))
+
+    def test_recent_changes_are_sent_again(self):
+        cursor = self.sync('/api/skills/')[2]
+        skill = self.skills[0]
+        skill.save()
+        # Still inside the settle window, in case an earlier write commits after it
+        for _ in range(2):
+            changed, _, cursor = self.sync('/api/skills/', cursor)
+            self.assertEqual(changed, [skill.pk])
+
+    def test_skill_deletes_leave_activity_tombstones(self):
+        cursor = self.sync('/api/activities/')[2]
+        response = self.client.delete(f'/api/skills/{self.skills[0].pk}/', secure=True)
+        self.assertEqual(response.status_code, 204)
+        # Queryset deletes cascade the same way
+        Skill.objects.filter(pk=self.skills[1].pk).delete()
+
+        changed, deleted, _ = self.sync('/api/activities/', cursor, at=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(changed, [])
+        self.assertEqual(sorted(deleted), [activity.pk for activity in self.activities[:2]])
+
+    @override_settings(SYNC_TOMBSTONE_DAYS=7)
+    def test_cursor_older_than_tombstones_is_gone(self):
+        old = (timezone.now() - timedelta(days=8), 0)
+        since = DeltaSyncPagination().encode_positions(old, old)
+        response = self.client.get(f'/api/skills/?since={since}', secure=True)
+        self.assertEqual(response.status_code, 410)
+
+        recent = (timezone.now() - timedelta(days=6), 0)
+        since = DeltaSyncPagination().encode_positions(recent, recent)
+        self.assertEqual(self.client.get(f'/api/skills/?since={since}', secure=True).status_code, 200)
+
+
+# Calls of the tasks below, which workers import by their dotted path
+task_calls = []
+
+
+def record_task(value):
+    task_calls.append(value)
+
+
+def failing_task(value):
+    task_calls.append(value)
+    raise ValueError(f'cannot handle {value}')
+
+
+@override_settings(BACKGROUND_TASKS=True)
+class TaskQueueTests(TransactionTestCase):
+    """Jobs go through real commits, since enqueue() works with on-commit callbacks"""
+
+    def setUp(self):
+        task_calls.clear()
+
+    def run_worker(self, **options):
+        out, err = StringIO(), StringIO()
+        call_command('run_tasks', once=True, stdout=out, stderr=err, **options)
+        return out.getvalue()
+
+    def test_jobs_with_the_same_key_collapse(self):
+        with transaction.atomic():
+            enqueue(record_task, 1, key='one')
+            # Skipped through the transaction's on-commit list
+            enqueue(record_task, 1, key='one')
+        # Ignored by the unique index on pending keys
+        enqueue(record_task, 1, key='one')
+        enqueue(record_task, 2)
+        self.assertEqual(Job.objects.count(), 2)
+
+        # A job already running may have read the old data, so the key is free again
+        self.assertEqual(len(claim_jobs(10)), 2)
+        enqueue(record_task, 1, key='one')
+        self.assertEqual(Job.objects.filter(status=Job.PENDING).count(), 1)
+
+    def test_rolled_back_jobs_are_discarded(self):
+        with transaction.atomic():
+            enqueue(record_task, 1, key='one')
+            try:
+                with transaction.atomic():
+                    enqueue(record_task, 2, key='two')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            # The savepoint took its marker with it, so this one is stored
+            enqueue(record_task, 2, key='two')
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            enqueue(record_task, 3, key='three')
+            raise RuntimeError
+        self.assertEqual(sorted(Job.objects.values_list('key', flat=True)), ['one', 'two'])
+
+        self.assertIn('Ran 2 jobs, 0 failed', self.run_worker())
+        self.assertEqual(sorted(task_calls), [1, 2])
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(BACKGROUND_TASKS=False)
+    def test_tasks_run_on_commit_without_workers(self):
+        with transaction.atomic():
+            enqueue(record_task, 1, key='one')
+            enqueue(record_task, 1, key='one')
+            self.assertEqual(task_calls, [])
+        self.assertEqual(task_calls, [1])
+        self.assertFalse(Job.objects.exists())
+
+    @mock.patch.object(type(connection.features), 'has_select_for_update_skip_locked', False)
+    def test_claims_without_skip_locked_go_to_one_worker(self):
+        for value in range(3):
+            enqueue(record_task, value)
+        rival = None
+        real_update = QuerySet.update
+
+        def claimed_meanwhile(queryset, **kwargs):
+            nonlocal rival
+            # Another worker claims everything between this worker's read and its first UPDATE
+            if rival is None:
+                rival = []
+                rival.extend(claim_jobs(10))
+            return real_update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', autospec=True, side_effect=claimed_meanwhile):
+            mine = claim_jobs(10)
+        self.assertEqual(mine, [])
+        self.assertEqual(len(rival), 3)
+        self.assertEqual(set(Job.objects.values_list('status', 'attempts')), {(Job.RUNNING, 1)})
+
+    def test_expired_leases_are_taken_over(self):
+        enqueue(record_task, 1)
+        [lost] = claim_jobs(10, lease=0)
+        [taken] = claim_jobs(10)
+        self.assertEqual(taken.attempts, 2)
+        # The first worker finishing late leaves the job to the one that owns it now
+        self.assertTrue(run_job(lost))
+        self.assertTrue(Job.objects.exists())
+        self.assertTrue(run_job(taken))
+        self.assertFalse(Job.objects.exists())
+
+    def test_failed_jobs_back_off_then_stop(self):
+        enqueue(failing_task, 1, key='fails')
+        for attempt, delay in ((1, 10), (2, 20)):
+            before = timezone.now()
+            self.assertIn('0 jobs, 1 failed', self.run_worker(max_attempts=3))
+            job = Job.objects.get()
+            self.assertEqual((job.status, job.attempts), (Job.PENDING, attempt))
+            self.assertIn('ValueError: cannot handle 1', job.last_error)
+            self.assertGreaterEqual(job.run_after, before + timedelta(seconds=delay))
+            # Not due yet
+            self.assertIn('Ran 0 jobs', self.run_worker(max_attempts=3))
+            Job.objects.update(run_after=timezone.now())
+
+        self.assertIn('0 jobs, 1 failed', self.run_worker(max_attempts=3))
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 3))
+        self.assertEqual(task_calls, [1, 1, 1])
+        self.assertEqual(claim_jobs(10), [])
+        # A failed job does not hold its key
+        enqueue(failing_task, 1, key='fails')
+        self.assertEqual(Job.objects.filter(status=Job.PENDING).count(), 1)
+
+    def test_retry_yields_to_a_newer_job(self):
+        enqueue(failing_task, 1, key='fails')
+        [job] = claim_jobs(10)
+        enqueue(failing_task, 1, key='fails')
+        self.assertFalse(run_job(job))
+        self.assertEqual(list(Job.objects.values_list('status', 'attempts')), [(Job.PENDING, 0)])
+
+
+class HourTotalsTests(TestCase):
+    """Skill hours and daily rollups kept by deltas must match a full recount"""
+
+    def setUp(self):
+        self.first = Skill.objects.create(name='Django', platform='udemy', resource_type='course', estimated_hours=5)
+        self.second = Skill.objects.create(name='React', platform='udemy', resource_type='course')
+        self.today = timezone.localdate()
+
+    def assert_totals_match_recount(self):
+        for skill in (self.first, self.second):
+            kept = Skill.objects.values_list('hours_spent', 'status').get(pk=skill.pk)
+            recount_skill_hours(skill.pk)
+            self.assertEqual(kept, Skill.objects.values_list('hours_spent', 'status').get(pk=skill.pk))
+        daily = {
+            (row['skill_id'], row['date']): (row['hours'], row['activity_count'])
+            for row in DailySkillHours.objects.values('skill_id', 'date', 'hours', 'activity_count')
+        }
+        expected = {
+            (row['skill_id'], row['date']): (row['hours'], row['count'])
+            for row in LearningActivity.objects.order_by().values('skill_id', 'date')
+            .annotate(hours=Sum('hours_spent'), count=Count('id'))
+        }
+        self.assertEqual(daily, expected)
+
+    def test_creates_edits_moves_and_deletes(self):
+        kept = LearningActivity.objects.create(skill=self.first, date=self.today, hours_spent=2)
+        moved = LearningActivity.objects.create(skill=self.first, date=self.today, hours_spent=1.5)
+        removed = LearningActivity.objects.create(skill=self.second, date=self.today, hours_spent=1)
+        self.assert_totals_match_recount()
+
+        kept.hours_spent = 4
+        kept.save()
+        self.assert_totals_match_recount()
+        self.assertEqual(Skill.objects.get(pk=self.first.pk).status, 'completed')
+
+        moved.skill = self.second
+        moved.date = self.today - timedelta(days=1)
+        moved.save()
+        self.assert_totals_match_recount()
+
+        removed.delete()
+        kept.delete()
+        self.assert_totals_match_recount()
+        self.assertEqual(Skill.objects.get(pk=self.first.pk).status, 'not_started')
+
+    def test_queryset_deletes(self):
+        for skill in (self.first, self.second):
+            for days in range(3):
+                LearningActivity.objects.create(skill=skill, date=self.today - timedelta(days=days), hours_spent=1)
+        # As the admin's bulk delete action does
+        LearningActivity.objects.filter(date__lt=self.today).delete()
+        self.assert_totals_match_recount()
+        self.assertEqual(float(Skill.objects.get(pk=self.first.pk).hours_spent), 1.0)
+
+
+@override_settings(THROTTLE_RATE=0)
+class ActivityBatchTests(TestCase):
+
+    def setUp(self):
+        self.skill = Skill.objects.create(name='Django', platform='udemy', resource_type='course')
+        self.today = timezone.localdate().isoformat()
+        self.activities = [
+            LearningActivity.objects.create(skill=self.skill, date=self.today, hours_spent=1) for _ in range(3)
+        ]
+
+    def batch(self, operations):
+        return self.client.post('/api/activities/batch/', operations, content_type='application/json', secure=True)
+
+    def snapshot(self):
+        return (
+            list(LearningActivity.objects.order_by('pk').values_list('pk', 'hours_spent')),
+            Skill.objects.get(pk=self.skill.pk).hours_spent,
+        )
+
+    def test_applies_every_operation(self):
+        first, second, third = self.activities
+        response = self.batch([
+            {'op': 'create', 'data': {'skill': self.skill.pk, 'date': self.today, 'hours_spent': 2}},
+            {'op': 'update', 'id': first.pk, 'data': {'hours_spent': 3}},
+            {'op': 'delete', 'id': second.pk},
+        ])
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body['created'], body['updated'], body['deleted']), (1, 1, 1))
+        self.assertEqual([result['op'] for result in body['results']], ['create', 'update', 'delete'])
+        self.assertEqual(body['results'][2], {'op': 'delete', 'id': second.pk})
+        self.assertFalse(LearningActivity.objects.filter(pk=second.pk).exists())
+        # 2 created + 3 updated + 1 untouched
+        self.assertEqual(float(Skill.objects.get(pk=self.skill.pk).hours_spent), 6.0)
+
+    def test_invalid_operations_apply_nothing(self):
+        before = self.snapshot()
+        first, second, _ = self.activities
+        response = self.batch([
+            {'op': 'update', 'id': first.pk, 'data': {'hours_spent': 3}},
+            {'op': 'delete', 'id': second.pk},
+            {'op': 'delete', 'id': first.pk},
+            {'op': 'create', 'data': {'skill': self.skill.pk, 'date': 'yesterday', 'hours_spent': 2}},
+            {'op': 'update', 'id': 999999, 'data': {}},
+            {'op': 'rename', 'id': second.pk},
+        ])
+        self.assertEqual(response.status_code, 400)
+        body = response.json()
+        self.assertEqual(body['detail'], 'No operations were applied.')
+        # One entry per failing operation, by index
+        self.assertEqual([error['index'] for error in body['errors']], [2, 3, 4, 5])
+        self.assertIn('already changed by operation 0', body['errors'][0]['errors']['id'][0])
+        self.assertIn('date', body['errors'][1]['errors'])
+        self.assertEqual(body['errors'][2]['errors'], {'id': ['Not found.']})
+        self.assertIn('op', body['errors'][3]['errors'])
+        self.assertEqual(self.snapshot(), before)
+
+    def test_failure_while_writing_rolls_back(self):
+        before = self.snapshot()
+        first, second, _ = self.activities
+        with mock.patch.object(LearningActivity, 'apply_rollups', side_effect=RuntimeError('rollup failed')):
+            with self.assertRaises(RuntimeError):
+                self.batch([
+                    {'op': 'create', 'data': {'skill': self.skill.pk, 'date': self.today, 'hours_spent': 2}},
+                    {'op': 'update', 'id': first.pk, 'data': {'hours_spent': 3}},
+                    {'op': 'delete', 'id': second.pk},
+                ])
+        self.assertEqual(self.snapshot(), before)
+
+
+@override_settings(THROTTLE_RATE=0)
+class ActivityInputTests(TestCase):
+
+    def setUp(self):
+        self.skill = Skill.objects.create(name='Django', platform='udemy', resource_type='course')
+        self.today = timezone.localdate().isoformat()
+
+    def test_skill_ids_must_be_integers(self):
+        for path in ('/api/activities/', '/api/activities/import/'):
+            for skill in (self.skill.pk + 0.5, True, f'{self.skill.pk}.0', [self.skill.pk]):
+                row = {'skill': skill, 'date': self.today, 'hours_spent': 1}
+                with self.subTest(path=path, skill=skill):
+                    data = row if path == '/api/activities/' else [row]
+                    response = self.client.post(path, data, content_type='application/json', secure=True)
+                    self.assertEqual(response.status_code, 400)
+        for skill in (self.skill.pk, str(self.skill.pk)):
+            response = self.client.post(
+                '/api/activities/', {'skill': skill, 'date': self.today, 'hours_spent': 1},
+                content_type='application/json', secure=True
+            )
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(LearningActivity.objects.count(), 2)
+
+    def test_undecodable_imports_are_rejected(self):
+        # "café" in Latin-1, which is not valid UTF-8
+        for content_type, body in (
+            ('application/x-ndjson', b'{"skill": %d, "date": "%s", "hours_spent": 1, "notes": "caf\xe9"}\n'),
+            ('text/csv', b'skill,date,hours_spent,notes\n%d,%s,1,caf\xe9\n'),
+        ):
+            with self.subTest(content_type=content_type):
+                response = self.client.post(
+                    '/api/activities/import/', body % (self.skill.pk, self.today.encode()),
+                    content_type=content_type, secure=True
+                )
+                self.assertEqual(response.status_code, 400)
+
+
+@override_settings(THROTTLE_RATE=0)
+class CompactionTests(TestCase):
+
+    def setUp(self):
+        self.skill = Skill.objects.create(name='Django', platform='udemy', resource_type='course')
+        today = timezone.localdate()
+        self.old = [
+            LearningActivity.objects.create(skill=self.skill, date=today - timedelta(days=days), hours_spent=2)
+            for days in (400, 430)
+        ]
+        self.recent = LearningActivity.objects.create(skill=self.skill, date=today, hours_spent=1)
+
+    def test_compaction_moves_old_activities(self):
+        cursor = self.client.get('/api/activities/?since=', secure=True).json()['cursor']
+        timeseries = self.client.get('/api/activities/timeseries/?bucket=month', secure=True).json()
+        call_command('compact_activities', months=12, stdout=StringIO())
+
+        self.assertEqual(list(LearningActivity.objects.values_list('pk', flat=True)), [self.recent.pk])
+        self.assertEqual(
+            sorted(ArchivedActivity.objects.values_list('pk', flat=True)), sorted(a.pk for a in self.old)
+        )
+        self.assertEqual(MonthlySkillHours.objects.aggregate(total=Sum('hours'))['total'], 4)
+        # A move, not a deletion: totals stand and syncs report nothing
+        self.assertEqual(float(Skill.objects.get(pk=self.skill.pk).hours_spent), 5.0)
+        recount_skill_hours(self.skill.pk)
+        self.assertEqual(float(Skill.objects.get(pk=self.skill.pk).hours_spent), 5.0)
+        self.assertFalse(Tombstone.objects.exists())
+        later = timezone.now() + timedelta(minutes=1)
+        with mock.patch('tracker.pagination.timezone.now', return_value=later):
+            self.assertEqual(self.client.get(f'/api/activities/?since={cursor}', secure=True).json()['deleted'], [])
+        self.assertEqual(
+            self.client.get('/api/activities/timeseries/?bucket=month', secure=True).json(), timeseries
+        )
+
+    def test_saving_an_archived_activity_does_not_restore_it(self):
+        stale = LearningActivity.objects.get(pk=self.old[0].pk)
+        call_command('compact_activities', months=12, stdout=StringIO())
+        stale.hours_spent = 3
+        with self.assertRaises(DatabaseError):
+            stale.save()
+        self.assertFalse(LearningActivity.objects.filter(pk=stale.pk).exists())
+        self.assertEqual(float(Skill.objects.get(pk=self.skill.pk).hours_spent), 5.0)
+
+
+@override_settings(THROTTLE_RATE=0)
+class InsightsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_days_total_every_skill(self):
+        today = timezone.localdate()
+        for name, hours in (('Django', 2), ('React', 1.5)):
+            skill = Skill.objects.create(name=name, platform='udemy', resource_type='course')
+            for days in (0, 1, 9):
+                LearningActivity.objects.create(skill=skill, date=today - timedelta(days=days), hours_spent=hours)
+        insights = self.client.get('/api/activities/insights/', secure=True).json()
+        self.assertEqual(insights['active_days'], 3)
+        self.assertEqual(insights['current_streak'], 2)
+        self.assertEqual(insights['this_week_hours'], 7.0)
+        self.assertEqual(insights['last_week_hours'], 3.5)
+        self.assertEqual(insights['this_week_activities'], 4)
+
+    def create_activity(self, hours, days_ago=0):
+        skill = Skill.objects.get_or_create(name='Django', platform='udemy', resource_type='course')[0]
+        return LearningActivity.objects.create(
+            skill=skill, date=timezone.localdate() - timedelta(days=days_ago), hours_spent=hours
+        )
+
+    def insights(self):
+        return self.client.get('/api/activities/insights/', secure=True).json()
+
+    def test_out_of_band_writes_show_up(self):
+        self.create_activity(1)
+        self.assertEqual(self.insights()['this_week_hours'], 1.0)
+        # Bulk inserts skip the rollups and the cached state until a reconcile repairs them
+        skill = Skill.objects.get()
+        LearningActivity.objects.bulk_create([
+            LearningActivity(skill=skill, owner_id=None, date=timezone.localdate() - timedelta(days=1), hours_spent=2)
+        ])
+        call_command('reconcile_skill_hours', stdout=StringIO())
+        insights = self.insights()
+        self.assertEqual(insights['this_week_hours'], 3.0)
+        self.assertEqual(insights['current_streak'], 2)
+
+    def test_rebuild_before_the_update_lands_counts_once(self):
+        self.create_activity(1)
+        self.insights()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_activity(2)
+        # Another request rebuilds from the committed rollups before the delta is folded in
+        cache.clear()
+        self.assertEqual(self.insights()['this_week_hours'], 3.0)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.insights()['this_week_hours'], 3.0)
+
+    def test_rebuild_while_a_write_commits_is_not_cached(self):
+        self.create_activity(1)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_activity(2)
+            # Read inside the write's transaction, as a rebuild racing the commit could
+            self.insights()
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.insights()['this_week_hours'], 3.0)
+
+
+@override_settings(THROTTLE_RATE=0)
+class FastPathTests(TestCase):
+    """The values() path and FastJSONRenderer must render the serializers' bytes"""
+    PATHS = [
+        '/api/skills/',
+        '/api/skills/?fields=name,hours_spent,progress_percentage',
+        '/api/skills/?fields=progress_percentage&status=completed',
+        '/api/skills/?pagination=cursor',
+        '/api/skills/?expand=activities',
+        '/api/skills/?fields=name,activities&expand=activities',
+        '/api/activities/',
+        '/api/activities/?fields=date,hours_spent',
+        '/api/activities/?expand=skill',
+        '/api/activities/?pagination=cursor',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        # (estimated hours, hours spent, status): float and whole percentages, capped ones
+        # and the status-based ones of skills without an estimate
+        shapes = [
+            (3, '2.50', 'in_progress'), (3, '1.00', 'in_progress'), (7, '7.00', 'completed'),
+            (4, '9.75', 'completed'), (0, '0.00', 'not_started'), (0, '1.10', 'in_progress'),
+            (0, '3.00', 'completed'), (12, '0.00', 'paused'),
+        ]
+        for index, (estimated, hours, status) in enumerate(shapes):
+            skill = Skill.objects.create(
+                name=f'Skill {index} \u2028 caf\u00e9', platform='udemy', resource_type='course',
+                estimated_hours=estimated, tags='python, web',
+            )
+            LearningActivity.objects.create(skill=skill, date=timezone.localdate(), hours_spent='0.1', notes='\u00e9t\u00e9')
+            Skill.objects.filter(pk=skill.pk).update(hours_spent=hours, status=status)
+        # Timestamps with and without microseconds
+        Skill.objects.filter(pk=skill.pk).update(created_at=timezone.now().replace(microsecond=0))
+
+    def test_fast_path_matches_serializers(self):
+        for path in self.PATHS:
+            with self.subTest(path=path):
+                fast = self.client.get(path, secure=True)
+                with mock.patch.object(SkillViewSet, 'fast_list', False), \
+                        mock.patch.object(SkillViewSet, 'renderer_classes', [JSONRenderer]), \
+                        mock.patch.object(LearningActivityViewSet, 'fast_list', False), \
+                        mock.patch.object(LearningActivityViewSet, 'renderer_classes', [JSONRenderer]):
+                    regular = self.client.get(path, secure=True)
+                self.assertEqual(fast.status_code, 200)
+                self.assertEqual(fast.content, regular.content)
+
+
+@override_settings(THROTTLE_RATE=0)
+class OwnerIsolationTests(TestCase):
+    """Every route reads and writes only the rows of the requesting owner"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user('alice')
+        cls.bob = User.objects.create_user('bob')
+        cls.today = timezone.localdate()
+        # Anonymous requests own the rows without an owner
+        cls.skills = {}
+        cls.activities = {}
+        for owner, hours in ((None, 1), (cls.alice, 2), (cls.bob, 4)):
+            name = owner.username if owner else 'anonymous'
+            skill = Skill.objects.create(
+                name=f'{name} skill', platform='udemy', resource_type='course', tags=f'{name}, shared', owner=owner
+            )
+            cls.skills[name] = skill
+            cls.activities[name] = LearningActivity.objects.create(skill=skill, date=cls.today, hours_spent=hours)
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self, name):
+        if name != 'anonymous':
+            self.client.force_login(getattr(self, name))
+
+    def others(self, name):
+        return [other for other in self.skills if other != name]
+
+    def snapshot(self):
+        return (
+            list(Skill.objects.order_by('pk').values_list('pk', 'name', 'hours_spent')),
+            list(LearningActivity.objects.order_by('pk').values_list('pk', 'hours_spent', 'notes')),
+        )
+
+    def test_lists_and_exports_hold_only_own_rows(self):
+        for name in self.skills:
+            with self.subTest(owner=name):
+                self.client.logout()
+                self.login(name)
+                skill, activity = self.skills[name], self.activities[name]
+                for path, expected in (
+                    ('/api/skills/', [skill.pk]),
+                    ('/api/skills/?pagination=cursor', [skill.pk]),
+                    ('/api/activities/', [activity.pk]),
+                    ('/api/activities/?pagination=cursor', [activity.pk]),
+                    (f'/api/activities/?skill={self.skills[self.others(name)[0]].pk}', []),
+                    ('/api/async/skills/', [skill.pk]),
+                    ('/api/async/activities/', [activity.pk]),
+                ):
+                    response = self.client.get(path, secure=True)
+                    self.assertEqual([row['id'] for row in response.json()['results']], expected, path)
+                for path, expected in (('/api/skills/export/', skill.pk), ('/api/activities/export/', activity.pk)):
+                    response = self.client.get(path + '?format=ndjson', secure=True)
+                    rows = b''.join(response.streaming_content).decode().splitlines()
+                    self.assertEqual([json.loads(row)['id'] for row in rows], [expected], path)
+
+    def test_other_owners_rows_are_not_found(self):
+        before = self.snapshot()
+        for name in self.skills:
+            self.client.logout()
+            self.login(name)
+            for other in self.others(name):
+                with self.subTest(owner=name, other=other):
+                    skill, activity = self.skills[other], self.activities[other]
+                    for path in (f'/api/skills/{skill.pk}/', f'/api/async/skills/{skill.pk}/'):
+                        self.assertEqual(self.client.get(path, secure=True).status_code, 404, path)
+                    for path, data in (
+                        (f'/api/skills/{skill.pk}/', {'name': 'Taken'}),
+                        (f'/api/activities/{activity.pk}/', {'hours_spent': 9}),
+                    ):
+                        self.assertEqual(self.client.get(path, secure=True).status_code, 404)
+                        response = self.client.patch(path, data, content_type='application/json', secure=True)
+                        self.assertEqual(response.status_code, 404)
+                        self.assertEqual(self.client.delete(path, secure=True).status_code, 404)
+        self.assertEqual(self.snapshot(), before)
+
+    def test_writes_cannot_reach_other_owners_skills(self):
+        before = self.snapshot()
+        self.login('alice')
+        skill, activity = self.skills['bob'], self.activities['bob']
+        response = self.client.post('/api/activities/', {
+            'skill': skill.pk, 'date': self.today.isoformat(), 'hours_spent': 1,
+        }, content_type='application/json', secure=True)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('skill', response.json())
+        # Moving an own activity onto another owner's skill
+        response = self.client.patch(f'/api/activities/{self.activities["alice"].pk}/', {
+            'skill': skill.pk,
+        }, content_type='application/json', secure=True)
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/activities/batch/', [
+            {'op': 'create', 'data': {'skill': skill.pk, 'date': self.today.isoformat(), 'hours_spent': 1}},
+            {'op': 'update', 'id': activity.pk, 'data': {'hours_spent': 9}},
+            {'op': 'delete', 'id': self.activities['anonymous'].pk},
+        ], content_type='application/json', secure=True)
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual([error['index'] for error in errors], [0, 1, 2])
+        self.assertIn('skill', errors[0]['errors'])
+        self.assertEqual(errors[1]['errors'], {'id': ['Not found.']})
+        self.assertEqual(errors[2]['errors'], {'id': ['Not found.']})
+        self.assertEqual(self.snapshot(), before)
+
+    def test_aggregates_count_only_own_rows(self):
+        for name, hours in (('anonymous', 1.0), ('alice', 2.0), ('bob', 4.0)):
+            with self.subTest(owner=name):
+                self.client.logout()
+                self.login(name)
+                for path in ('/api/skills/stats/', '/api/async/skills/stats/'):
+                    stats = self.client.get(path, secure=True).json()
+                    self.assertEqual((stats['total_skills'], stats['total_hours']), (1, hours), path)
+                tags = self.client.get('/api/skills/tags/', secure=True).json()
+                self.assertEqual(tags, [{'name': name, 'count': 1}, {'name': 'shared', 'count': 1}])
+                timeseries = self.client.get('/api/activities/timeseries/?group_by=skill', secure=True).json()
+                self.assertEqual(timeseries['results'], [{
+                    'period': self.today.isoformat(), 'skill': self.skills[name].pk, 'hours': hours, 'activities': 1,
+                }])
+                insights = self.client.get('/api/activities/insights/', secure=True).json()
+                self.assertEqual(insights['this_week_hours'], hours)
+                self.assertEqual([skill['id'] for skill in insights['most_active_skills']], [self.skills[name].pk])
+
+
+@override_settings(THROTTLE_RATE=0)
+class ConditionalRequestTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.skill = Skill.objects.create(name='Django', platform='udemy', resource_type='course')
+        self.activity = LearningActivity.objects.create(skill=self.skill, date=timezone.localdate(), hours_spent=1)
+
+    def assert_revalidates(self, path, change):
+        response = self.client.get(path, secure=True)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag, secure=True)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        change()
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_unchanged_lists_are_not_modified(self):
+        self.assert_revalidates('/api/skills/', lambda: Skill.objects.create(
+            name='Flask', platform='udemy', resource_type='course'
+        ))
+        self.assert_revalidates('/api/skills/?pagination=cursor', lambda: Skill.objects.filter(name='Flask').delete())
+        self.assert_revalidates('/api/activities/', lambda: self.activity.delete())
+
+    def test_unchanged_objects_are_not_modified(self):
+        def rename():
+            self.skill.name = 'Django REST'
+            self.skill.save()
+
+        self.assert_revalidates(f'/api/skills/{self.skill.pk}/', rename)
+
+        def log_more():
+            self.activity.hours_spent = 2
+            self.activity.save()
+
+        self.assert_revalidates(f'/api/activities/{self.activity.pk}/', log_more)
+
+    def test_stale_writes_fail_their_precondition(self):
+        skill_path, activity_path = f'/api/skills/{self.skill.pk}/', f'/api/activities/{self.activity.pk}/'
+        stale = {path: self.client.get(path, secure=True)['ETag'] for path in (skill_path, activity_path)}
+        # Someone else writes both rows first
+        for path, data in ((skill_path, {'notes': 'theirs'}), (activity_path, {'notes': 'theirs'})):
+            response = self.client.patch(path, data, content_type='application/json', secure=True)
+            self.assertEqual(response.status_code, 200)
+        before = (
+            list(Skill.objects.values_list('pk', 'name', 'notes', 'updated_at')),
+            list(LearningActivity.objects.values_list('pk', 'hours_spent', 'notes', 'updated_at')),
+        )
+
+        writes = [
+            ('put', skill_path, {'name': 'Mine', 'platform': 'udemy', 'resource_type': 'course'}),
+            ('patch', skill_path, {'notes': 'mine'}),
+            ('delete', skill_path, None),
+            ('put', activity_path, {'skill': self.skill.pk, 'date': timezone.localdate().isoformat(),
+                                    'hours_spent': 5, 'notes': 'mine'}),
+            ('patch', activity_path, {'hours_spent': 5}),
+            ('delete', activity_path, None),
+        ]
+        for method, path, data in writes:
+            with self.subTest(method=method, path=path):
+                response = getattr(self.client, method)(
+                    path, data, content_type='application/json', HTTP_IF_MATCH=stale[path], secure=True
+                )
+                self.assertEqual(response.status_code, 412)
+        self.assertEqual((
+            list(Skill.objects.values_list('pk', 'name', 'notes', 'updated_at')),
+            list(LearningActivity.objects.values_list('pk', 'hours_spent', 'notes', 'updated_at')),
+        ), before)
+
+        # The current ETag lets the write through
+        current = self.client.get(activity_path, secure=True)['ETag']
+        response = self.client.delete(activity_path, HTTP_IF_MATCH=current, secure=True)
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(LearningActivity.objects.filter(pk=self.activity.pk).exists())
+
+
+@override_settings(THROTTLE_RATE=0.5, THROTTLE_BURST=2)
+class ThrottleTests(TestCase):
+    """A bucket of 2 tokens refilled every 2 seconds, on a clock the tests move"""
+
+    def setUp(self):
+        caches['throttle'].clear()
+        self.now = 1_000_000.0
+        patcher = mock.patch('tracker.throttling.time.time', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, path='/api/skills/', **extra):
+        return self.client.get(path, secure=True, **extra)
+
+    def test_burst_over_the_limit_is_throttled(self):
+        self.assertEqual([self.get().status_code for _ in range(2)], [200, 200])
+        response = self.get()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '2')
+        # Refused requests take no tokens
+        self.now += 1.9
+        response = self.get()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_allowed_again_after_the_emission_interval(self):
+        for _ in range(2):
+            self.get()
+        self.now += 2
+        self.assertEqual(self.get().status_code, 200)
+        self.assertEqual(self.get().status_code, 429)
+        # A full refill lets a whole burst through again
+        self.now += 10
+        self.assertEqual([self.get().status_code for _ in range(3)], [200, 200, 429])
+
+    def test_buckets_are_per_client_and_endpoint(self):
+        for _ in range(2):
+            self.get()
+        self.assertEqual(self.get().status_code, 429)
+        self.assertEqual(self.get('/api/activities/').status_code, 200)
+        self.assertEqual(self.get(REMOTE_ADDR='10.0.0.2').status_code, 200)
+        self.client.force_login(User.objects.create_user('learner'))
+        self.assertEqual(self.get().status_code, 200)
+
+    def test_expensive_requests_take_more_tokens(self):
+        # Stats cost more than the whole bucket, so they take all of it
+        self.assertEqual(self.get('/api/skills/stats/').status_code, 200)
+        response = self.get('/api/skills/stats/')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '4')
+
+
+@override_settings(THROTTLE_RATE=0)
+class TimeseriesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.first = Skill.objects.create(name='Django', platform='udemy', resource_type='course')
+        cls.second = Skill.objects.create(name='Rust', platform='youtube', resource_type='video')
+        # 2024-01-01 and 2024-01-08 are Mondays
+        for skill, day, hours in (
+            (cls.first, '2024-01-01', 1), (cls.first, '2024-01-03', 2), (cls.first, '2024-02-05', 4),
+            (cls.second, '2024-01-03', '0.5'), (cls.second, '2024-01-08', 3),
+        ):
+            LearningActivity.objects.create(skill=skill, date=day, hours_spent=hours)
+
+    def series(self, query):
+        response = self.client.get(f'/api/activities/timeseries/?{query}', secure=True)
+        self.assertEqual(response.status_code, 200)
+        return [tuple(point.values()) for point in response.json()['results']]
+
+    def test_buckets(self):
+        self.assertEqual(self.series('bucket=day'), [
+            ('2024-01-01', 1.0, 1), ('2024-01-03', 2.5, 2), ('2024-01-08', 3.0, 1), ('2024-02-05', 4.0, 1),
+        ])
+        self.assertEqual(self.series('bucket=week'), [
+            ('2024-01-01', 3.5, 3), ('2024-01-08', 3.0, 1), ('2024-02-05', 4.0, 1),
+        ])
+        self.assertEqual(self.series('bucket=month'), [('2024-01-01', 6.5, 4), ('2024-02-01', 4.0, 1)])
+
+    def test_group_by_skill(self):
+        first, second = self.first.pk, self.second.pk
+        self.assertEqual(self.series('bucket=month&group_by=skill'), [
+            ('2024-01-01', first, 3.0, 2), ('2024-01-01', second, 3.5, 2), ('2024-02-01', first, 4.0, 1),
+        ])
+        self.assertEqual(self.series('bucket=week&group_by=platform'), [
+            ('2024-01-01', 'udemy', 3.0, 2), ('2024-01-01', 'youtube', 0.5, 1),
+            ('2024-01-08', 'youtube', 3.0, 1), ('2024-02-05', 'udemy', 4.0, 1),
+        ])
+
+    def test_filters(self):
+        self.assertEqual(self.series(f'bucket=week&skill={self.second.pk}'), [
+            ('2024-01-01', 0.5, 1), ('2024-01-08', 3.0, 1),
+        ])
+        self.assertEqual(self.series('start=2024-01-02&end=2024-01-31'), [
+            ('2024-01-03', 2.5, 2), ('2024-01-08', 3.0, 1),
+        ])
+
+    def test_invalid_parameters(self):
+        for path, field in (
+            ('/api/activities/timeseries/?skill=abc', 'skill'),
+            ('/api/activities/timeseries/?skill=-1', 'skill'),
+            ('/api/activities/timeseries/?bucket=year', 'bucket'),
+            ('/api/activities/timeseries/?group_by=owner', 'group_by'),
+            ('/api/activities/timeseries/?start=yesterday', 'start'),
+            ('/api/activities/?skill=abc', 'skill'),
+            ('/api/async/activities/?skill=abc', 'skill'),
+        ):
+            with self.subTest(path=path):
+                response = self.client.get(path, secure=True)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(list(response.json()), [field])
+
+
+@override_settings(THROTTLE_RATE=0)
+class MetricsTests(TestCase):
+
+    def setUp(self):
+        skill = Skill.objects.create(name='Django', platform='udemy', resource_type='course')
+        for _ in range(3):
+            LearningActivity.objects.create(skill=skill, date=timezone.localdate(), hours_spent=1)
+
+    def timings(self, path):
+        response = self.client.get(path, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return dict(
+            re.match(r'(\w+);dur=([\d.]+)', part.strip()).groups() for part in response['Server-Timing'].split(',')
+        )
+
+    def serialized(self, view):
+        return sum(count for (label, _), (_, count, _) in REQUEST_SERIALIZE_DURATION._values.items()
+                   if label == view)
+
+    def test_serialization_is_timed(self):
+        for path, view in (
+            ('/api/skills/', 'skill-list'),
+            ('/api/skills/?expand=activities', 'skill-list'),
+            ('/api/activities/', 'learningactivity-list'),
+            (f'/api/skills/{Skill.objects.get().pk}/', 'skill-detail'),
+            ('/api/async/activities/', 'async-activity-list'),
+        ):
+            with self.subTest(path=path):
+                before = self.serialized(view)
+                timings = self.timings(path)
+                self.assertEqual(list(timings), ['db', 'serialize', 'render', 'app', 'total'])
+                self.assertGreater(float(timings['serialize']), 0)
+                self.assertEqual(self.serialized(view), before + 1)
+
+    def test_nested_timers_count_once(self):
+        request = mock.Mock(spec=['_request'], _request=mock.Mock(spec=[]))
+        with mock.patch('tracker.metrics.time.perf_counter', side_effect=[10.0, 12.5]):
+            with serialization_timer(request):
+                with serialization_timer(request._request):
+                    pass
+        self.assertEqual(request._request._serialize_duration, 2.5)
+
+    @override_settings(METRICS_TOKEN='', DEBUG=False)
+    def test_metrics_are_private_without_a_token(self):
+        self.assertEqual(self.client.get('/metrics', secure=True).status_code, 404)
+        with self.settings(DEBUG=True):
+            response = self.client.get('/metrics', secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'skillstack_http_request_serialization_duration_seconds_bucket', response.content)
+
+    @override_settings(METRICS_TOKEN='s3cret', DEBUG=True)
+    def test_metrics_require_the_token(self):
+        self.assertEqual(self.client.get('/metrics', secure=True).status_code, 401)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong', secure=True)
+        self.assertEqual(response.status_code, 401)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret', secure=True)
+        self.assertEqual(response.status_code, 200)
+
+
+class CategorizationTests(TestCase):
+
+    def found(self, matcher, text):
+        return {matcher.keywords[index] for index in matcher.find(text)}
+
+    def test_overlapping_keywords(self):
+        matcher = KeywordMatcher(['sql', 'mysql', 'nosql', 'react', 'react native', 'native', 'java', 'javascript'])
+        self.assertEqual(self.found(matcher, 'mysql'), {'mysql', 'sql'})
+        self.assertEqual(self.found(matcher, 'react native'), {'react', 'react native', 'native'})
+        self.assertEqual(self.found(matcher, 'javascript'), {'java', 'javascript'})
+        self.assertEqual(self.found(matcher, 'reactreact nativ'), {'react'})
+
+    def test_matches_ignore_word_boundaries(self):
+        # Substring matching, like the frontend's String.includes()
+        matcher = KeywordMatcher(['go', 'ui', 'qa'])
+        self.assertEqual(self.found(matcher, 'django build'), {'go', 'ui'})
+        self.assertEqual(self.found(matcher, 'go, ui; qa'), {'go', 'ui', 'qa'})
+        self.assertEqual(self.found(matcher, 'g o'), set())
+
+    def test_matches_substring_search(self):
+        keywords = [keyword for keywords in CATEGORY_KEYWORDS.values() for keyword in keywords]
+        matcher = KeywordMatcher(keywords)
+        texts = [
+            'full stack react native and django rest framework', 'c++ and c# for game programming',
+            'ci/cd with gitlab on aws', 'power bi dashboards', 'scrum master', 'pottery', '',
+        ]
+        alphabet = 'aceijnorstv /+'
+        texts += [''.join(alphabet[(seed * 7 + i * i) % len(alphabet)] for i in range(60)) for seed in range(50)]
+        for text in texts:
+            with self.subTest(text=text):
+                self.assertEqual(self.found(matcher, text), {keyword for keyword in keywords if keyword in text})
+
+    def test_most_keywords_win_and_ties_go_to_the_earlier_category(self):
+        self.assertEqual(categorize('pandas and numpy with python'), ('Data Science & Analytics', 100))
+        # python counts towards three categories; the first listed wins
+        self.assertEqual(categorize('Python')[0], 'Backend Development')
+        self.assertEqual(categorize('Design')[0], 'Frontend Development')
+        category, confidence = categorize('Figma', tags='prototyping')
+        self.assertEqual(category, 'Design & Creative')
+        self.assertAlmostEqual(confidence, 200 / 3)
+        # A keyword counts once however often it occurs
+        self.assertAlmostEqual(categorize('scrum scrum scrum')[1], 100 / 3)
+        self.assertEqual(categorize('Pottery', 'wheel throwing'), ('General', 0))
+
+
+@override_settings(THROTTLE_RATE=0)
+class AsyncViewTests(TestCase):
+    """The /api/async/ routes answer with the sync viewsets' bytes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.localdate()
+        for index, (platform, status) in enumerate((('udemy', 'in_progress'), ('youtube', 'completed'),
+                                                    ('udemy', 'not_started'))):
+            skill = Skill.objects.create(
+                name=f'Skill {index}', platform=platform, resource_type='course', estimated_hours=10 * index,
+                tags='python, web', status=status,
+            )
+            for day in range(11 * index):
+                LearningActivity.objects.create(skill=skill, date=today - timedelta(days=day), hours_spent='1.25')
+        cls.skill = skill
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_same(self, path):
+        # Delta sync cursors carry the time of the request
+        with mock.patch('tracker.pagination.timezone.now', return_value=timezone.now()):
+            sync = self.client.get(f'/api/{path}', secure=True)
+            async_ = self.client.get(f'/api/async/{path}', secure=True)
+        self.assertEqual(sync.status_code, 200)
+        self.assertEqual(async_.status_code, sync.status_code)
+        # Page links point back at the route that served them
+        self.assertEqual(async_.content.replace(b'/api/async/', b'/api/'), sync.content)
+        return sync.json()
+
+    def test_same_bodies(self):
+        since = DeltaSyncPagination().encode_positions(
+            (timezone.now() - timedelta(days=1), 0), (timezone.now() - timedelta(days=1), 0)
+        )
+        for path in (
+            'skills/', 'skills/?platform=udemy', 'skills/?fields=name,progress_percentage', 'skills/?tag=python',
+            'skills/?expand=activities', f'skills/?since={since}', 'skills/stats/',
+            f'skills/{self.skill.pk}/', f'skills/{self.skill.pk}/?fields=name,activities',
+            'activities/', f'activities/?skill={self.skill.pk}', 'activities/?fields=date,hours_spent',
+        ):
+            with self.subTest(path=path):
+                self.assert_same(path)
+
+    @mock.patch.object(KeysetPagination, 'page_size', 2)
+    def test_same_cursor_pages(self):
+        for path in ('skills/?pagination=cursor', f'activities/?skill={self.skill.pk}&pagination=cursor'):
+            with self.subTest(path=path):
+                page = self.assert_same(path)
+                while page['next']:
+                    page = self.assert_same(page['next'].split('/api/', 1)[1])
+
+    def test_same_errors(self):
+        for path in ('skills/999999/', 'activities/?skill=abc', 'activities/?pagination=cursor&cursor=bogus'):
+            with self.subTest(path=path):
+                sync = self.client.get(f'/api/{path}', secure=True)
+                async_ = self.client.get(f'/api/async/{path}', secure=True)
+                self.assertEqual((async_.status_code, async_.json()), (sync.status_code, sync.json()))
+
+
+@override_settings(THROTTLE_RATE=0)
+class ActivityPreviewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.skill = Skill.objects.create(name='Django', platform='udemy', resource_type='course')
+        self.today = timezone.localdate()
+
+    def log(self, count):
+        # Two activities a day, so the cursor also has to break ties on the date
+        for _ in range(count):
+            index = LearningActivity.objects.filter(skill=self.skill).count()
+            LearningActivity.objects.create(
+                skill=self.skill, date=self.today - timedelta(days=index // 2), hours_spent=1
+            )
+
+    def previews(self):
+        detail = self.client.get(f'/api/skills/{self.skill.pk}/', secure=True).json()
+        listed = self.client.get('/api/skills/?expand=activities', secure=True).json()['results'][0]
+        self.assertEqual((listed['activities'], listed['activities_next']),
+                         (detail['activities'], detail['activities_next']))
+        return detail
+
+    def expected_ids(self):
+        activities = LearningActivity.objects.filter(skill=self.skill).order_by('-date', '-id')
+        return list(activities.values_list('pk', flat=True))
+
+    def test_preview_stops_at_the_limit(self):
+        self.log(20)
+        skill = self.previews()
+        self.assertEqual([activity['id'] for activity in skill['activities']], self.expected_ids())
+        self.assertIsNone(skill['activities_next'])
+
+        self.log(1)
+        skill = self.previews()
+        self.assertEqual([activity['id'] for activity in skill['activities']], self.expected_ids()[:20])
+        self.assertIsNotNone(skill['activities_next'])
+
+    def test_next_link_continues_the_preview(self):
+        self.log(45)
+        skill = self.previews()
+        ids = [activity['id'] for activity in skill['activities']]
+        url = skill['activities_next']
+        while url:
+            page = self.client.get(url, secure=True).json()
+            ids += [activity['id'] for activity in page['results']]
+            url = page['next']
+        self.assertEqual(ids, self.expected_ids())
+
+
+@override_settings(THROTTLE_RATE=0)
+class TagTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.learner = User.objects.create_user('learner')
+        cls.skills = {}
+        for name, tags, status, owner in (
+            ('Django', 'Python, web', 'completed', None),
+            ('Flask', 'python, micro', 'in_progress', None),
+            ('Asyncio', 'python3', 'completed', None),
+            ('Pythonic code', 'pythonic, style', 'completed', None),
+            ('React', 'web, javascript', 'completed', None),
+            ('FastAPI', 'python, web', 'completed', cls.learner),
+        ):
+            cls.skills[name] = Skill.objects.create(
+                name=name, platform='udemy', resource_type='course', tags=tags, status=status, owner=owner
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def names(self, query):
+        response = self.client.get(f'/api/skills/?{query}', secure=True)
+        self.assertEqual(response.status_code, 200)
+        return sorted(skill['name'] for skill in response.json()['results'])
+
+    def facets(self, query=''):
+        response = self.client.get(f'/api/skills/tags/?{query}', secure=True)
+        self.assertEqual(response.status_code, 200)
+        return [(tag['name'], tag['count']) for tag in response.json()]
+
+    def test_tag_filter_matches_whole_tags(self):
+        self.assertEqual(self.names('tag=python'), ['Django', 'Flask'])
+        self.assertEqual(self.names('tag=Python'), ['Django', 'Flask'])
+        self.assertEqual(self.names('tag=pyth'), [])
+        self.assertEqual(self.names('tag=python3'), ['Asyncio'])
+        # Repeated tags must all match
+        self.assertEqual(self.names('tag=python&tag=web'), ['Django'])
+        self.assertEqual(self.names('tag=python&status=in_progress'), ['Flask'])
+
+    def test_facets_count_the_filtered_skills_of_the_owner(self):
+        self.assertEqual(self.facets(), [
+            ('python', 2), ('web', 2), ('javascript', 1), ('micro', 1), ('python3', 1), ('pythonic', 1), ('style', 1),
+        ])
+        self.assertEqual(self.facets('status=completed'), [
+            ('web', 2), ('javascript', 1), ('python', 1), ('python3', 1), ('pythonic', 1), ('style', 1),
+        ])
+        self.assertEqual(self.facets('tag=python'), [('python', 2), ('micro', 1), ('web', 1)])
+        self.assertEqual(self.facets('tag=python&status=completed'), [('python', 1), ('web', 1)])
+        self.client.force_login(self.learner)
+        self.assertEqual(self.facets(), [('python', 1), ('web', 1)])
+        self.assertEqual(self.facets('status=in_progress'), [])
+
+
+@override_settings(THROTTLE_RATE=0)
+class KeysetPaginationTests(TestCase):
+    """Cursor pages walked either way must match the offset pages, ties included"""
+
+    @classmethod
+    def setUpTestData(cls):
+        created = timezone.now()
+        today = timezone.localdate()
+        skill = None
+        for index in range(25):
+            skill = Skill.objects.create(name=f'Skill {index}', platform='udemy', resource_type='course')
+            # Four timestamps and three dates shared by many rows
+            Skill.objects.filter(pk=skill.pk).update(created_at=created - timedelta(hours=index % 4))
+            LearningActivity.objects.create(skill=skill, date=today - timedelta(days=index % 3), hours_spent=1)
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(KeysetPagination, 'page_size', 4)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.json()['results']]
+
+    def offset_order(self, path):
+        ids, url = [], path
+        while url:
+            response = self.client.get(url, secure=True)
+            ids += self.ids(response)
+            url = response.json()['next']
+        self.assertEqual(len(ids), len(set(ids)))
+        return ids
+
+    def walk(self, path, link):
+        pages, url = [], path
+        while url:
+            response = self.client.get(url, secure=True)
+            pages.append(self.ids(response))
+            last = response
+            url = response.json()[link]
+        return pages, last.json()
+
+    def test_pages_match_the_offset_order(self):
+        for path in ('/api/skills/', '/api/activities/', '/api/async/skills/', '/api/async/activities/'):
+            with self.subTest(path=path):
+                expected = self.offset_order(path)
+                forward, last = self.walk(f'{path}?pagination=cursor', 'next')
+                self.assertTrue(all(len(page) == 4 for page in forward[:-1]))
+                self.assertEqual(sum(forward, []), expected)
+
+                # Back from the last page to the first
+                backward, first = self.walk(last['previous'], 'previous')
+                self.assertIsNone(first['previous'])
+                self.assertEqual(sum(reversed(backward), []) + forward[-1], expected)
+                # And forward again from there
+                self.assertEqual(self.ids(self.client.get(first['next'], secure=True)), forward[1])
+
+
+@override_settings(THROTTLE_RATE=0)
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.skills = []
+        for name, status, tags, notes in (
+            ('Django', 'completed', 'python, web', 'Line one\nline "two", three'),
+            ('Flask', 'in_progress', 'python', ''),
+            ('Café React', 'completed', 'web', 'naïve'),
+        ):
+            skill = Skill.objects.create(
+                name=name, platform='udemy', resource_type='course', status=status, tags=tags, notes=notes,
+                estimated_hours=3,
+            )
+            cls.skills.append(skill)
+            for day in range(3):
+                LearningActivity.objects.create(
+                    skill=skill, date=timezone.localdate() - timedelta(days=day), hours_spent='1.25', notes=notes
+                )
+        # Another owner's skill, which no export may include
+        Skill.objects.create(
+            name='Hidden', platform='udemy', resource_type='course', owner=User.objects.create_user('learner')
+        )
+
+    def export(self, path, **extra):
+        response = self.client.get(path, secure=True, **extra)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def serialized(self, path, exclude):
+        """Each matching row as its detail route renders it, by id"""
+        with mock.patch.object(PageNumberPagination, 'page_size', 1000):
+            ids = [row['id'] for row in self.client.get(path, secure=True).json()['results']]
+        rows = [self.client.get(f'{path}{pk}/', secure=True).json() for pk in sorted(ids)]
+        return [{name: value for name, value in row.items() if name not in exclude} for row in rows]
+
+    def test_ndjson_matches_the_list(self):
+        response, body = self.export('/api/skills/export/?format=ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="skills.ndjson"')
+        rows = sorted((json.loads(line) for line in body.decode().splitlines()), key=lambda row: row['id'])
+        self.assertEqual(rows, self.serialized('/api/skills/', ('activities', 'activities_next')))
+
+        _, body = self.export('/api/activities/export/', HTTP_ACCEPT='application/x-ndjson')
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        names = {skill.pk: skill.name for skill in self.skills}
+        expected = [{**row, 'skill_name': names[row['skill']]} for row in self.serialized('/api/activities/', ())]
+        self.assertEqual(sorted(rows, key=lambda row: row['id']), expected)
+
+    def test_csv(self):
+        response, body = self.export('/api/skills/export/')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="skills.csv"')
+        header, *rows = csv.reader(io.StringIO(body.decode()))
+        expected = self.serialized('/api/skills/', ('activities', 'activities_next'))
+        self.assertEqual(header, list(expected[0]))
+        self.assertEqual(
+            sorted(rows, key=lambda row: int(row[0])),
+            [['' if value is None else str(value) for value in row.values()] for row in expected],
+        )
+
+    def test_filters_and_fields_apply(self):
+        _, body = self.export('/api/skills/export/?status=completed&tag=web&fields=name,status')
+        django, flask, react = self.skills
+        self.assertEqual(
+            body.decode(), f'id,name,status\r\n{django.pk},Django,completed\r\n{react.pk},Café React,completed\r\n'
+        )
+        _, body = self.export(f'/api/activities/export/?skill={flask.pk}&format=ndjson&fields=hours_spent,skill_name')
+        self.assertEqual(
+            body.decode().splitlines(),
+            [f'{{"id":{activity.pk},"hours_spent":"1.25","skill_name":"Flask"}}'
+             for activity in LearningActivity.objects.filter(skill=flask).order_by('pk')]
+        )
+        response = self.client.get('/api/activities/export/?skill=abc', secure=True)
+        self.assertEqual(response.status_code, 400)
+
+    def test_gzip_is_negotiated(self):
+        _, plain = self.export('/api/activities/export/')
+        response, compressed = self.export('/api/activities/export/', HTTP_ACCEPT_ENCODING='br, gzip;q=0.8')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(compressed), plain)
+        response, _ = self.export('/api/activities/export/', HTTP_ACCEPT_ENCODING='br')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_chunks_join_up(self):
+        for path in ('/api/activities/export/', '/api/activities/export/?format=ndjson'):
+            with self.subTest(path=path):
+                _, whole = self.export(path)
+                with mock.patch.object(LearningActivityViewSet, 'export_chunk_size', 2):
+                    response = self.client.get(path, secure=True)
+                    chunks = list(response.streaming_content)
+                self.assertGreater(len(chunks), 2)
+                self.assertEqual(b''.join(chunks), whole)
+
+
+@override_settings(THROTTLE_RATE=0)
+class EventStreamTests(TransactionTestCase):
+    """Writes reach open streams once they commit, and only then"""
+
+    def setUp(self):
+        self.learner = User.objects.create_user('learner')
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        patcher = mock.patch('tracker.events.HEARTBEAT_SECONDS', 0.05)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def open_stream(self, owner_id):
+        stream = stream_events(owner_id)
+        self.addCleanup(self.loop.run_until_complete, stream.aclose())
+        self.assertEqual(self.next_frame(stream), f'retry: {RETRY_MS}\n\n')
+        return stream
+
+    def next_frame(self, stream):
+        return self.loop.run_until_complete(asyncio.wait_for(stream.__anext__(), 1)).decode()
+
+    def next_event(self, stream):
+        frame = self.next_frame(stream)
+        self.assertTrue(frame.startswith('id: '), frame)
+        lines = dict(line.split(': ', 1) for line in frame.strip().split('\n'))
+        self.assertEqual(lines['event'], 'changes')
+        return json.loads(lines['data'])
+
+    def test_committed_writes_publish_one_event(self):
+        stream = self.open_stream(None)
+        with transaction.atomic():
+            skill = Skill.objects.create(name='Django', platform='udemy', resource_type='course')
+            first = LearningActivity.objects.create(skill=skill, date=timezone.localdate(), hours_spent='1.5')
+            second = LearningActivity.objects.create(skill=skill, date=timezone.localdate(), hours_spent=1)
+        event = self.next_event(stream)
+        self.assertEqual(event['skills'], {'created': [skill.pk], 'updated': [skill.pk]})
+        self.assertEqual(event['activities'], {'created': [first.pk, second.pk]})
+        self.assertEqual(event['stats'], {'hours': 2.5, 'activities': 2})
+        self.assertEqual(self.next_frame(stream), ': keep-alive\n\n')
+
+    def test_rolled_back_writes_publish_nothing(self):
+        stream = self.open_stream(None)
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Skill.objects.create(name='Django', platform='udemy', resource_type='course')
+                raise RuntimeError('rolled back')
+        self.assertEqual(self.next_frame(stream), ': keep-alive\n\n')
+        # Nor does a rolled-back savepoint inside a committed transaction
+        with transaction.atomic():
+            kept = Skill.objects.create(name='Flask', platform='udemy', resource_type='course')
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    Skill.objects.create(name='Rust', platform='udemy', resource_type='course')
+                    raise RuntimeError('rolled back')
+        self.assertEqual(self.next_event(stream), {'skills': {'created': [kept.pk]}})
+
+    def test_events_reach_only_their_owner(self):
+        anonymous, learner = self.open_stream(None), self.open_stream(self.learner.pk)
+        skill = Skill.objects.create(name='Django', platform='udemy', resource_type='course', owner=self.learner)
+        self.assertEqual(self.next_event(learner), {'skills': {'created': [skill.pk]}})
+        self.assertEqual(self.next_frame(anonymous), ': keep-alive\n\n')
+
+    def test_disconnect_stops_the_stream(self):
+        broadcaster = get_broadcaster()
+        sent = []
+        stopped = asyncio.Event()
+
+        async def send(message):
+            sent.append(message)
+
+        async def application(scope, receive, send):
+            await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+            try:
+                async for frame in stream_events(None):
+                    await send({'type': 'http.response.body', 'body': frame, 'more_body': True})
+            finally:
+                stopped.set()
+
+        async def run():
+            messages = asyncio.Queue()
+            await messages.put({'type': 'http.request', 'body': b'', 'more_body': False})
+            wrapped = CancelOnDisconnect(application, ['/api/events/'])
+            served = asyncio.ensure_future(wrapped({'type': 'http', 'path': '/api/events/'}, messages.get, send))
+            while len(sent) < 3:
+                await asyncio.sleep(0.01)
+            self.assertIn(None, broadcaster._subscriptions)
+            await messages.put({'type': 'http.disconnect'})
+            await asyncio.wait_for(served, 1)
+
+        self.loop.run_until_complete(run())
+        self.assertTrue(stopped.is_set())
+        # The stream let go of its subscription
+        self.assertNotIn(None, broadcaster._subscriptions)
+        self.assertEqual(sent[1]['body'], f'retry: {RETRY_MS}\n\n'.encode())
+
+
+def per_status_stats(skills):
+    """The stats payload as the original view built it, one count query per value"""
+    total_skills = skills.count()
+    counts = {code: skills.filter(status=code).count() for code, _ in Skill.STATUS_CHOICES}
+    platforms = {name: skills.filter(platform=code).count() for code, name in Skill.PLATFORM_CHOICES}
+    resource_types = {name: skills.filter(resource_type=code).count() for code, name in Skill.RESOURCE_TYPE_CHOICES}
+    categories = {name: skills.filter(category=name).count() for name, _ in CATEGORY_CHOICES}
+    platforms = {name: count for name, count in platforms.items() if count}
+    resource_types = {name: count for name, count in resource_types.items() if count}
+    totals = skills.aggregate(hours=Sum('hours_spent'), avg=Avg('hours_spent'))
+    return {
+        'total_skills': total_skills,
+        'completed_skills': counts['completed'],
+        'in_progress_skills': counts['in_progress'],
+        'not_started_skills': counts['not_started'],
+        'paused_skills': counts['paused'],
+        'completion_rate': round(counts['completed'] / total_skills * 100 if total_skills else 0, 2),
+        'total_hours': float(totals['hours'] or 0),
+        'avg_hours_per_skill': round(float(totals['avg'] or 0), 2),
+        'platform_breakdown': platforms,
+        'resource_type_breakdown': resource_types,
+        'status_breakdown': {name: counts[code] for code, name in (
+            ('not_started', 'Not Started'), ('in_progress', 'In Progress'), ('completed', 'Completed'),
+            ('paused', 'Paused'),
+        ) if counts[code]},
+        'category_breakdown': {name: count for name, count in categories.items() if count},
+        'most_used_platform': max(platforms.items(), key=lambda item: item[1])[0] if platforms else None,
+        'most_used_resource_type': (
+            max(resource_types.items(), key=lambda item: item[1])[0] if resource_types else None
+        ),
+    }
+
+
+@override_settings(THROTTLE_RATE=0)
+class SkillStatsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.learner = User.objects.create_user('learner')
+
+    def create(self, count, status, name='Skill', platform='udemy', resource_type='course', owner=None):
+        for index in range(count):
+            skill = Skill.objects.create(
+                name=f'{name} {index}', platform=platform, resource_type=resource_type, owner=owner
+            )
+            # Hours and status as the rollups would leave them
+            Skill.objects.filter(pk=skill.pk).update(hours_spent=Decimal('1.25') * (index + 1), status=status)
+
+    def stats(self, path='/api/skills/stats/'):
+        response = self.client.get(path, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_empty(self):
+        self.assertEqual(self.stats(), {
+            'total_skills': 0, 'completed_skills': 0, 'in_progress_skills': 0, 'not_started_skills': 0,
+            'paused_skills': 0, 'completion_rate': 0, 'total_hours': 0.0, 'avg_hours_per_skill': 0.0,
+            'platform_breakdown': {}, 'resource_type_breakdown': {}, 'status_breakdown': {},
+            'category_breakdown': {}, 'most_used_platform': None, 'most_used_resource_type': None,
+        })
+
+    def test_matches_the_per_status_counts(self):
+        self.create(3, 'completed', name='Django')
+        self.create(2, 'in_progress', name='Pottery', platform='youtube', resource_type='video')
+        self.create(1, 'paused', name='Figma', platform='youtube')
+        self.create(4, 'not_started', platform='coursera', owner=self.learner)
+        stats = self.stats()
+        self.assertEqual(list(stats), list(per_status_stats(Skill.objects.none())))
+        self.assertEqual(stats, per_status_stats(Skill.objects.filter(owner=None)))
+        # And by hand: 3 of 6 completed, 1.25 * (1+2+3 + 1+2 + 1) hours
+        self.assertEqual(
+            (stats['completion_rate'], stats['total_hours'], stats['avg_hours_per_skill']), (50.0, 12.5, 2.08)
+        )
+        self.assertEqual(stats['status_breakdown'], {'In Progress': 2, 'Completed': 3, 'Paused': 1})
+        # On a tie the platform listed first is the most used
+        self.assertEqual(stats['platform_breakdown'], {'Udemy': 3, 'YouTube': 3})
+        self.assertEqual(stats['most_used_platform'], 'Udemy')
+
+        self.client.force_login(self.learner)
+        self.assertEqual(self.stats(), per_status_stats(Skill.objects.filter(owner=self.learner)))
+        self.assertEqual(self.stats('/api/async/skills/stats/'), self.stats())
+
+    @override_settings(SKILL_STATS_MATERIALIZED=True)
+    def test_materialized_stats_match(self):
+        self.create(2, 'completed')
+        self.create(3, 'in_progress', resource_type='article')
+        refresh_stats_summary(None)
+        self.assertEqual(self.stats(), per_status_stats(Skill.objects.filter(owner=None)))
+        self.assertEqual(self.stats('/api/async/skills/stats/'), self.stats())
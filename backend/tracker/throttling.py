@@ -0,0 +1,81 @@
+"""Token-bucket throttling of the API, per client and endpoint.
+
+Each client (its user, or its address when anonymous) has a bucket per
+endpoint that holds ``THROTTLE_BURST`` tokens and refills at
+``THROTTLE_RATE`` tokens a second. A request takes one token, or more for
+the endpoints in ``ENDPOINT_COSTS`` and for searches; when the bucket is
+short it gets ``429 Too Many Requests`` with a ``Retry-After`` of the
+seconds until it would fit.
+
+A bucket is stored as the one timestamp at which it will be full again
+(the GCRA form of a token bucket), so a request costs a cache get and a
+set. Buckets live in the ``throttle`` cache, local memory by default, so
+each process throttles on its own; point it at a shared cache to give
+every worker the same budgets. Requests racing on a bucket may let a few
+extra through, but never refuse one that fits.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+# Tokens a request to these endpoints (URL names) takes; the rest take 1
+ENDPOINT_COSTS = {
+    'skill-stats': 5,
+    'skill-export': 20,
+    'learningactivity-timeseries': 3,
+    'learningactivity-insights': 5,
+    'learningactivity-export': 20,
+    'learningactivity-bulk-import': 20,
+    'learningactivity-batch': 10,
+}
+# Full-text search ranks every matching skill
+SEARCH_COST = 5
+
+
+def endpoint_of(request):
+    """URL name of the request's endpoint; async views share the budget of their sync twin"""
+    match = request.resolver_match
+    if match is None or not match.url_name:
+        return request.path
+    return match.url_name.removeprefix('async-')
+
+
+def request_cost(request, endpoint):
+    cost = ENDPOINT_COSTS.get(endpoint, 1)
+    if request.query_params.get('search'):
+        cost = max(cost, SEARCH_COST)
+    return cost
+
+
+class TokenBucketThrottle(BaseThrottle):
+    cache_alias = 'throttle'
+
+    def allow_request(self, request, view):
+        rate = settings.THROTTLE_RATE
+        if rate <= 0:
+            return True
+        endpoint = endpoint_of(request)
+        # A request costing more than a full bucket would never fit
+        cost = min(request_cost(request, endpoint), settings.THROTTLE_BURST)
+
+        if request.user and request.user.is_authenticated:
+            ident = f'user-{request.user.pk}'
+        else:
+            ident = self.get_ident(request)
+        key = f'throttle:{ident}:{endpoint}'
+
+        cache = caches[self.cache_alias]
+        now = time.time()
+        full_at = max(cache.get(key, now), now) + cost / rate
+        # Seconds past the point where the bucket would hold less than nothing
+        self.wait_seconds = full_at - now - settings.THROTTLE_BURST / rate
+        if self.wait_seconds > 0:
+            return False
+        cache.set(key, full_at, math.ceil(full_at - now))
+        return True
+
+    def wait(self):
+        return self.wait_seconds
@@ -1,5 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
+from .metrics import metrics_view
 from .views import SkillViewSet, LearningActivityViewSet
 
 router = DefaultRouter()
@@ -8,4 +10,10 @@ router.register(r'activities', LearningActivityViewSet)
 
 urlpatterns = [
     path('api/', include(router.urls)),
+    path('api/async/skills/', async_views.skill_list, name='async-skill-list'),
+    path('api/async/skills/stats/', async_views.skill_stats, name='async-skill-stats'),
+    path('api/async/skills/<int:pk>/', async_views.skill_detail, name='async-skill-detail'),
+    path('api/async/activities/', async_views.activity_list, name='async-activity-list'),
+    path('api/events/', async_views.event_stream, name='event-stream'),
+    path('metrics', metrics_view, name='metrics'),
 ]
\ No newline at end of file
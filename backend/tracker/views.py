@@ -1,12 +1,92 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
-from django.db.models import Sum, Count, Q, Avg
-from .models import Skill, LearningActivity
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .conditional import (
+    ConditionalRequestMixin, collection_etag, precondition_response, queryset_version, set_validators,
+)
+from .events import record_change
+from .export import ExportMixin
+from .fastpath import FastJSONRenderer, ValuesListMixin
+from .models import DailySkillHours, Skill, LearningActivity, owner_id_of, recount_skill_hours
+from .insights import get_insights
+from .pagination import (
+    ActivityDeltaSyncPagination, ActivityKeysetPagination, KeysetPaginationMixin, SkillDeltaSyncPagination,
+    SkillKeysetPagination,
+)
+from .parsers import CSVParser, NDJSONParser
+from .search import search_skills
 from .serializers import SkillSerializer, SkillListSerializer, LearningActivitySerializer
+from .stats import get_skill_stats, schedule_stats_refresh, stats_version
+from .tasks import enqueue
 
-class SkillViewSet(viewsets.ModelViewSet):
+def filter_skills(queryset, params):
+    """Apply the skill list's query string filters"""
+    # Filter by status
+    status_param = params.get('status', None)
+    if status_param:
+        queryset = queryset.filter(status=status_param)
+    
+    # Filter by platform
+    platform = params.get('platform', None)
+    if platform:
+        queryset = queryset.filter(platform=platform)
+    
+    # Filter by resource type
+    resource_type = params.get('resource_type', None)
+    if resource_type:
+        queryset = queryset.filter(resource_type=resource_type)
+    
+    # Filter by category
+    category = params.get('category', None)
+    if category:
+        queryset = queryset.filter(category=category)
+    
+    # Filter by exact tag; repeat the parameter to require several tags
+    for tag in params.getlist('tag'):
+        queryset = queryset.filter(tag_set__name=tag.strip().lower())
+    
+    # Search
+    search = params.get('search', None)
+    if search:
+        queryset = search_skills(queryset, search)
+    
+    return queryset
+
+def skill_id_param(params):
+    """The ``skill`` query parameter as an id, or None when it is not given"""
+    value = params.get('skill', None)
+    if not value:
+        return None
+    if not (value.isascii() and value.isdigit()):
+        raise ValidationError({'skill': ['A valid integer is required.']})
+    return int(value)
+
+def filter_activities(queryset, params):
+    """Apply the activity list's query string filters"""
+    # Filter by skill
+    skill_id = skill_id_param(params)
+    if skill_id is not None:
+        queryset = queryset.filter(skill_id=skill_id)
+    
+    return queryset
+
+class SkillViewSet(ConditionalRequestMixin, ValuesListMixin, KeysetPaginationMixin, ExportMixin,
+                   viewsets.ModelViewSet):
     queryset = Skill.objects.all()
+    renderer_classes = [FastJSONRenderer]
+    fast_list = True
+    keyset_pagination_class = SkillKeysetPagination
+    delta_pagination_class = SkillDeltaSyncPagination
+    export_filename = 'skills'
+    export_exclude = ('activities', 'activities_next')
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -14,109 +94,357 @@ class SkillViewSet(viewsets.ModelViewSet):
         return SkillSerializer
     
     def get_queryset(self):
-        queryset = Skill.objects.all()
-        
-        # Filter by status
-        status_param = self.request.query_params.get('status', None)
-        if status_param:
-            queryset = queryset.filter(status=status_param)
-        
-        # Filter by platform
-        platform = self.request.query_params.get('platform', None)
-        if platform:
-            queryset = queryset.filter(platform=platform)
-        
-        # Filter by resource type
-        resource_type = self.request.query_params.get('resource_type', None)
-        if resource_type:
-            queryset = queryset.filter(resource_type=resource_type)
-        
-        # Search
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | 
-                Q(description__icontains=search) |
-                Q(tags__icontains=search)
-            )
+        queryset = Skill.objects.owned_by(self.request.user).defer('search_vector')
+        
+        # Only load the columns and relations the response renders
+        serializer_class = self.get_serializer_class()
+        columns = serializer_class.get_model_fields(self.request)
+        if columns:
+            # Plus the column the paginator orders by
+            queryset = queryset.only(getattr(self.paginator, 'ordering_field', 'created_at'), *columns)
+        if 'activities' in serializer_class.get_rendered_fields(self.request):
+            queryset = queryset.prefetch_related(serializer_class.activity_prefetch())
         
-        return queryset
+        return filter_skills(queryset, self.request.query_params)
+    
+    def get_export_queryset(self):
+        return filter_skills(Skill.objects.owned_by(self.request.user), self.request.query_params)
+    
+    def perform_create(self, serializer):
+        serializer.save(owner_id=owner_id_of(self.request.user))
     
     def perform_update(self, serializer):
         skill = serializer.save()
-        # Update hours and status after manual update
-        skill.update_hours_and_status()
+        # Update hours and status after manual update; a worker does it when BACKGROUND_TASKS is on
+        if settings.BACKGROUND_TASKS:
+            enqueue(recount_skill_hours, skill.pk, key=f'skill-hours:{skill.pk}')
+        else:
+            skill.update_hours_and_status()
     
     @action(detail=False, methods=['get'])
     def stats(self, request):
-        skills = Skill.objects.all()
-        
-        total_skills = skills.count()
-        completed_skills = skills.filter(status='completed').count()
-        in_progress_skills = skills.filter(status='in_progress').count()
-        not_started_skills = skills.filter(status='not_started').count()
-        paused_skills = skills.filter(status='paused').count()
-        total_hours = skills.aggregate(total=Sum('hours_spent'))['total'] or 0
-        
-        # Platform breakdown
-        platform_stats = {}
-        for platform_choice in Skill.PLATFORM_CHOICES:
-            platform_code = platform_choice[0]
-            platform_name = platform_choice[1]
-            count = skills.filter(platform=platform_code).count()
-            if count > 0:
-                platform_stats[platform_name] = count
-        
-        # Resource type breakdown (category-wise)
-        resource_type_stats = {}
-        for resource_choice in Skill.RESOURCE_TYPE_CHOICES:
-            resource_code = resource_choice[0]
-            resource_name = resource_choice[1]
-            count = skills.filter(resource_type=resource_code).count()
-            if count > 0:
-                resource_type_stats[resource_name] = count
-        
-        # Status breakdown
-        status_stats = {
-            'Not Started': not_started_skills,
-            'In Progress': in_progress_skills,
-            'Completed': completed_skills,
-            'Paused': paused_skills,
-        }
-        # Remove zero values
-        status_stats = {k: v for k, v in status_stats.items() if v > 0}
-        
-        # Additional insights
-        avg_hours_per_skill = skills.aggregate(avg=Avg('hours_spent'))['avg'] or 0
-        most_used_platform = max(platform_stats.items(), key=lambda x: x[1])[0] if platform_stats else None
-        most_used_resource_type = max(resource_type_stats.items(), key=lambda x: x[1])[0] if resource_type_stats else None
-        
-        return Response({
-            'total_skills': total_skills,
-            'completed_skills': completed_skills,
-            'in_progress_skills': in_progress_skills,
-            'not_started_skills': not_started_skills,
-            'paused_skills': paused_skills,
-            'completion_rate': round((completed_skills / total_skills * 100) if total_skills > 0 else 0, 2),
-            'total_hours': float(total_hours),
-            'avg_hours_per_skill': round(float(avg_hours_per_skill), 2),
-            'platform_breakdown': platform_stats,
-            'resource_type_breakdown': resource_type_stats,
-            'status_breakdown': status_stats,
-            'most_used_platform': most_used_platform,
-            'most_used_resource_type': most_used_resource_type,
-        })
+        etag = collection_etag(
+            request.get_full_path(), request.accepted_media_type, *stats_version(owner_id_of(request.user))
+        )
+        response = precondition_response(request, etag=etag)
+        if response is not None:
+            return response
+        return set_validators(Response(get_skill_stats(owner_id_of(request.user))), etag)
+    
+    @action(detail=False, methods=['get'])
+    def tags(self, request):
+        """Tag facet counts for the skills matching the current filters"""
+        counts = (
+            Skill.tag_set.through.objects
+            .filter(skill__in=self.get_queryset())
+            .values('tag__name')
+            .annotate(count=Count('skill_id'))
+            .order_by('-count', 'tag__name')
+        )
+        return Response([{'name': row['tag__name'], 'count': row['count']} for row in counts])
 
-class LearningActivityViewSet(viewsets.ModelViewSet):
+TIMESERIES_BUCKETS = {
+    'day': lambda: F('date'),
+    'week': lambda: TruncWeek('date'),
+    'month': lambda: TruncMonth('date'),
+}
+
+TIMESERIES_GROUPS = {
+    'skill': 'skill_id',
+    'platform': 'skill__platform',
+    'resource_type': 'skill__resource_type',
+}
+
+class LearningActivityViewSet(ConditionalRequestMixin, ValuesListMixin, KeysetPaginationMixin, ExportMixin,
+                              viewsets.ModelViewSet):
     queryset = LearningActivity.objects.all()
     serializer_class = LearningActivitySerializer
+    renderer_classes = [FastJSONRenderer]
+    fast_list = True
+    keyset_pagination_class = ActivityKeysetPagination
+    delta_pagination_class = ActivityDeltaSyncPagination
+    export_filename = 'activities'
+    export_exclude = ('skill_detail',)
+    export_related = {'skill_name': 'skill__name'}
+    import_batch_size = 500
+    import_max_rows = 50000
+    batch_max_operations = 1000
     
     def get_queryset(self):
-        queryset = LearningActivity.objects.select_related('skill').all()
+        queryset = LearningActivity.objects.owned_by(self.request.user)
+        
+        # Only load the columns and relations the response renders
+        serializer_class = self.get_serializer_class()
+        columns = serializer_class.get_model_fields(self.request)
+        if columns:
+            queryset = queryset.only('date', *columns)
+        if 'skill_detail' in serializer_class.get_rendered_fields(self.request):
+            queryset = queryset.select_related('skill').defer('skill__search_vector')
+        
+        return filter_activities(queryset, self.request.query_params)
+    
+    def get_export_queryset(self):
+        return filter_activities(LearningActivity.objects.owned_by(self.request.user), self.request.query_params)
+    
+    def get_collection_version(self, queryset):
+        # Embedded skills change without touching their activities
+        if 'skill_detail' in self.get_serializer_class().get_rendered_fields(self.request):
+            return queryset_version(queryset, skill_last_modified=Max('skill__updated_at'))
+        return queryset_version(queryset)
+    
+    @action(detail=False, methods=['post'], url_path='import',
+            parser_classes=[JSONParser, NDJSONParser, CSVParser])
+    def bulk_import(self, request):
+        """Import many activities from a JSON array, NDJSON or CSV body.
+        
+        Valid rows are inserted with bulk_create in one transaction and each
+        affected skill is updated once at the end; invalid rows are reported
+        by their zero-based index.
+        """
+        rows = request.data
+        if not isinstance(rows, list) or not rows:
+            return Response(
+                {'detail': 'Expected a non-empty list of activities.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(rows) > self.import_max_rows:
+            return Response(
+                {'detail': f'Cannot import more than {self.import_max_rows} activities at once.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        errors = []
+        created = 0
+        changes = []
+        with transaction.atomic():
+            for start in range(0, len(rows), self.import_batch_size):
+                batch = rows[start:start + self.import_batch_size]
+                
+                # Resolve every skill referenced by the batch in one query
+                skill_ids = set()
+                for row in batch:
+                    try:
+                        skill_ids.add(int(row.get('skill')))
+                    except (AttributeError, TypeError, ValueError):
+                        pass
+                context = self.get_serializer_context()
+                context['skills'] = Skill.objects.owned_by(request.user).in_bulk(skill_ids)
+                
+                activities = []
+                for index, row in enumerate(batch, start=start):
+                    serializer = self.get_serializer_class()(data=row, context=context)
+                    if not serializer.is_valid():
+                        errors.append({'index': index, 'errors': serializer.errors})
+                        continue
+                    activity = LearningActivity(**serializer.validated_data)
+                    activity.owner_id = activity.skill.owner_id
+                    changes.append((activity.skill_id, activity.date, activity.hours_spent, 1))
+                    activities.append(activity)
+                
+                LearningActivity.objects.bulk_create(activities)
+                for activity in activities:
+                    record_change(activity.owner_id, 'activities', 'created', activity.pk)
+                created += len(activities)
+            
+            # Each affected skill is updated exactly once
+            LearningActivity.apply_rollups(changes)
+            schedule_stats_refresh(owner_id_of(request.user))
+        
+        return Response(
+            {'created': created, 'failed': len(errors), 'errors': errors},
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        )
+    
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser])
+    def batch(self, request):
+        """Apply a list of create, update and delete operations atomically.
+        
+        Every operation is validated before anything is written; if any
+        fails, nothing is applied and the errors are reported by index.
+        Otherwise creates, updates and deletes each run as one bulk query
+        and every affected skill is updated exactly once.
+        """
+        operations = request.data
+        if not isinstance(operations, list) or not operations:
+            return Response(
+                {'detail': 'Expected a non-empty list of operations.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(operations) > self.batch_max_operations:
+            return Response(
+                {'detail': f'Cannot apply more than {self.batch_max_operations} operations at once.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        errors = []
+        targets = {}
+        skill_ids = set()
+        for index, operation in enumerate(operations):
+            error = self._check_batch_operation(operation, targets)
+            if error:
+                errors.append({'index': index, 'errors': error})
+                continue
+            if operation['op'] != 'delete':
+                try:
+                    skill_ids.add(int(operation['data'].get('skill')))
+                except (TypeError, ValueError):
+                    pass
+            if operation['op'] != 'create':
+                targets[operation['id']] = index
+        
+        with transaction.atomic():
+            # Lock the rows being changed so their old values stay accurate
+            existing = LearningActivity.objects.owned_by(request.user).select_for_update().in_bulk(targets)
+            context = self.get_serializer_context()
+            context['skills'] = Skill.objects.owned_by(request.user).in_bulk(skill_ids)
+            serializer_class = self.get_serializer_class()
+            
+            validated = []
+            failed = {error['index'] for error in errors}
+            for index, operation in enumerate(operations):
+                if index in failed:
+                    continue
+                activity = None
+                if operation['op'] != 'create':
+                    activity = existing.get(operation['id'])
+                    if activity is None:
+                        errors.append({'index': index, 'errors': {'id': ['Not found.']}})
+                        continue
+                if operation['op'] == 'delete':
+                    validated.append((index, operation['op'], activity, None))
+                    continue
+                serializer = serializer_class(
+                    activity, data=operation['data'], partial=operation['op'] == 'update', context=context
+                )
+                if not serializer.is_valid():
+                    errors.append({'index': index, 'errors': serializer.errors})
+                    continue
+                validated.append((index, operation['op'], activity, serializer.validated_data))
+            
+            if errors:
+                errors.sort(key=lambda error: error['index'])
+                return Response(
+                    {'detail': 'No operations were applied.', 'errors': errors},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            created, updated, deleted = [], [], []
+            changed_fields = {'updated_at'}
+            changes = []
+            now = timezone.now()
+            for index, op, activity, data in validated:
+                if op != 'create':
+                    changes.append((activity.skill_id, activity.date, -activity.hours_spent, -1))
+                if op == 'delete':
+                    deleted.append((index, activity))
+                    continue
+                if op == 'create':
+                    activity = LearningActivity(**data, owner_id=data['skill'].owner_id)
+                    created.append((index, activity))
+                else:
+                    for field, value in data.items():
+                        setattr(activity, field, value)
+                    activity.updated_at = now
+                    changed_fields.update(data)
+                    updated.append((index, activity))
+                changes.append((activity.skill_id, activity.date, activity.hours_spent, 1))
+            
+            LearningActivity.objects.bulk_create([activity for _, activity in created])
+            if updated:
+                LearningActivity.objects.bulk_update([activity for _, activity in updated], changed_fields)
+            if deleted:
+                # Their hours are in changes, so every skill is still updated once
+                LearningActivity.objects.filter(pk__in=[activity.pk for _, activity in deleted]).delete(
+                    apply_rollups=False
+                )
+            # Bulk writes skip post_save; deletes above still send post_delete
+            for action_name, entries in (('created', created), ('updated', updated)):
+                for _, activity in entries:
+                    record_change(activity.owner_id, 'activities', action_name, activity.pk)
+            
+            # Each affected skill is updated exactly once
+            LearningActivity.apply_rollups(changes)
+            schedule_stats_refresh(owner_id_of(request.user))
+        
+        results = [None] * len(operations)
+        for op, entries in (('create', created), ('update', updated)):
+            data = serializer_class([activity for _, activity in entries], many=True, context=context).data
+            for (index, _), item in zip(entries, data):
+                results[index] = {'op': op, 'id': item['id'], 'data': item}
+        for index, activity in deleted:
+            results[index] = {'op': 'delete', 'id': operations[index]['id']}
+        return Response({
+            'created': len(created),
+            'updated': len(updated),
+            'deleted': len(deleted),
+            'results': results,
+        })
+    
+    def _check_batch_operation(self, operation, targets):
+        """Shape errors of one batch operation, or None"""
+        if not isinstance(operation, dict):
+            return {'non_field_errors': ['Expected an object.']}
+        op = operation.get('op')
+        if op not in ('create', 'update', 'delete'):
+            return {'op': ['Choose one of: create, update, delete.']}
+        if op != 'create':
+            pk = operation.get('id')
+            if isinstance(pk, bool) or not isinstance(pk, int):
+                return {'id': ['A valid integer is required.']}
+            if pk in targets:
+                return {'id': [f'Activity {pk} is already changed by operation {targets[pk]}.']}
+        if op != 'delete' and not isinstance(operation.get('data'), dict):
+            return {'data': ['Expected an object.']}
+        return None
+    
+    @action(detail=False, methods=['get'])
+    def timeseries(self, request):
+        """Hours bucketed by day, week or month, read from the daily rollup table"""
+        bucket = request.query_params.get('bucket', 'day')
+        if bucket not in TIMESERIES_BUCKETS:
+            raise ValidationError({'bucket': [f'Choose one of: {", ".join(TIMESERIES_BUCKETS)}.']})
+        group_by = request.query_params.get('group_by')
+        if group_by and group_by not in TIMESERIES_GROUPS:
+            raise ValidationError({'group_by': [f'Choose one of: {", ".join(TIMESERIES_GROUPS)}.']})
+        
+        rows = DailySkillHours.objects.filter(skill__owner_id=owner_id_of(request.user))
         
         # Filter by skill
-        skill_id = self.request.query_params.get('skill', None)
-        if skill_id:
-            queryset = queryset.filter(skill_id=skill_id)
+        skill_id = skill_id_param(request.query_params)
+        if skill_id is not None:
+            rows = rows.filter(skill_id=skill_id)
+        
+        # Filter by date range
+        for param, lookup in (('start', 'date__gte'), ('end', 'date__lte')):
+            value = request.query_params.get(param)
+            if value:
+                date = parse_date(value)
+                if date is None:
+                    raise ValidationError({param: ['Date has wrong format. Use YYYY-MM-DD.']})
+                rows = rows.filter(**{lookup: date})
+        
+        columns = ['period']
+        if group_by:
+            columns.append(TIMESERIES_GROUPS[group_by])
+        rows = (
+            rows.annotate(period=TIMESERIES_BUCKETS[bucket]())
+            .values(*columns)
+            .annotate(hours=Sum('hours'), activities=Sum('activity_count'))
+            .order_by(*columns)
+        )
         
-        return queryset
\ No newline at end of file
+        results = []
+        for row in rows:
+            point = {'period': row['period'].isoformat()}
+            if group_by:
+                point[group_by] = row[TIMESERIES_GROUPS[group_by]]
+            point['hours'] = float(row['hours'])
+            point['activities'] = row['activities']
+            results.append(point)
+        
+        return Response({'bucket': bucket, 'group_by': group_by, 'results': results})
+    
+    @action(detail=False, methods=['get'])
+    def insights(self, request):
+        """Learning streaks, weekly comparison and most active skills"""
+        return Response(get_insights(owner_id_of(request.user)))
@@ -1,14 +1,16 @@
 import { useState, useEffect } from 'react';
 import { activitiesAPI } from '../services/api';
+import { subscribeToChanges, touches } from '../services/events';
 
 export const useActivities = (params = {}) => {
   const [activities, setActivities] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
-  const fetchActivities = async () => {
+  // Silent refetches keep the current list on screen while they load
+  const fetchActivities = async ({ silent = false } = {}) => {
     try {
-      setLoading(true);
+      if (!silent) setLoading(true);
       const response = await activitiesAPI.getAll(params);
       setActivities(response.data.results || response.data);
       setError(null);
@@ -24,6 +26,11 @@ export const useActivities = (params = {}) => {
     fetchActivities();
   }, [JSON.stringify(params)]);
 
+  useEffect(() => subscribeToChanges((changes) => {
+    // Deleting a skill deletes its activities
+    if (touches(changes, 'activities') || changes.skills?.deleted) fetchActivities({ silent: true });
+  }), [JSON.stringify(params)]);
+
   const createActivity = async (activityData) => {
     try {
       const response = await activitiesAPI.create(activityData);
@@ -55,6 +62,22 @@ export const useActivities = (params = {}) => {
     }
   };
 
+  // Apply many creates, updates and deletes in one request; all or nothing
+  const applyBatch = async (operations) => {
+    const response = await activitiesAPI.batch(operations);
+    const { results } = response.data;
+    const changed = new Map(results.filter(r => r.op === 'update').map(r => [r.id, r.data]));
+    const deleted = new Set(results.filter(r => r.op === 'delete').map(r => r.id));
+    const created = results.filter(r => r.op === 'create').map(r => r.data);
+    setActivities(prev => [
+      ...created,
+      ...prev
+        .filter(activity => !deleted.has(activity.id))
+        .map(activity => changed.get(activity.id) || activity)
+    ]);
+    return response.data;
+  };
+
   return {
     activities,
     loading,
@@ -62,6 +85,78 @@ export const useActivities = (params = {}) => {
     refetch: fetchActivities,
     createActivity,
     updateActivity,
-    deleteActivity
+    deleteActivity,
+    applyBatch
+  };
+};
+
+export const useHoursTimeseries = (params = {}) => {
+  const [series, setSeries] = useState([]);
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState(null);
+
+  useEffect(() => {
+    const fetchSeries = async ({ silent = false } = {}) => {
+      try {
+        if (!silent) setLoading(true);
+        const response = await activitiesAPI.getTimeseries(params);
+        setSeries(response.data.results);
+        setError(null);
+      } catch (err) {
+        setError(err.response?.data?.message || 'Failed to fetch learning hours');
+        console.error('Error fetching timeseries:', err);
+      } finally {
+        setLoading(false);
+      }
+    };
+
+    fetchSeries();
+    return subscribeToChanges((changes) => {
+      if (touches(changes, 'activities') || changes.skills?.deleted) fetchSeries({ silent: true });
+    });
+  }, [JSON.stringify(params)]);
+
+  return { series, loading, error };
+};
+
+// Daily hours for the last 7 days, summed on the server
+export const useWeeklyHours = () => {
+  const start = new Date();
+  start.setDate(start.getDate() - 7);
+  const { series, loading } = useHoursTimeseries({
+    bucket: 'day',
+    start: start.toISOString().slice(0, 10),
+  });
+
+  return {
+    weeklyHours: series.reduce((sum, point) => sum + point.hours, 0),
+    activeDays: series.length,
+    loading,
   };
-};
\ No newline at end of file
+};
+
+// Streaks and weekly summary, computed on the server
+export const useInsights = () => {
+  const [insights, setInsights] = useState(null);
+  const [loading, setLoading] = useState(true);
+
+  useEffect(() => {
+    const fetchInsights = async () => {
+      try {
+        const response = await activitiesAPI.getInsights();
+        setInsights(response.data);
+      } catch (err) {
+        console.error('Error fetching insights:', err);
+      } finally {
+        setLoading(false);
+      }
+    };
+
+    fetchInsights();
+    return subscribeToChanges((changes) => {
+      if (touches(changes, 'activities') || changes.skills?.deleted) fetchInsights();
+    });
+  }, []);
+
+  return { insights, loading };
+};
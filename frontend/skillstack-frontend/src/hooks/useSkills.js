@@ -1,14 +1,16 @@
 import { useState, useEffect } from 'react';
 import { skillsAPI } from '../services/api';
+import { subscribeToChanges, touches } from '../services/events';
 
 export const useSkills = (params = {}) => {
   const [skills, setSkills] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
-  const fetchSkills = async () => {
+  // Silent refetches keep the current list on screen while they load
+  const fetchSkills = async ({ silent = false } = {}) => {
     try {
-      setLoading(true);
+      if (!silent) setLoading(true);
       const response = await skillsAPI.getAll(params);
       setSkills(response.data.results || response.data);
       setError(null);
@@ -24,6 +26,10 @@ export const useSkills = (params = {}) => {
     fetchSkills();
   }, [JSON.stringify(params)]);
 
+  useEffect(() => subscribeToChanges((changes) => {
+    if (touches(changes, 'skills')) fetchSkills({ silent: true });
+  }), [JSON.stringify(params)]);
+
   const createSkill = async (skillData) => {
     try {
       const response = await skillsAPI.create(skillData);
@@ -72,9 +78,9 @@ export const useSkillStats = () => {
   const [error, setError] = useState(null);
 
   useEffect(() => {
-    const fetchStats = async () => {
+    const fetchStats = async ({ silent = false } = {}) => {
       try {
-        setLoading(true);
+        if (!silent) setLoading(true);
         const response = await skillsAPI.getStats();
         setStats(response.data);
         setError(null);
@@ -87,6 +93,9 @@ export const useSkillStats = () => {
     };
 
     fetchStats();
+    return subscribeToChanges((changes) => {
+      if (touches(changes, 'skills', 'stats')) fetchStats({ silent: true });
+    });
   }, []);
 
   return { stats, loading, error };
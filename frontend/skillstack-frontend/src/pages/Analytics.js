@@ -1,7 +1,7 @@
 import React from 'react';
 import { BarChart3, TrendingUp, Clock, Target, Brain } from 'lucide-react';
 import { useSkillStats } from '../hooks/useSkills';
-import { useActivities } from '../hooks/useActivities';
+import { useActivities, useInsights, useWeeklyHours } from '../hooks/useActivities';
 import LoadingSpinner from '../components/LoadingSpinner';
 import ErrorMessage from '../components/ErrorMessage';
 import { StatusPieChart, PlatformBarChart, ResourceTypeChart } from '../components/charts/StatsChart';
@@ -11,6 +11,8 @@ import Timeline from '../components/Timeline';
 const Analytics = () => {
   const { stats, loading: statsLoading, error: statsError } = useSkillStats();
   const { activities, loading: activitiesLoading } = useActivities();
+  const { weeklyHours } = useWeeklyHours();
+  const { insights } = useInsights();
 
   if (statsLoading || activitiesLoading) {
     return <LoadingSpinner text="Loading analytics..." />;
@@ -20,18 +22,6 @@ const Analytics = () => {
     return <ErrorMessage message={statsError} />;
   }
 
-  // Calculate recent activity stats
-  const last7Days = new Date();
-  last7Days.setDate(last7Days.getDate() - 7);
-  
-  const recentActivities = activities.filter(activity => 
-    new Date(activity.date) >= last7Days
-  );
-  
-  const weeklyHours = recentActivities.reduce((sum, activity) => 
-    sum + parseFloat(activity.hours_spent), 0
-  );
-
   return (
     <div className="space-y-6">
       {/* Header */}
@@ -121,9 +111,9 @@ const Analytics = () => {
             <div className="text-center p-4 bg-gradient-to-br from-purple-50 to-pink-50 rounded-lg border border-purple-200">
               <h3 className="text-sm font-medium text-purple-900 mb-1">Learning Streak</h3>
               <p className="text-lg font-bold text-purple-600 mb-2">
-                {recentActivities.length} days
+                {insights?.current_streak ?? 0} days
               </p>
-              <p className="text-xs text-purple-700">Active days this week</p>
+              <p className="text-xs text-purple-700">Longest streak: {insights?.longest_streak ?? 0} days</p>
             </div>
           </div>
         </div>
@@ -2,7 +2,7 @@ import React from 'react';
 import { Link } from 'react-router-dom';
 import { Plus, Book, Clock, Trophy, TrendingUp, Calendar } from 'lucide-react';
 import { useSkillStats, useSkills } from '../hooks/useSkills';
-import { useActivities } from '../hooks/useActivities';
+import { useActivities, useWeeklyHours } from '../hooks/useActivities';
 import LoadingSpinner from '../components/LoadingSpinner';
 import ErrorMessage from '../components/ErrorMessage';
 import SkillCard from '../components/SkillCard';
@@ -15,6 +15,7 @@ const Dashboard = () => {
     ordering: '-created_at'
   });
   const { activities } = useActivities();
+  const { weeklyHours } = useWeeklyHours();
 
   const recentSkills = skills.slice(0, 6);
   const recentActivities = activities.slice(0, 5);
@@ -46,13 +47,6 @@ const Dashboard = () => {
     return <ErrorMessage message={statsError || skillsError} />;
   }
 
-  // Calculate this week's hours
-  const thisWeek = new Date();
-  thisWeek.setDate(thisWeek.getDate() - 7);
-  const weeklyHours = activities
-    .filter(activity => new Date(activity.date) >= thisWeek)
-    .reduce((sum, activity) => sum + parseFloat(activity.hours_spent), 0);
-
   return (
     <div className="space-y-6">
       {/* Header */}
@@ -1,9 +1,11 @@
 import axios from 'axios';
 
-const API_BASE_URL = process.env.REACT_APP_API_BASE_URL || 'http://localhost:8000/api';
+export const API_BASE_URL = process.env.REACT_APP_API_BASE_URL || 'http://localhost:8000/api';
 
 const api = axios.create({
   baseURL: API_BASE_URL,
+  // Sends the cookie that keeps reads on the primary database right after a write
+  withCredentials: true,
   headers: {
     'Content-Type': 'application/json',
   },
@@ -39,6 +41,8 @@ export const skillsAPI = {
   update: (id, data) => api.put(`/skills/${id}/`, data),
   delete: (id) => api.delete(`/skills/${id}/`),
   getStats: () => api.get('/skills/stats/'),
+  // Rows changed and ids deleted since a cursor from an earlier sync ('' for everything)
+  getChanges: (since = '') => api.get('/skills/', { params: { since } }),
 };
 
 // Activities API
@@ -48,6 +52,10 @@ export const activitiesAPI = {
   create: (data) => api.post('/activities/', data),
   update: (id, data) => api.put(`/activities/${id}/`, data),
   delete: (id) => api.delete(`/activities/${id}/`),
+  batch: (operations) => api.post('/activities/batch/', operations),
+  getTimeseries: (params = {}) => api.get('/activities/timeseries/', { params }),
+  getInsights: () => api.get('/activities/insights/'),
+  getChanges: (since = '') => api.get('/activities/', { params: { since } }),
 };
 
 export default api;
\ No newline at end of file
@@ -0,0 +1,35 @@
+import { API_BASE_URL } from './api';
+
+// One stream of server change events, shared by every subscriber
+const listeners = new Set();
+let source = null;
+
+const notify = (changes) => listeners.forEach(listener => listener(changes));
+
+const connect = () => {
+  let connected = false;
+  source = new EventSource(`${API_BASE_URL}/events/`, { withCredentials: true });
+  source.addEventListener('open', () => {
+    // Changes made while reconnecting were missed; refetch everything
+    if (connected) notify({ resync: true });
+    connected = true;
+  });
+  source.addEventListener('changes', (event) => notify(JSON.parse(event.data)));
+};
+
+// Call listener with each batch of committed changes; returns an unsubscribe function
+export const subscribeToChanges = (listener) => {
+  if (typeof EventSource === 'undefined') return () => {};
+  listeners.add(listener);
+  if (!source) connect();
+  return () => {
+    listeners.delete(listener);
+    if (!listeners.size && source) {
+      source.close();
+      source = null;
+    }
+  };
+};
+
+// Whether a change event affects any of the given kinds ('skills', 'activities', 'stats')
+export const touches = (changes, ...kinds) => changes.resync || kinds.some(kind => changes[kind]);